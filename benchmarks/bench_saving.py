@@ -0,0 +1,273 @@
+"""Benchmarks for reading and writing files with ssb_konjunk.saving.
+
+Measures write and read throughput and peak memory for each filetype and
+number of rows, and the time used to find versions in folders with many
+files. Runs against a local temporary folder and an in-memory fsspec
+filesystem, so no access to GCS is needed. The results are written as JSON,
+so runs can be compared to find regressions.
+
+Example:
+    python benchmarks/bench_saving.py --rows 10000 1000000 --output bench.json
+    python benchmarks/bench_saving.py --rows 50000000 --filetypes parquet --backends local
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import fsspec
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ssb_konjunk import saving
+
+FILETYPES = ["parquet", "csv", "json", "jsonl"]
+BACKENDS = ["local", "memory"]
+
+
+def make_df(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Make a time series dataframe like the ones used by the dash app."""
+    rng = np.random.default_rng(seed)
+    periods = pd.period_range("2000-01", periods=max(1, rows // 100), freq="M")
+    return pd.DataFrame(
+        {
+            "periode": periods.astype(str)[np.arange(rows) % len(periods)],
+            "nar": rng.choice(["H", "47", "47.1", "47.2", "49.1", "64"], rows),
+            "jus": rng.normal(100, 10, rows),
+            "korr": rng.normal(100, 10, rows),
+            "ujust": rng.normal(100, 10, rows),
+            "verdi": rng.normal(100, 10, rows),
+        }
+    )
+
+
+def arrow_peak(func: Callable[[], Any], interval: float = 0.001) -> int:
+    """Run a function and measure the peak Arrow memory it allocated.
+
+    The bytes allocated by the default Arrow memory pool are sampled in a
+    thread while the function runs, since the max_memory of the pool is a
+    high-water mark for the whole process. Peaks shorter than the interval
+    may be missed.
+    """
+    pool = pa.default_memory_pool()
+    before = pool.bytes_allocated()
+    peak = before
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not done.wait(interval):
+            peak = max(peak, pool.bytes_allocated())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    return max(0, max(peak, pool.bytes_allocated()) - before)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Run a function and measure the best time and the peak memory.
+
+    The time is measured first, without tracemalloc that slows down Python
+    code. Then the function is run once more to measure the peak Python
+    memory with tracemalloc and the peak Arrow memory with arrow_peak.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        peak_arrow = arrow_peak(func)
+        _, peak_python = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(times),
+        "peak_python_bytes": peak_python,
+        "peak_arrow_bytes": peak_arrow,
+    }
+
+
+def bucket_for(backend: str, root: str) -> str:
+    """Get the bucket path of a backend."""
+    if backend == "memory":
+        return "memory://ssb-benchmark"
+    return root
+
+
+def file_size(bucket: str, filetype: str) -> int:
+    """Get the size of the written benchmark file."""
+    path = f"{bucket}/bench/inndata/tall_p2024-01_v0.{filetype}"
+    fs, fs_path = fsspec.core.url_to_fs(path)
+    return int(fs.size(fs_path))
+
+
+def bench_read_write(
+    backends: list[str], filetypes: list[str], rows_list: list[int], repeat: int
+) -> list[dict[str, Any]]:
+    """Benchmark writing and reading a file for each backend, filetype and size."""
+    results = []
+    for rows in rows_list:
+        df = make_df(rows)
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as root:
+                bucket = bucket_for(backend, root)
+                args = ((2024, 1), "M", bucket, "bench", "tall", "inndata")
+                for filetype in filetypes:
+                    write = measure(
+                        functools.partial(
+                            saving.write_ssb_file,
+                            df,
+                            *args,
+                            stable_version=False,
+                            filetype=filetype,
+                            interactive=False,
+                        ),
+                        repeat,
+                    )
+                    read = measure(
+                        functools.partial(
+                            saving.read_ssb_file, *args, filetype=filetype
+                        ),
+                        repeat,
+                    )
+                    size = file_size(bucket, filetype)
+                    for operation, result in [("write", write), ("read", read)]:
+                        results.append(
+                            {
+                                "benchmark": "read_write",
+                                "operation": operation,
+                                "backend": backend,
+                                "filetype": filetype,
+                                "rows": rows,
+                                "file_bytes": size,
+                                "rows_per_second": rows / result["seconds"],
+                                **result,
+                            }
+                        )
+                if backend == "memory":
+                    fsspec.filesystem("memory").rm(bucket, recursive=True)
+    return results
+
+
+def bench_versions(
+    backends: list[str], folder_sizes: list[int], repeat: int
+) -> list[dict[str, Any]]:
+    """Benchmark finding the newest version in folders with many files.
+
+    Half of the files are versions of the benchmarked file, and the rest are
+    other files in the same folder.
+    """
+    results = []
+    df = make_df(10)
+    for backend in backends:
+        for folder_size in folder_sizes:
+            with tempfile.TemporaryDirectory() as root:
+                bucket = bucket_for(backend, root)
+                folder = f"{bucket}/bench/inndata"
+                fs, fs_folder = fsspec.core.url_to_fs(folder)
+                fs.makedirs(fs_folder, exist_ok=True)
+                for i in range(folder_size // 2):
+                    fs.touch(f"{fs_folder}/tall_p2024-01_v{i + 1}.parquet")
+                    fs.touch(f"{fs_folder}/annen_p{2000 + i % 100}-01_v{i}.parquet")
+                # The newest version has to be a real file to be read.
+                args = ((2024, 1), "M", bucket, "bench", "tall", "inndata")
+                saving.write_ssb_file(df, *args, interactive=False)
+                file_path = f"{folder}/tall_p2024-01_"
+                versions_fs = saving._get_fs(folder)
+
+                def list_uncached(
+                    folder: str = folder,
+                    file_path: str = file_path,
+                    versions_fs: Any = versions_fs,
+                ) -> None:
+                    saving._invalidate_listing_cache(folder)
+                    saving._get_files(file_path, "parquet", versions_fs)
+
+                def find_version(
+                    file_path: str = file_path, versions_fs: Any = versions_fs
+                ) -> None:
+                    files = saving._get_files(file_path, "parquet", versions_fs)
+                    # Hide the message about overwriting version 0.
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        saving._find_version_number(files, stable_version=False)
+
+                def read_newest(folder: str = folder, args: tuple = args) -> None:
+                    saving._invalidate_listing_cache(folder)
+                    saving.read_ssb_file(*args)
+
+                for operation, func in [
+                    ("list_uncached", list_uncached),
+                    ("find_version_cached", find_version),
+                    ("read_newest", read_newest),
+                ]:
+                    results.append(
+                        {
+                            "benchmark": "versions",
+                            "operation": operation,
+                            "backend": backend,
+                            "folder_size": folder_size,
+                            **measure(func, repeat),
+                        }
+                    )
+                if backend == "memory":
+                    fs.rm(fs_folder, recursive=True)
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmarks and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--filetypes", nargs="+", default=FILETYPES)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS)
+    parser.add_argument(
+        "--folder-sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="JSON file for the results, default stdout.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "metadata": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "pyarrow": pa.__version__,
+            "repeat": args.repeat,
+        },
+        "results": [
+            *bench_read_write(args.backends, args.filetypes, args.rows, args.repeat),
+            *bench_versions(args.backends, args.folder_sizes, args.repeat),
+        ],
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -221,6 +221,14 @@ def xdoctest(session: Session) -> None:
     session.run("python", "-m", "xdoctest", *args)
 
 
+@session(python=python_versions[0])
+def benchmarks(session: Session) -> None:
+    """Run the benchmarks of the saving module, with results as JSON."""
+    args = session.posargs or ["--output", "bench_output.json"]
+    session.install(".")
+    session.run("python", "benchmarks/bench_saving.py", *args)
+
+
 @session(name="docs-build", python=python_versions[0])
 def docs_build(session: Session) -> None:
     """Build the documentation."""
@@ -1,5 +1,17 @@
+import inspect
+import logging
+import threading
+import warnings
+from collections import OrderedDict
 from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache
+from functools import partial
+from functools import wraps
+from typing import Any
+from typing import TypeVar
 
 import pandas as pd
 import polars as pl
@@ -13,6 +25,74 @@ from ssb_konjunk.dash.calculations.period_utils import AllPeriods
 from ssb_konjunk.dash.calculations.period_utils import Period
 from ssb_konjunk.dash.components.page_aio import ReturnData
 
+logger = logging.getLogger(__name__)
+
+_Method = TypeVar("_Method", bound=Callable[..., ReturnData])
+
+
+def _log_failed_warm_up(name: str, period: str, future: Future[ReturnData]) -> None:
+    """Logger feilen hvis en beregning i `DataManager.warm_up` feilet.
+
+    Args:
+        name (str): Navnet på tabellmetoden.
+        period (str): Perioden som ble beregnet.
+        future (Future[ReturnData]): Den ferdige beregningen.
+    """
+    if not future.cancelled() and (error := future.exception()) is not None:
+        logger.error(
+            "Forhåndsberegning av %s for %s feilet.", name, period, exc_info=error
+        )
+
+
+def _cached_result(method: _Method) -> _Method:
+    """Cacher resultatet av en tabellmetode i DataManager per periode og filter.
+
+    Nøkkelen er metodenavnet, perioden, `max_nace_level`, `nace_filter` og
+    `includes_parent_aggregate`. Perioden None og 'None' gir samme nøkkel, og
+    rekkefølgen i `nace_filter` har ingen betydning. Ved treff returneres det
+    samme `ReturnData`-objektet som ligger i cachen, uten kopiering. Resultatet er
+    derfor bare til lesing, og den som kaller må kopiere dataene før de endres.
+
+    Args:
+        method (Callable): Metoden som skal caches.
+
+    Returns:
+        Callable: Metoden med cache.
+    """
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self: "DataManager", *args: Any, **kwargs: Any) -> ReturnData:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        period = arguments.get("period")
+        nace_filter = arguments.get("nace_filter")
+        key = (
+            method.__name__,
+            None if period == "None" else period,
+            arguments.get("max_nace_level"),
+            None if nace_filter is None else tuple(sorted(nace_filter)),
+            arguments.get("includes_parent_aggregate"),
+        )
+        with self._cache_lock:
+            result = self._result_cache.get(key)
+            if result is not None:
+                self._result_cache.move_to_end(key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if result is None:
+            result = method(self, *args, **kwargs)
+            with self._cache_lock:
+                self._result_cache[key] = result
+                self._result_cache.move_to_end(key)
+                while len(self._result_cache) > self.max_cached_results:
+                    self._result_cache.popitem(last=False)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
 
 class DataManager:
     """Klasse for analyse og visning av næringsdata med ulike justeringer og aggregeringer.
@@ -35,6 +115,9 @@ class DataManager:
     - `self.raw_source`, `self.calendar_source`, `self.season_source`, `self.weight_source`:
     Datastrukturer for ulike måter å representere eller justere tidsserier.
     - `get_table_X_v2(...)`: Metoder for å hente ulike tabellvarianter (1-7), hver tilpasset spesifikke analysetyper.
+    - Resultatene fra tabellmetodene caches per periode og filter i en begrenset LRU-cache,
+    med tellerne `cache_hits` og `cache_misses`. Cachen tømmes med `clear_cache()`.
+    Resultatene deles mellom kallene og er bare til lesing.
     - Statiske hjelpefunksjoner for sortering, prosentberegning og visuell formatering.
     - Intern periodehåndtering for fleksibel datoanalyse.
 
@@ -56,6 +139,7 @@ class DataManager:
         data: pd.DataFrame,
         period_column: str = "periode",
         nace_column: str = "nar",
+        max_cached_results: int = 128,
     ) -> None:
         """Initialiserer klassen med behandlet og strukturert tidsseriedata.
 
@@ -66,10 +150,20 @@ class DataManager:
         Args:
             data (pd.DataFrame): Inndata som inneholder tidsseriedata, med blant annet
                 kolonnene 'nar', 'periode', 'jus', 'korr', 'ujust' og 'verdi'.
+            period_column (str): Navnet på periodekolonnen. Standard er 'periode'.
+            nace_column (str): Navnet på næringskolonnen. Standard er 'nar'.
+            max_cached_results (int): Maksimalt antall tabellresultater som caches. De
+                minst nylig brukte fjernes først. Standard er 128.
         """
         self.period_col = period_column
         self.nace_col = nace_column
 
+        self.max_cached_results = max_cached_results
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._result_cache: OrderedDict[tuple[Any, ...], ReturnData] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         nus = KlassClassification(
             classification_id="6", language="nb", include_future=False
         )
@@ -125,6 +219,72 @@ class DataManager:
             polars_data, self.period_col, "korr", self.nace_col, internal_col="calendar"
         )
 
+    def clear_cache(self) -> None:
+        """Tømmer cachen med tabellresultater og nullstiller tellerne."""
+        with self._cache_lock:
+            self._result_cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def warm_up(
+        self, n_periods: int = 3, max_workers: int | None = None, wait: bool = False
+    ) -> list[Future[ReturnData]]:
+        """Beregner alle tabellene for de siste periodene i bakgrunnen og fyller cachen.
+
+        Tabell 1-6 og de sesongjusterte endringstabellene beregnes med standardargumenter
+        for de `n_periods` siste periodene i nedtrekksmenyen, nyeste først, i en
+        trådpool. Som standard returnerer metoden med en gang, så første bruker slipper
+        å vente på beregningene. Feil i en beregning logges, ligger i den tilhørende
+        `Future`, og kommer igjen når tabellen hentes på vanlig måte.
+
+        Args:
+            n_periods (int): Antall perioder som beregnes, fra og med den nyeste. Standard er 3.
+            max_workers (int or None): Maksimalt antall tråder. Hvis None, bruker
+                `ThreadPoolExecutor` sin standard.
+            wait (bool): Om metoden skal vente til alle beregningene er ferdige. Standard er False.
+
+        Returns:
+            list[Future[ReturnData]]: En `Future` per beregning, som kan ventes på ved behov.
+
+        Hvis tabellene for `n_periods` perioder ikke får plass i cachen, beregnes bare
+        så mange perioder som får plass, og det gis en advarsel.
+        """
+        getters: list[Callable[[str], ReturnData]] = [
+            self.get_table_1,
+            self.get_table_2,
+            self.get_table_3,
+            self.get_table_4,
+            self.get_table_5,
+            self.get_table_6,
+            self.get_sesonal_adjusted_mth_change,
+            self.get_sesonal_adjusted_3_mth_change,
+            self.get_sesonal_adjusted_12_mth_change,
+        ]
+        periods = sorted(self.get_all_periods(), reverse=True)[:n_periods]
+        max_periods = self.max_cached_results // len(getters)
+        if len(periods) > max_periods:
+            warnings.warn(
+                f"Cachen har plass til {self.max_cached_results} resultater, men "
+                f"{len(periods)} perioder gir {len(periods) * len(getters)} tabeller. "
+                f"Beregner bare de {max_periods} siste periodene.",
+                stacklevel=2,
+            )
+            periods = periods[:max_periods]
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="warm_up"
+        )
+        futures: list[Future[ReturnData]] = []
+        for period in periods:
+            for getter in getters:
+                future = executor.submit(getter, period)
+                future.add_done_callback(
+                    partial(_log_failed_warm_up, getter.__name__, period)
+                )
+                futures.append(future)
+        executor.shutdown(wait=wait)
+        return futures
+
     @staticmethod
     def pad_single(x: str) -> str:
         """Legger inn innrykk basert på nivå i hierarkisk kode.
@@ -416,6 +576,7 @@ class DataManager:
             all_periods.append(latest)
         return all_periods
 
+    @_cached_result
     def get_sesonal_adjusted_3_mth_change(
         self,
         period: str | None = None,
@@ -528,6 +689,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_sesonal_adjusted_mth_change(
         self,
         period: str | None = None,
@@ -633,6 +795,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_sesonal_adjusted_12_mth_change(
         self,
         period: str | None = None,
@@ -735,6 +898,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_table_1(self, period: str | None = None) -> ReturnData:
         """Genererer samleskjema med månedlige nivåer, endringer og vektet bidrag.
 
@@ -811,6 +975,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_table_2(self, period: str | None = None) -> ReturnData:
         """Genererer en tabell med rullerende 3-måneders gjennomsnitt og endringer med vektet bidrag.
 
@@ -888,6 +1053,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_table_3(self, period: str | None = None) -> ReturnData:
         """Genererer tabell med 12-måneders nivåer og endringer over to påfølgende perioder.
 
@@ -977,6 +1143,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_table_4(self, period: str | None = None) -> ReturnData:
         """Genererer tabell med 3-måneders glidende gjennomsnitt og årlig endring.
 
@@ -1046,6 +1213,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_table_5(self, period: str | None = None) -> ReturnData:
         """Oppretter tabell med rådata som 3-måneders gjennomsnitt og årlige endringer.
 
@@ -1120,6 +1288,7 @@ class DataManager:
             groupby_col=self.nace_col,
         )
 
+    @_cached_result
     def get_table_6(
         self,
         period: str | None = None,
@@ -1175,6 +1344,8 @@ def get_data_manager(path: str) -> DataManager:
     """Laster inn et Parquet-datasett og returnerer en DataManager-instans.
 
     Leser en Parquet-fil fra gitt filbane og oppretter en `DataManager` med de leste dataene.
+    Hver fil får sin egen `DataManager` og dermed sin egen resultatcache, så en ny fil
+    starter alltid med tom cache.
 
     Args:
         path (str): Filbane til Parquet-filen som skal leses.
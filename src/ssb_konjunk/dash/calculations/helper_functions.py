@@ -1,7 +1,10 @@
+import threading
+from collections.abc import Callable
 from datetime import date
 from datetime import datetime
 from typing import Literal
 
+import numpy as np
 import pandas as pd
 import pendulum
 import polars as pl
@@ -83,6 +86,10 @@ class DataSource:
         self._group = group_by
         self._avg = internal_col
         self._dt_out_format = dt_out_format
+        self._dates: pl.Series | None = None
+        self._windows_by_n: dict[int, tuple[pl.Series, np.ndarray]] = {}
+        self._calendar: tuple[pl.Series, np.ndarray, np.ndarray] | None = None
+        self._cache_lock = threading.Lock()
 
     def latest_date(self) -> None | datetime:
         """Henter den siste datoen fra datakolonnen.
@@ -133,50 +140,83 @@ class DataSource:
         Returns:
             str: En str som representerer datoperioden (eks. "Jan 2023 - Mar 2023").
         """
-        dates = self.data.get_column(self._date).unique().sort()
+        dates = self._unique_dates()
         latest: date = dates[-1 - (n * skip)]
         oldest: date = dates[-1 - ((n * skip) + n)]
         return f"{self._create_date(oldest)} - {self._create_date(latest)}"
 
-    def _base(self, n: int, *agg: pl.Expr, **named_aggs: pl.Expr):
-        """Utfører aggregering over dynamiske tidsvinduer og grupper.
+    def _unique_dates(self) -> pl.Series:
+        """Henter de unike datoene i datasettet sortert, beregnet én gang.
+
+        Returns:
+            pl.Series: Sorterte unike datoer.
+        """
+        with self._cache_lock:
+            if self._dates is None:
+                self._dates = self.data.get_column(self._date).unique().sort()
+            return self._dates
+
+    def _windows(self, n: int) -> tuple[pl.Series, np.ndarray]:
+        """Beregner gjennomsnittet i alle tidsvinduer på n måneder for hver gruppe.
+
+        Vinduene beregnes én gang per `n`, også når flere tråder spør samtidig, og
+        lagres som en tett matrise med én rad per gruppe og én kolonne per vindu.
+        Radene er høyrejustert, slik at siste kolonne er det nyeste vinduet for alle
+        grupper, og grupper med færre vinduer fylles med NaN til venstre.
 
         Args:
             n (int): Størrelsen på tidsvinduet i måneder.
-            *agg: Ikke-navngitte aggregasjonsoperasjoner.
-            **named_aggs: Navngitte aggregasjonsoperasjoner.
 
         Returns:
-            pl.DataFrame: En DataFrame med grupperte og aggregerte verdier.
+            tuple[pl.Series, np.ndarray]: Gruppene og matrisen med gjennomsnitt per gruppe og vindu.
         """
-        return (
-            self.data.group_by_dynamic(
-                self._date, every=f"{n}mo", group_by=self._group, closed="right"
-            )
-            .agg(**{self._avg: pl.col(self._col).mean().round(1)})
-            .group_by(self._group)
-            .agg(*agg, **named_aggs)
-        )
+        with self._cache_lock:
+            if n not in self._windows_by_n:
+                windows = (
+                    self.data.group_by_dynamic(
+                        self._date, every=f"{n}mo", group_by=self._group, closed="right"
+                    )
+                    .agg(**{self._avg: pl.col(self._col).mean().round(1)})
+                    .group_by(self._group, maintain_order=True)
+                    .agg(pl.col(self._avg))
+                )
+                values = windows.get_column(self._avg).to_list()
+                width = max((len(row) for row in values), default=0)
+                matrix = np.full((len(values), width), np.nan)
+                for i, row in enumerate(values):
+                    if row:
+                        matrix[i, width - len(row) :] = np.array(row, dtype=float)
+                self._windows_by_n[n] = (windows.get_column(self._group), matrix)
+            return self._windows_by_n[n]
+
+    def _window_values(self, n: int, values: np.ndarray) -> pl.DataFrame:
+        """Lager et DataFrame med én verdi per gruppe fra en kolonne i vindusmatrisen.
 
-    def _base_w_header(
-        self, n: int, skip: int = 0, *agg: pl.Expr, **named_aggs: pl.Expr
-    ):
-        """Genererer en overskrift for perioden og returnerer resultatet fra baseaggregering.
+        Args:
+            n (int): Størrelsen på tidsvinduet i måneder.
+            values (np.ndarray): Én verdi per gruppe, NaN for manglende verdier.
 
-        Kombinerer datoperiode-headeren med aggregerte resultater fra `_base`.
+        Returns:
+            pl.DataFrame: Et DataFrame med gruppe og verdi.
+        """
+        groups, _ = self._windows(n)
+        return pl.DataFrame([groups, pl.Series(self._avg, values, nan_to_null=True)])
+
+    def _window(self, n: int, skip: int) -> np.ndarray:
+        """Henter vinduet `skip` perioder før det nyeste for alle grupper.
 
         Args:
-            n (int): Antall måneder i hver gruppeperiode.
-            skip (int, valgfritt): Antall perioder som skal hoppes over fra siste periode. Standard er 0.
-            *agg: Ikke-navngitte aggregeringsuttrykk.
-            **named_aggs: Navngitte aggregasjonsuttrykk.
+            n (int): Størrelsen på tidsvinduet i måneder.
+            skip (int): Antall perioder som skal hoppes over bakover i tid.
 
         Returns:
-            tuple[str, pl.DataFrame]: En tuple bestående av overskrift og det aggregerte datasettet.
+            np.ndarray: Gjennomsnittet i vinduet for hver gruppe, NaN hvis gruppen mangler vinduet.
         """
-        header = self._gen_header(n, skip)
-        result = self._base(n, *agg, **named_aggs)
-        return header, result
+        _, matrix = self._windows(n)
+        column = matrix.shape[1] - 1 - skip
+        if column < 0:
+            return np.full(matrix.shape[0], np.nan)
+        return matrix[:, column]
 
     def n_month(self, n: int, skip: int = 0) -> tuple[str, pl.DataFrame]:
         """Henter siste tilgjengelige verdi for gjennomsnittskolonnen for en periode.
@@ -188,9 +228,7 @@ class DataSource:
         Returns:
             tuple[str, pl.DataFrame]: En tuple med overskrift og filtrert datasett med siste verdi.
         """
-        return self._base_w_header(
-            n, skip, **{self._avg: pl.col(self._avg).get(-1 - skip)}
-        )
+        return self._gen_header(n, skip), self._window_values(n, self._window(n, skip))
 
     def n_month_percent(self, n: int, skip: int = 0) -> tuple[str, pl.DataFrame]:
         """Beregner prosentvis endring mellom to perioder og returnerer med overskrift.
@@ -202,14 +240,99 @@ class DataSource:
         Returns:
             tuple[str, pl.DataFrame]: En tuple med periodebeskrivelse og datasett med prosentendringer.
         """
-        return self._base_w_header(
-            n,
-            skip,
-            **{
-                self._avg: self._percent_change(
-                    pl.col(self._avg), pl.col(self._avg).shift(1)
-                ).get(-1 - skip)
-            },
+        latest = self._window(n, skip)
+        previous = self._window(n, skip + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = ((latest - previous) / previous) * 100
+        return self._gen_header(n, skip), self._window_values(n, change)
+
+    def _calendar_matrix(self) -> tuple[pl.Series, np.ndarray, np.ndarray]:
+        """Legger verdiene i en tett matrise med én rad per måned og én kolonne per gruppe.
+
+        Radene dekker alle måneder fra den første til den siste datoen i datasettet,
+        også måneder uten data, så et vindu på n måneder er n rader. Matrisen
+        beregnes én gang og deles av alle rullerende beregninger.
+
+        Returns:
+            tuple[pl.Series, np.ndarray, np.ndarray]: Gruppene, verdiene med NaN for
+            manglende verdier, og om gruppen har en rad i måneden.
+        """
+        with self._cache_lock:
+            if self._calendar is None:
+                groups = self.data.get_column(self._group).unique(maintain_order=True)
+                date_col = pl.col(self._date)
+                group_col = pl.col(self._group)
+                cells = self.data.select(
+                    month=date_col.dt.year() * 12 + date_col.dt.month(),
+                    group=group_col.replace_strict(groups, range(len(groups))),
+                    value=pl.col(self._col).cast(pl.Float64),
+                ).cast({"month": pl.Int64, "group": pl.Int64})
+                month = cells.get_column("month").to_numpy()
+                if len(month):
+                    month = month - month.min()
+                group = cells.get_column("group").to_numpy()
+                shape = (int(month.max(initial=-1)) + 1, len(groups))
+                values = np.full(shape, np.nan)
+                values[month, group] = cells.get_column("value").to_numpy()
+                present = np.zeros(shape, dtype=bool)
+                present[month, group] = True
+                self._calendar = (groups, values, present)
+            return self._calendar
+
+    def _rolling_last_window(
+        self, n: int, skip: int, full_window: Callable[[np.ndarray], np.ndarray]
+    ) -> pl.DataFrame:
+        """Beregner en verdi for det siste rullende vinduet på n måneder for hver gruppe.
+
+        Vinduet for hver rad dekker de n månedene som slutter `skip` måneder før raden.
+        Hvis vinduet har n rader brukes `full_window`, ellers brukes siste verdi i
+        vinduet. For hver gruppe velges det siste vinduet som ikke er tomt. Alt
+        beregnes med utsnitt av kalendermatrisen, for alle grupper samtidig.
+
+        Args:
+            n (int): Lengden på rullevinduet i måneder.
+            skip (int): Antall perioder som skal hoppes over fra nyeste dato.
+            full_window (Callable): Aggregering av vinduer med n rader, fra en matrise
+                med én rad per gruppe og én kolonne per måned til én verdi per gruppe.
+
+        Returns:
+            pl.DataFrame: Et DataFrame med gruppe og verdi for hver gruppe.
+        """
+        groups, values, present = self._calendar_matrix()
+        months, n_groups = values.shape
+        columns = np.arange(n_groups)
+
+        # Antall rader i vinduet som slutter `skip` måneder før hver måned.
+        rows = np.zeros((months + 1, n_groups), dtype=np.int64)
+        np.cumsum(present, axis=0, out=rows[1:])
+        ends = np.arange(months) - skip
+        counts = (
+            rows[np.clip(ends + 1, 0, months)] - rows[np.clip(ends - n + 1, 0, months)]
+        )
+
+        # Siste rad i hver gruppe som har et vindu som ikke er tomt.
+        candidates = present & (counts > 0)
+        last_row = np.where(candidates, np.arange(months)[:, None], -1).max(
+            axis=0, initial=-1
+        )
+        found = last_row >= 0
+        end = np.where(found, last_row - skip, 0)
+
+        # Indeksen til siste måned med en rad, til og med hver måned.
+        filled = np.where(present, np.arange(months)[:, None], 0)
+        np.maximum.accumulate(filled, axis=0, out=filled)
+        result = values[filled[end, columns], columns]
+
+        full = found & (counts[last_row, columns] == n)
+        if full.any():
+            window = np.clip(end[full, None] - np.arange(n - 1, -1, -1), 0, None)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result[full] = full_window(values[window, columns[full, None]])
+        return pl.DataFrame(
+            [
+                groups.filter(pl.Series(found)),
+                pl.Series(self._avg, result[found], nan_to_null=True),
+            ]
         )
 
     def n_percent_rolling(self, n: int, skip: int = 0) -> tuple[str, pl.DataFrame]:
@@ -230,40 +353,16 @@ class DataSource:
 
         def _gen_header(n: int, skip: int = 0):
             """Lager overskrift for hver perioden."""
-            dates = self.data.get_column(self._date).unique().sort()
+            dates = self._unique_dates()
             latest: date = dates[-1 - (skip)]
             oldest: date = dates[-1 - ((skip) + n - 1)]
             return f"{self._create_date(oldest)} - {self._create_date(latest)}"
 
-        def map_test(x: pl.DataFrame):
-            """Lager det rullende gjennomsnittet for hver periodegruppe."""
-            if x.shape[0] != n:
-                x = x.with_columns(
-                    **{self._avg: pl.col(self._col).fill_null(strategy="backward")}
-                )
-            else:
-                x = x.with_columns(
-                    **{
-                        self._avg: self._percent_change(
-                            pl.col(self._col), pl.col(self._col).shift(n - 1)
-                        ).get(-1)
-                    }
-                )
-            return x
-
-        return _gen_header(n, skip), (
-            self.data.rolling(
-                pl.col(self._date),
-                period=f"{n}mo",
-                closed="right",
-                group_by=self._group,
-                offset=f"-{skip+n}mo",
-            )
-            .map_groups(map_test, None)
-            .group_by(self._group)
-            .agg(pl.col(self._avg).tail(1))
-            .explode(self._avg)
-        )
+        def full_window(window: np.ndarray) -> np.ndarray:
+            first, last = window[:, 0], window[:, -1]
+            return ((last - first) / first) * 100
+
+        return _gen_header(n, skip), self._rolling_last_window(n, skip, full_window)
 
     def n_mean_rolling(self, n: int, skip: int = 0) -> tuple[str, pl.DataFrame]:
         """Beregner et rullerende gjennomsnitt for hver gruppe i datasettet og returnerer med datoperiode-header.
@@ -283,34 +382,16 @@ class DataSource:
 
         def _gen_header(n: int, skip: int = 0):
             """Lager overskrift for hver perioden."""
-            dates = self.data.get_column(self._date).unique().sort()
+            dates = self._unique_dates()
             latest: date = dates[-1 - (skip)]
             oldest: date = dates[-1 - ((skip) + n - 1)]
             return f"{self._create_date(oldest)} - {self._create_date(latest)}"
 
-        def map_test(x: pl.DataFrame):
-            """Lager det rullende gjennomsnittet for hver periodegruppe."""
-            if x.shape[0] != n:
-                x = x.with_columns(
-                    **{self._avg: pl.col(self._col).fill_null(strategy="backward")}
-                )
-            else:
-                x = x.with_columns(**{self._avg: pl.col(self._col).mean()})
-            return x
-
-        return _gen_header(n, skip), (
-            self.data.rolling(
-                pl.col(self._date),
-                period=f"{n}mo",
-                closed="right",
-                group_by=self._group,
-                offset=f"-{skip+n}mo",
-            )
-            .map_groups(map_test, None)
-            .group_by(self._group)
-            .agg(pl.col(self._avg).tail(1))
-            .explode(self._avg)
-        )
+        def full_window(window: np.ndarray) -> np.ndarray:
+            counts = (~np.isnan(window)).sum(axis=1)
+            return np.nansum(window, axis=1) / np.where(counts > 0, counts, np.nan)
+
+        return _gen_header(n, skip), self._rolling_last_window(n, skip, full_window)
 
     def n_month_rolling_percent_compare(
         self, n: int, skip: int = 0, skip_1: int = 1
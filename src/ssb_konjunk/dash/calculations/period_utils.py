@@ -5,24 +5,31 @@ from typing import Self
 
 import pendulum
 
+from ssb_konjunk.period import IntPeriod
+
 
 @total_ordering
 class Period:
-    """A class to help transform the period to the rigth formats."""
+    """A class to help transform the period to the rigth formats.
+
+    The period is stored as an `IntPeriod`, so arithmetic on months is integer arithmetic.
+    """
+
+    __slots__ = ("_period",)
 
     def __init__(self, period: str) -> None:
         """A class to help transform the period to the rigth formats."""
-        self._dt = self._period_to_datetime(period)
+        self._period = IntPeriod.parse(period)
 
     @property
     def year(self) -> int:
         """Returnerer året til perioden som et heltall."""
-        return self._dt.year
+        return self._period.parts[0]
 
     @property
     def month(self) -> int:
         """Returnerer måneden til perioden som et heltall (1-12)."""
-        return self._dt.month
+        return self._period.parts[1]
 
     @classmethod
     def from_dt(cls, dt: pendulum.DateTime) -> Self:
@@ -34,21 +41,21 @@ class Period:
         Returns:
             Self: En ny instans av klassen med perioden satt til `dt`.
         """
-        period = period_parser(dt.year, dt.month)
-        return cls(period)
+        return cls.from_int_period(IntPeriod.from_parts(dt.year, dt.month))
 
-    def _period_to_datetime(self, item: str) -> pendulum.DateTime:
-        """Konverterer en periode-streng (YYYY-MM) til et `pendulum.DateTime`-objekt.
+    @classmethod
+    def from_int_period(cls, period: IntPeriod) -> Self:
+        """Oppretter en instans basert på en månedlig `IntPeriod`.
 
         Args:
-            item (str): Periodestreng med format 'YYYY-MM'.
+            period (IntPeriod): Månedlig periode.
 
         Returns:
-            pendulum.DateTime: Dato med første dag i måneden.
+            Self: En ny instans av klassen med perioden satt til `period`.
         """
-        year = int(item[0:4])
-        month = int(item[-2:])
-        return pendulum.datetime(year, month, 1)
+        instance = cls.__new__(cls)
+        instance._period = period
+        return instance
 
     def as_period(self) -> str:
         """Returnerer perioden som en streng i formatet 'YYYY-MM'.
@@ -56,9 +63,7 @@ class Period:
         Returns:
             str: Periodestreng, f.eks. '2026-03'.
         """
-        month = self._dt.format("MM")
-        year = self._dt.format("YYYY")
-        return f"{year}-{month}"
+        return self._period.as_period()
 
     def as_string(self) -> str:
         """Returnerer perioden som en lesbar streng med månedsnavn og år.
@@ -66,9 +71,15 @@ class Period:
         Returns:
             str: Streng, f.eks. 'Mar 2026'.
         """
-        month = self._dt.format("MMM")
-        year = self._dt.format("YYYY")
-        return f"{month} {year}"
+        return f"{self.as_datetime().format('MMM')} {self.year}"
+
+    def as_int_period(self) -> IntPeriod:
+        """Returnerer perioden som en `IntPeriod`.
+
+        Returns:
+            IntPeriod: Månedlig periode.
+        """
+        return self._period
 
     def set_period(
         self: Self,
@@ -81,6 +92,8 @@ class Period:
     ) -> None:
         """Oppdaterer verdier i perioden. Uspesifiserte verdier forblir uendret.
 
+        Perioden er en måned, så bare år og måned påvirker perioden.
+
         Args:
             year (int | None): År.
             month (int | None): Måned (1-12).
@@ -88,9 +101,12 @@ class Period:
             hour (int | None): Time (0-23).
             minute (int | None): Minutt (0-59).
             second (int | None): Sekund (0-59).
+
+        Raises:
+            ValueError: Hvis måneden ikke er mellom 1 og 12.
         """
-        self._dt.set(
-            year=year, month=month, day=day, hour=hour, minute=minute, second=second
+        self._period = IntPeriod.from_parts(
+            self.year if year is None else year, self.month if month is None else month
         )
 
     def as_datetime(self) -> pendulum.DateTime:
@@ -99,7 +115,7 @@ class Period:
         Returns:
             pendulum.DateTime: Dato og tid som representerer perioden.
         """
-        return self._dt
+        return pendulum.datetime(self.year, self.month, 1)
 
     def subtract(
         self: Self,
@@ -130,35 +146,35 @@ class Period:
         Merknader:
             - Alle parametere er valgfrie; 0 betyr ingen endring for komponenten.
             - Negativt tall vil i praksis legge til tilsvarende tid.
+            - Bare år og måneder trekkes fra som heltall, ellers brukes pendulum.
         """
+        if not any([weeks, days, hours, minutes, seconds, microseconds]):
+            return Period.from_int_period(self._period - (years * 12 + months))
         return Period.from_dt(
-            self._dt.subtract(
+            self.as_datetime().subtract(
                 years, months, weeks, days, hours, minutes, seconds, microseconds
             )
         )
 
     def __hash__(self) -> int:
         """Returnerer has verdien til objectet."""
-        return hash(str(self))
+        return hash(self._period)
 
     def __eq__(self, other: object) -> bool:
         """Sjekker om dette objektet er likt et annet basert på perioden."""
         if not isinstance(other, type(self)):
             return NotImplemented
-        return self._dt == other._dt
+        return self._period == other._period
 
     def __lt__(self, other: object) -> bool:
         """Sjekker om dette objektets periode er mindre enn et annet objekt sin periode."""
         if not isinstance(other, type(self)):
             return NotImplemented
 
-        return self._dt < other._dt
-
-    def _as_string(self) -> str:
-        return self._dt.format("YYYY-MM")
+        return self._period < other._period
 
     def __as_string_repr(self) -> str:
-        return f"Period<{self.as_period()}, {self._as_string()}>"
+        return f"Period<{self.as_period()}>"
 
     def __str__(self) -> str:
         """Returnerer en lesbar strengrepresentasjon av objektet."""
@@ -222,14 +238,8 @@ class AllPeriods:
         Returns:
             list[Period]: Liste med `Period`-objekter fra n måneder tilbake til nå.
         """
-        dt = pendulum.now()
-        result = []
-        for i in range(n_months - 1, -1, -1):
-            selected_period = dt.subtract(months=i)
-            period = Period.from_dt(selected_period)
-            result.append(period)
-
-        return result
+        latest = Period.from_dt(pendulum.now())
+        return [latest.subtract(months=i) for i in range(n_months - 1, -1, -1)]
 
     def create_period_range(
         self,
@@ -248,17 +258,11 @@ class AllPeriods:
             list[Period]: Liste med `Period`-objekter.
         """
         if year and month:
-            dt = pendulum.local(year, month, 1)
+            latest = Period.from_int_period(IntPeriod.from_parts(year, month))
         else:
-            dt = self.get_latest().as_datetime()
-
-        result = []
-        for i in range(n_months - 1, -1, -1):
-            selected_period = dt.subtract(months=i)
-            period = Period.from_dt(selected_period)
-            result.append(period)
+            latest = self.get_latest()
 
-        return result
+        return [latest.subtract(months=i) for i in range(n_months - 1, -1, -1)]
 
     def __str__(self) -> str:
         """Returnerer en lesbar strengrepresentasjon av alle perioder i objektet."""
@@ -289,10 +293,5 @@ def create_period_range_list(year: int, month: int, n_months: int) -> list[str]:
     Returns:
         list[str]: Liste med periodestrenger i format 'YYYYMmm'.
     """
-    result = []
-    dt = pendulum.local(year, month, 1)
-    for i in range(n_months, -1, -1):
-        selected_period = dt.subtract(months=i)
-        period = period_parser(selected_period.year, selected_period.month)
-        result.append(period)
-    return result
+    latest = IntPeriod.from_parts(year, month)
+    return [(latest - i).as_code() for i in range(n_months, -1, -1)]
@@ -25,9 +25,25 @@ class DatasetConfig:
     agg_type: Literal["SUMMED", "AVERAGE"] = "SUMMED"
     agg_type_by_col: dict[str, AGG_TYPES] | None = field(default=None)
 
-    def get_entries(self) -> list:
-        """Returnerer en liste med filer som matcher glob-mønsteret."""
-        return glob.glob(self.glob_pattern)
+    def get_entries(
+        self, periode: tuple[int, ...] | None = None, frequency: str = "M"
+    ) -> list:
+        """Returnerer en liste med filer som matcher glob-mønsteret.
+
+        Args:
+            periode (tuple[int, ...] | None): Valgfri periode. Hvis gitt, returneres bare
+                filer med SSB-tidsstempel som overlapper perioden.
+            frequency (str): Frekvensen til perioden, f.eks. 'M'.
+
+        Returns:
+            list: Filstier som matcher glob-mønsteret.
+        """
+        files = glob.glob(self.glob_pattern)
+        if periode is None:
+            return files
+        from ssb_konjunk.saving import PeriodIndex
+
+        return PeriodIndex(files).overlapping(periode, frequency)
 
 
 def load_datasets(config_path: str) -> dict[str, DatasetConfig]:
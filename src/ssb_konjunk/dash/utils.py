@@ -10,18 +10,30 @@ from ssb_konjunk.dash.calculations.calc_data import get_data_manager
 
 _config = None
 _get_data_manager = None
+_warm_up_periods = 0
 
 
-def setup(config: type[Any], data_manager_class: Any = get_data_manager) -> None:
+def setup(
+    config: type[Any],
+    data_manager_class: Any = get_data_manager,
+    warm_up_periods: int = 0,
+) -> None:
     """Setter global konfigurasjon for modulen.
 
     Args:
         config (type[Config]): Klassen som inneholder konfigurasjonsinnstillinger.
+        data_manager_class (Any): Funksjon eller klasse som lager en `DataManager` fra en filbane.
+            Standard er `get_data_manager`.
+        warm_up_periods (int): Antall av de siste periodene som beregnes i bakgrunnen med
+            `DataManager.warm_up` når en fil lastes. Standard er 0, som ikke beregner noe
+            på forhånd.
     """
     global _config
     global _get_data_manager
+    global _warm_up_periods
     _config = config
     _get_data_manager = data_manager_class
+    _warm_up_periods = warm_up_periods
 
 
 @cache
@@ -48,9 +60,26 @@ def get_data(file: str | None = None) -> DataManager:
         )
 
     if file == "old":
-        return _get_data_manager(_config.select_file(1))
+        return _load_data_manager(_get_data_manager, _config.select_file(1))
     else:
-        return _get_data_manager(_config.data_path())
+        return _load_data_manager(_get_data_manager, _config.data_path())
+
+
+@cache
+def _load_data_manager(data_manager_class: Any, path: str) -> DataManager:
+    """Henter DataManager for en fil og starter forhåndsberegningen én gang per fil.
+
+    Args:
+        data_manager_class (Any): Funksjonen eller klassen fra `setup`.
+        path (str): Filbane til datasettet.
+
+    Returns:
+        DataManager: Instansen som `data_manager_class` lager for filen.
+    """
+    data_manager = data_manager_class(path)
+    if _warm_up_periods > 0:
+        data_manager.warm_up(_warm_up_periods)
+    return data_manager
 
 
 @cache
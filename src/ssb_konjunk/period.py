@@ -0,0 +1,346 @@
+"""Compact integer representation of periods.
+
+A period is stored as one integer per frequency, e.g. year * 12 + month - 1 for
+months, so arithmetic on periods is integer arithmetic. The conversions to and
+from the string formats used in the package, like '2024-03', '2024M03' and
+'p2024-03', are also vectorised with polars.
+"""
+
+import re
+from collections.abc import Iterable
+from datetime import date
+from datetime import timedelta
+from functools import total_ordering
+from typing import Any
+from typing import Literal
+from typing import Self
+from typing import overload
+
+import polars as pl
+
+# Number of periods in a year for the frequencies dividing the year evenly.
+PERIODS_IN_YEAR = {"Y": 1, "H": 2, "T": 3, "Q": 4, "B": 6, "M": 12}
+FREQUENCIES = [*PERIODS_IN_YEAR, "W", "D"]
+
+# The maximum value, name, prefix and width of the sub-periods of each frequency.
+SUB_PERIODS = {
+    "W": (52, "week", "-W", 2),
+    "M": (12, "month", "-", 2),
+    "B": (6, "term", "-B", 1),
+    "Q": (4, "quarter", "-Q", 1),
+    "T": (3, "trimester", "-T", 1),
+    "H": (2, "half_year", "-H", 1),
+}
+
+# Days and weeks are counted from 1970-01-01, weeks from the monday before it.
+_EPOCH = date(1970, 1, 1)
+_EPOCH_WEEKDAY = 3
+
+# Year, letter, sub-period and day of e.g. '2024', '2024-03', '2024M03', 'p2024-Q1', '2024-W05' and '2024-01-02'.
+_PERIOD_REGEX = (
+    r"^p?(?P<year>\d{4})"
+    r"(?:(?:-(?P<prefix>[A-Z])?|(?P<code>[A-Z]))(?P<sub>\d{1,2})(?:-(?P<day>\d{2}))?)?$"
+)
+_PERIOD_PATTERN = re.compile(_PERIOD_REGEX)
+
+# Letters allowed before the sub-period of each frequency, '' for e.g. '2024-03'.
+_LETTERS = {
+    "Y": [""],
+    "D": [""],
+    "M": ["", "M"],
+    **{frequency: [frequency] for frequency in ["H", "T", "Q", "B", "W"]},
+}
+
+Style = Literal["period", "code", "timestamp"]
+
+
+def _check_frequency(frequency: str) -> None:
+    """Check that the frequency is supported."""
+    if frequency not in FREQUENCIES:
+        raise ValueError(
+            f"Frequency '{frequency}' is not supported, use one of {FREQUENCIES}."
+        )
+
+
+@total_ordering
+class IntPeriod:
+    """A period of a frequency, stored as one integer.
+
+    The ordinal is year * n + sub-period - 1 for the frequencies with n periods
+    in a year, e.g. year * 12 + month - 1 for months and the year for years.
+    Weeks and days are counted from 1970-01-01.
+
+    Example:
+        >>> period = IntPeriod.from_parts(2023, 12)
+        >>> (period + 1).as_period()
+        '2024-01'
+        >>> IntPeriod.parse("2024M03") - period
+        3
+    """
+
+    __slots__ = ("frequency", "ordinal")
+
+    def __init__(self, ordinal: int, frequency: str = "M") -> None:
+        """Create a period from its ordinal.
+
+        Args:
+            ordinal: The number of the period, e.g. year * 12 + month - 1 for months.
+            frequency: Frequency of the period, Y, H, T, Q, B, M, W or D. Default: 'M'.
+        """
+        _check_frequency(frequency)
+        self.ordinal = ordinal
+        self.frequency = frequency
+
+    @classmethod
+    def from_parts(cls, *args: int, frequency: str = "M") -> Self:
+        """Create a period from year and sub-period, like the args to get_ssb_timestamp.
+
+        Args:
+            args: The year, the sub-period for all frequencies except Y, and the day for D.
+            frequency: Frequency of the period. Default: 'M'.
+
+        Returns:
+            IntPeriod: The period.
+
+        Raises:
+            ValueError: If the number of args does not match the frequency, or the
+                sub-period or day is out of range.
+        """
+        _check_frequency(frequency)
+        expected = {"Y": 1, "D": 3}.get(frequency, 2)
+        if len(args) != expected:
+            raise ValueError(
+                f"Frequency '{frequency}' needs {expected} args, got {len(args)}: {args}."
+            )
+        if frequency == "D":
+            return cls((date(*args) - _EPOCH).days, frequency)
+        if frequency == "W":
+            monday = date.fromisocalendar(args[0], args[1], 1)
+            return cls(((monday - _EPOCH).days + _EPOCH_WEEKDAY) // 7, frequency)
+        year, sub = (args[0], 1) if frequency == "Y" else args
+        if not 1 <= sub <= PERIODS_IN_YEAR[frequency]:
+            raise ValueError(
+                f"Sub-period {sub} is out of range for frequency '{frequency}'."
+            )
+        return cls(year * PERIODS_IN_YEAR[frequency] + sub - 1, frequency)
+
+    @classmethod
+    def parse(cls, text: str, frequency: str = "M") -> Self:
+        """Create a period from a string, like '2024-03', '2024M03' or 'p2024-Q1'.
+
+        Args:
+            text: The period as a string.
+            frequency: Frequency of the period. Default: 'M'.
+
+        Returns:
+            IntPeriod: The period.
+
+        Raises:
+            ValueError: If the string is not a period of the frequency.
+        """
+        _check_frequency(frequency)
+        match = _PERIOD_PATTERN.match(text)
+        if match is None:
+            raise ValueError(f"Could not parse the period '{text}'.")
+        letter = match["prefix"] or match["code"] or ""
+        if match["sub"] is not None and letter not in _LETTERS[frequency]:
+            raise ValueError(
+                f"The period '{text}' does not have the frequency '{frequency}'."
+            )
+        parts = [
+            int(match[group])
+            for group in ("year", "sub", "day")
+            if match[group] is not None
+        ]
+        return cls.from_parts(*parts, frequency=frequency)
+
+    @property
+    def parts(self) -> tuple[int, ...]:
+        """The year and sub-period of the period, like the args to get_ssb_timestamp."""
+        if self.frequency == "D":
+            day = _EPOCH + timedelta(days=self.ordinal)
+            return day.year, day.month, day.day
+        if self.frequency == "W":
+            monday = _EPOCH + timedelta(days=self.ordinal * 7 - _EPOCH_WEEKDAY)
+            year, week, _ = monday.isocalendar()
+            return year, week
+        if self.frequency == "Y":
+            return (self.ordinal,)
+        year, sub = divmod(self.ordinal, PERIODS_IN_YEAR[self.frequency])
+        return year, sub + 1
+
+    @property
+    def year(self) -> int:
+        """The year of the period."""
+        return self.parts[0]
+
+    def as_period(self) -> str:
+        """Format the period like '2024-03', '2024-Q1', '2024-W05' or '2024'."""
+        parts = self.parts
+        if self.frequency == "Y":
+            return str(parts[0])
+        if self.frequency == "D":
+            return f"{parts[0]}-{parts[1]:02d}-{parts[2]:02d}"
+        _, _, prefix, width = SUB_PERIODS[self.frequency]
+        return f"{parts[0]}{prefix}{parts[1]:0{width}d}"
+
+    def as_code(self) -> str:
+        """Format the period like '2024M03', '2024Q1' or '2024'.
+
+        Raises:
+            ValueError: If the frequency is D, which has no code.
+        """
+        parts = self.parts
+        if self.frequency == "Y":
+            return str(parts[0])
+        if self.frequency == "D":
+            raise ValueError("Daily periods can not be formatted as a code.")
+        width = SUB_PERIODS[self.frequency][3]
+        return f"{parts[0]}{self.frequency}{parts[1]:0{width}d}"
+
+    def as_ssb_timestamp(self) -> str:
+        """Format the period as a SSB timestamp, like 'p2024-03'."""
+        return f"p{self.as_period()}"
+
+    def __add__(self, other: int) -> Self:
+        """Move the period a number of periods forward."""
+        if not isinstance(other, int):
+            return NotImplemented
+        return type(self)(self.ordinal + other, self.frequency)
+
+    __radd__ = __add__
+
+    @overload
+    def __sub__(self, other: int) -> Self: ...
+
+    @overload
+    def __sub__(self, other: "IntPeriod") -> int: ...
+
+    def __sub__(self, other: object) -> Any:
+        """Move the period back a number of periods, or count the periods between two periods."""
+        if isinstance(other, int):
+            return type(self)(self.ordinal - other, self.frequency)
+        if isinstance(other, IntPeriod):
+            self._check_same_frequency(other)
+            return self.ordinal - other.ordinal
+        return NotImplemented
+
+    def _check_same_frequency(self, other: "IntPeriod") -> None:
+        """Check that two periods can be compared."""
+        if self.frequency != other.frequency:
+            raise ValueError(
+                f"Can not compare periods with frequency '{self.frequency}' and '{other.frequency}'."
+            )
+
+    def __eq__(self, other: object) -> bool:
+        """Check if two periods are the same."""
+        if not isinstance(other, IntPeriod):
+            return NotImplemented
+        return (self.ordinal, self.frequency) == (other.ordinal, other.frequency)
+
+    def __lt__(self, other: object) -> bool:
+        """Check if the period is before another period."""
+        if not isinstance(other, IntPeriod):
+            return NotImplemented
+        self._check_same_frequency(other)
+        return self.ordinal < other.ordinal
+
+    def __hash__(self) -> int:
+        """Hash of the ordinal and frequency."""
+        return hash((self.ordinal, self.frequency))
+
+    def __repr__(self) -> str:
+        """Readable representation of the period."""
+        return f"IntPeriod('{self.as_period()}', '{self.frequency}')"
+
+
+def to_ordinals(periods: Iterable[str] | pl.Series, frequency: str = "M") -> pl.Series:
+    """Function to convert many period strings to ordinals at once.
+
+    Args:
+        periods: Periods as strings, like '2024-03', '2024M03' or 'p2024-03'.
+        frequency: Frequency of the periods. Default: 'M'.
+
+    Returns:
+        pl.Series: The ordinals, missing for strings that are not periods of the frequency.
+
+    Example:
+        >>> to_ordinals(["2024-01", "2024M02"]).to_list()
+        [24288, 24289]
+    """
+    _check_frequency(frequency)
+    series = periods if isinstance(periods, pl.Series) else pl.Series(list(periods))
+    parts = series.cast(pl.String).str.extract_groups(_PERIOD_REGEX).struct.unnest()
+    year = pl.col("year").cast(pl.Int32)
+    sub = pl.col("sub").cast(pl.Int32)
+    letter = pl.coalesce("prefix", "code", pl.lit(""))
+    valid = letter.is_in(_LETTERS[frequency]) & (
+        pl.col("day").is_not_null() if frequency == "D" else pl.col("day").is_null()
+    )
+    if frequency == "D":
+        day = pl.format("{}-{}-{}", year, pl.col("sub").str.zfill(2), pl.col("day"))
+        ordinal = day.str.strptime(pl.Date, "%Y-%m-%d", strict=False).cast(pl.Int32)
+    elif frequency == "W":
+        monday = pl.format("{}-W{}-1", year, pl.col("sub").str.zfill(2)).str.strptime(
+            pl.Date, "%G-W%V-%u", strict=False
+        )
+        # Weeks past the last week of the year are parsed as weeks of the next year.
+        valid &= monday.dt.iso_year() == year
+        ordinal = (monday.cast(pl.Int32) + _EPOCH_WEEKDAY) // 7
+    elif frequency == "Y":
+        valid &= sub.is_null()
+        ordinal = year
+    else:
+        valid &= sub.is_between(1, PERIODS_IN_YEAR[frequency])
+        ordinal = year * PERIODS_IN_YEAR[frequency] + sub - 1
+    ordinal = pl.when(valid).then(ordinal).cast(pl.Int32)
+    return parts.select(ordinal.alias(series.name)).to_series()
+
+
+def from_ordinals(
+    ordinals: Iterable[int] | pl.Series, frequency: str = "M", style: Style = "period"
+) -> pl.Series:
+    """Function to convert many ordinals to period strings at once.
+
+    Args:
+        ordinals: Ordinals of periods, e.g. from to_ordinals.
+        frequency: Frequency of the periods. Default: 'M'.
+        style: 'period' for '2024-03', 'code' for '2024M03' or 'timestamp' for 'p2024-03'. Default: 'period'.
+
+    Returns:
+        pl.Series: The periods as strings.
+
+    Raises:
+        ValueError: If the style is unknown, or the style is 'code' for daily periods.
+
+    Example:
+        >>> from_ordinals([24288, 24289], style="code").to_list()
+        ['2024M01', '2024M02']
+    """
+    _check_frequency(frequency)
+    if style not in ("period", "code", "timestamp"):
+        raise ValueError(f"Unknown style '{style}'.")
+    if style == "code" and frequency == "D":
+        raise ValueError("Daily periods can not be formatted as a code.")
+    series = ordinals if isinstance(ordinals, pl.Series) else pl.Series(list(ordinals))
+    ordinal = pl.col(series.name).cast(pl.Int32)
+
+    if frequency == "D":
+        period = ordinal.cast(pl.Date).dt.strftime("%Y-%m-%d")
+    elif frequency == "Y":
+        period = ordinal.cast(pl.String)
+    else:
+        if frequency == "W":
+            monday = (ordinal * 7 - _EPOCH_WEEKDAY).cast(pl.Date)
+            year, sub = monday.dt.iso_year(), monday.dt.week()
+        else:
+            year = ordinal.floordiv(PERIODS_IN_YEAR[frequency])
+            sub = ordinal.mod(PERIODS_IN_YEAR[frequency]) + 1
+        _, _, prefix, width = SUB_PERIODS[frequency]
+        separator = frequency if style == "code" else prefix
+        period = pl.format(
+            "{}{}{}", year, pl.lit(separator), sub.cast(pl.String).str.zfill(width)
+        )
+    if style == "timestamp":
+        period = pl.lit("p") + period
+    return series.to_frame().select(period.alias(series.name)).to_series()
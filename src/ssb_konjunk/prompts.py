@@ -10,6 +10,8 @@ from typing import Any
 
 import pendulum
 
+from ssb_konjunk.period import IntPeriod
+
 
 def _input_valid_int() -> int:
     """Input function for valid int.
@@ -217,13 +219,10 @@ def iterate_years_months(
             "If iterating in same year start month must be less than end month."
         )
 
-    for year in range(start_year, end_year + 1):
-        for month in range(1, 13):
-            if (year == start_year and month < start_month) or (
-                year == end_year and month > end_month
-            ):
-                continue
-            yield year, month
+    start = IntPeriod.from_parts(start_year, start_month)
+    end = IntPeriod.from_parts(end_year, end_month)
+    for ordinal in range(start.ordinal, end.ordinal + 1):
+        yield IntPeriod(ordinal).parts
 
 
 def bump_quarter(year: int, quarter: int) -> tuple[int, int]:
@@ -238,13 +237,9 @@ def bump_quarter(year: int, quarter: int) -> tuple[int, int]:
     Returns:
         tuple: The year and quarter with an "added" quarter.
     """
-    if quarter == 4:
-        bumped_quarter = 1
-        bumped_year = year + 1
-    else:
-        bumped_quarter = quarter + 1
-        bumped_year = year
-
+    bumped_year, bumped_quarter = (
+        IntPeriod.from_parts(year, quarter, frequency="Q") + 1
+    ).parts
     return bumped_year, bumped_quarter
 
 
@@ -405,12 +400,5 @@ def get_previous_month(year: str | int, month: str | int) -> list[int]:
     Returns:
         list[int]: the previous month with year.
     """
-    prev_month = int(month) - 1
-
-    if prev_month != 0:
-        prev_year = int(year)
-    else:
-        prev_month = 12
-        prev_year = int(year) - 1
-
+    prev_year, prev_month = (IntPeriod.from_parts(int(year), int(month)) - 1).parts
     return [prev_year, prev_month]
@@ -3,17 +3,193 @@
 Follows the the standardization for versioning and names.
 """
 
+import asyncio
+import functools
 import glob
+import hashlib
+import io
 import json
+import os
 import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
 import warnings
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from itertools import chain
 from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+from typing import Literal
+from typing import NamedTuple
 
+import fsspec
+import numpy as np
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+from fsspec import AbstractFileSystem
 from gcsfs import GCSFileSystem
 
 from ssb_konjunk import timestamp
 
+VERSION_INDEX_NAME = ".ssb_versions.json"
+# Lists the fragments of a partitioned dataset, ignored by pyarrow as it starts with '_'.
+DATASET_MANIFEST_NAME = "_manifest.json"
+# Seconds a lock on the version index is waited for before it is taken over.
+LOCK_TIMEOUT = 30.0
+# Seconds a listing of a folder is reused before the folder is listed again.
+LISTING_CACHE_TTL = 60.0
+
+_VERSION_PATTERN = re.compile(
+    r"^(?P<base_path>.+?_(?P<timestamp>p\d{4}[^_/]*(?:_p\d{4}[^_/]*)?)_)v(?P<version>\d+)\.(?P<filetype>\w+)$"
+)
+_listing_cache: dict[str, tuple[float, list["_FileVersion"]]] = {}
+
+Engine = Literal["pandas", "polars", "pyarrow"]
+_POLARS_PARQUET_OPTIONS = {"compression", "compression_level", "row_group_size"}
+
+
+class _FileVersion(NamedTuple):
+    """A versioned file parsed from its path."""
+
+    path: str
+    base_path: str
+    timestamp: str
+    version: int
+    filetype: str
+
+
+def _get_fs(path: str) -> AbstractFileSystem | None:
+    """Get the filesystem object for a path, None for local paths.
+
+    The filesystem is created once per process and protocol, e.g. 'gs', so
+    sessions, connections and credentials are reused by all calls.
+    """
+    protocol, separator, _ = path.partition("://")
+    if not separator:
+        return None
+    return _filesystem(protocol, os.getpid())
+
+
+@functools.cache
+def _filesystem(protocol: str, pid: int) -> AbstractFileSystem:
+    """Create the filesystem object for a protocol, cached per process id.
+
+    The process id is part of the key, since the sessions can not be shared
+    with forked processes.
+    """
+    if protocol in ["gs", "gcs"]:
+        return GCSFileSystem()
+    return fsspec.filesystem(protocol)
+
+
+def _strip_protocol(path: str, fs: AbstractFileSystem | None = None) -> str:
+    """Remove the protocol from a path, for libraries that get the filesystem object."""
+    return str(fs._strip_protocol(path)) if fs else path
+
+
+def _makedirs(folder_path: str, fs: AbstractFileSystem | None = None) -> None:
+    """Create a folder and its parents if they do not exist."""
+    if fs:
+        fs.makedirs(folder_path, exist_ok=True)
+    else:
+        Path(folder_path).mkdir(parents=True, exist_ok=True)
+
+
+class FileCache:
+    """Local read-through disk cache for remote files.
+
+    Files are cached by their full path and the generation of the object, so a
+    new upload to the same path, like an overwritten version 0, is downloaded
+    again. When the cache is larger than max_bytes, the least recently used
+    files are removed.
+
+    Example:
+        >>> cache = FileCache("/tmp/ssb_cache", max_bytes=5 * 1024**3)  # doctest: +SKIP
+        >>> df = read_ssb_file((2024, 3), "M", "gs://bucket", "vhi", "vhi", "inndata", cache=cache)  # doctest: +SKIP
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 10 * 1024**3) -> None:
+        """Create a cache in a local folder.
+
+        Args:
+            cache_dir: Local folder to store the cached files in.
+            max_bytes: Maximum total size of the cached files. Default: 10 GB.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, path: str, fs: AbstractFileSystem) -> str:
+        """Get the local path to a cached copy of a remote file.
+
+        Args:
+            path: Path to the remote file.
+            fs: Filesystem object for the remote file.
+
+        Returns:
+            str: Path to the local copy of the file.
+        """
+        info = fs.info(path)
+        generation = next(
+            (
+                info[key]
+                for key in ["generation", "etag", "mtime", "created"]
+                if info.get(key)
+            ),
+            info.get("size"),
+        )
+        key = hashlib.sha256(f"{path}#{generation}".encode()).hexdigest()
+        local_path = self.cache_dir / f"{key}{Path(path).suffix}"
+        if local_path.exists():
+            # Mark the file as recently used.
+            os.utime(local_path)
+            return str(local_path)
+
+        temp_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            fs.get_file(path, str(temp_path))
+            os.replace(temp_path, local_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        self._evict(keep=local_path)
+        return str(local_path)
+
+    def _evict(self, keep: Path) -> None:
+        """Remove the least recently used files until the cache is small enough."""
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+            total = sum(size for _, size, _ in files)
+            for _, size, file in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if file != keep:
+                    file.unlink(missing_ok=True)
+                    total -= size
+
+    def clear(self) -> None:
+        """Remove all cached files."""
+        with self._lock:
+            for file in self.cache_dir.iterdir():
+                file.unlink(missing_ok=True)
+
 
 def _remove_edge_slashes(input_string: str, only_last: bool = False) -> str:
     """Function to remove edge slashes in strings.
@@ -97,37 +273,418 @@ def _structure_ssb_filepath(
     return file_path
 
 
-def _get_files(
-    folder_path: str, filetype: str, fs: GCSFileSystem | None = None
-) -> list[str]:
-    """Function to list files in a folder based on base name and timestamp."""
-    filenames = []
+def _parse_file_version(path: str) -> _FileVersion | None:
+    """Parse base path, timestamp, version number and filetype from a file path."""
+    match = _VERSION_PATTERN.match(path)
+    if not match:
+        return None
+    return _FileVersion(
+        path=path,
+        base_path=match.group("base_path"),
+        timestamp=match.group("timestamp"),
+        version=int(match.group("version")),
+        filetype=match.group("filetype"),
+    )
+
+
+def _list_versions(
+    folder_path: str, fs: AbstractFileSystem | None = None, refresh: bool = False
+) -> list[_FileVersion]:
+    """List and parse all versioned files in a folder.
+
+    The listing is cached per folder for LISTING_CACHE_TTL seconds, so reading
+    many files from the same folder only lists the folder once. Writers use
+    refresh=True to list the folder again, since files written by other
+    processes are not in the cached listing, and a version must not be reused.
+    """
+    cached = None if refresh else _cached_versions(folder_path)
+    if cached is not None:
+        return cached
 
-    match_string = f"{folder_path}*"
+    match_string = f"{folder_path}/*"
     if fs:
         filenames = fs.glob(match_string)
     else:
         filenames = glob.glob(match_string)
+    return _cache_versions(folder_path, filenames, fs)
+
+
+def _cached_versions(folder_path: str) -> list[_FileVersion] | None:
+    """Get the cached listing of a folder, None if missing or expired."""
+    cached = _listing_cache.get(folder_path)
+    if cached is not None and time.monotonic() - cached[0] < LISTING_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def _cache_versions(
+    folder_path: str, filenames: list[str], fs: Any = None
+) -> list[_FileVersion]:
+    """Parse, sort and cache the listed files of a folder."""
+    if fs:
+        # Filesystem objects list paths without the protocol, e.g. 'gs://'.
+        filenames = [f"{folder_path}/{f.rsplit('/', 1)[-1]}" for f in filenames]
+    versions = [v for f in filenames if (v := _parse_file_version(f)) is not None]
+    versions.sort(key=lambda v: (v.base_path, v.version))
+    _listing_cache[folder_path] = (time.monotonic(), versions)
+    return versions
+
+
+def _invalidate_listing_cache(folder_path: str) -> None:
+    """Remove the cached listing of a folder, e.g. after writing to it."""
+    _listing_cache.pop(folder_path, None)
+
+
+def _get_files(
+    folder_path: str,
+    filetype: str,
+    fs: AbstractFileSystem | None = None,
+    refresh: bool = False,
+) -> list[str]:
+    """Function to list files in a folder based on base name and timestamp.
+
+    With refresh=True the folder is listed again, for finding the version to write.
+    """
+    folder, _ = folder_path.rsplit("/", 1)
+
+    # Only include files with the same base name and the relevant file extension,
+    # already sorted according to version numbers.
+    return [
+        v.path
+        for v in _list_versions(folder, fs, refresh)
+        if v.base_path == folder_path and v.filetype == filetype
+    ]
+
+
+def _version_sort_key(path: str) -> int:
+    """Sort key ordering file paths by their version number."""
+    version = _parse_file_version(path)
+    return version.version if version else -1
+
+
+_EPOCH = date(1970, 1, 1)
+
+
+class PeriodIndex:
+    """Index of files at SSB-format by the periods they cover.
+
+    The files are sorted by the first day of their period, so the files
+    overlapping, containing or within a period are found with binary search,
+    instead of parsing every file name again. Files not at SSB-format are
+    ignored.
 
-    # Only include files with the relevant file extension
-    filenames = [i for i in filenames if i.endswith(filetype)]
+    Example:
+        >>> index = PeriodIndex.from_folder(f"{bucket}/vhi/inndata")  # doctest: +SKIP
+        >>> index.latest().overlapping((2023, 1, 2023, 12), "M")  # doctest: +SKIP
+        >>> df = read_ssb_file((2024, 3), "M", bucket, "vhi", "vhi", "inndata", period_index=index)  # doctest: +SKIP
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        """Create an index of file paths.
+
+        Args:
+            paths: Paths to files, e.g. from a listing of a folder.
+        """
+        # Files that are not at SSB-format, or have a period out of range, have no dates.
+        files = timestamp.parse_ssb_filenames(paths).drop_nulls(
+            ["start_date", "end_date"]
+        )
+        self._set_files(files)
+
+    @classmethod
+    def from_folder(
+        cls, folder_path: str, fs: AbstractFileSystem | None = None
+    ) -> "PeriodIndex":
+        """Create an index of the versioned files in a folder.
+
+        Args:
+            folder_path: Path to the folder, e.g. 'gs://bucket/vhi/inndata'.
+            fs: Filesystem object for the folder. Default: found from the path.
+
+        Returns:
+            PeriodIndex: Index of the files in the folder.
+        """
+        if fs is None:
+            fs = _get_fs(folder_path)
+        return cls(v.path for v in _list_versions(folder_path, fs))
+
+    def _set_files(self, files: pl.DataFrame) -> None:
+        """Sort the parsed files and make the arrays used for searching."""
+        # The path without version and filetype, like _structure_ssb_filepath makes it.
+        base_path = pl.col("path").str.replace(r"v\d+(\.\w+)?$", "")
+        self._files = files.with_columns(base_path.alias("base_path")).sort(
+            "start_date", "end_date", "path"
+        )
+        days = self._files.select(
+            pl.col("start_date").cast(pl.Int32), pl.col("end_date").cast(pl.Int32)
+        )
+        self._paths: list[str] = self._files["path"].to_list()
+        self._starts = days["start_date"].to_numpy()
+        self._ends = days["end_date"].to_numpy()
+        # The longest period limits how early a file overlapping a date can start.
+        self._max_days = int((self._ends - self._starts).max()) if len(self) else 0
+
+        self._versions: dict[tuple[str, str], list[str]] = {}
+        versioned = self._files.filter(pl.col("version").is_not_null()).sort("version")
+        for path, base_path, filetype in versioned.select(
+            "path", "base_path", "filetype"
+        ).iter_rows():
+            self._versions.setdefault((base_path, filetype), []).append(path)
+
+    def __len__(self) -> int:
+        """Number of files in the index."""
+        return len(self._paths)
+
+    @staticmethod
+    def _days(periode: tuple[int, ...], frequency: str) -> tuple[int, int]:
+        """First and last day of a period as days since 1970-01-01."""
+        start, end = timestamp.get_period_dates(*periode, frequency=frequency)
+        return (start - _EPOCH).days, (end - _EPOCH).days
+
+    def _search(self, lowest_start: int, highest_start: int) -> slice:
+        """Slice of the files starting between two days."""
+        low = int(np.searchsorted(self._starts, lowest_start, side="left"))
+        high = int(np.searchsorted(self._starts, highest_start, side="right"))
+        return slice(low, high)
+
+    def _select(self, rows: slice, mask: np.ndarray) -> list[str]:
+        """Paths of the rows in a slice where the mask is True."""
+        return [self._paths[i] for i in np.flatnonzero(mask) + rows.start]
+
+    def overlapping(self, periode: tuple[int, ...], frequency: str) -> list[str]:
+        """Find the files with a period overlapping the period.
+
+        Args:
+            periode: Up to six arguments with int, like the periode to read_ssb_file.
+            frequency: Frequency of the period, e.g. 'M'.
+
+        Returns:
+            list[str]: Paths to the files, sorted by the start of their period.
+        """
+        start, end = self._days(periode, frequency)
+        rows = self._search(start - self._max_days, end)
+        return self._select(rows, self._ends[rows] >= start)
+
+    def containing(self, periode: tuple[int, ...], frequency: str) -> list[str]:
+        """Find the files with a period containing the whole period.
+
+        Args:
+            periode: Up to six arguments with int, like the periode to read_ssb_file.
+            frequency: Frequency of the period, e.g. 'M'.
+
+        Returns:
+            list[str]: Paths to the files, sorted by the start of their period.
+        """
+        start, end = self._days(periode, frequency)
+        rows = self._search(end - self._max_days, start)
+        return self._select(rows, self._ends[rows] >= end)
+
+    def within(self, periode: tuple[int, ...], frequency: str) -> list[str]:
+        """Find the files with a period inside the period.
+
+        Args:
+            periode: Up to six arguments with int, like the periode to read_ssb_file.
+            frequency: Frequency of the period, e.g. 'M'.
+
+        Returns:
+            list[str]: Paths to the files, sorted by the start of their period.
+        """
+        start, end = self._days(periode, frequency)
+        rows = self._search(start, end)
+        return self._select(rows, self._ends[rows] <= end)
+
+    def latest(self) -> "PeriodIndex":
+        """Index of only the newest version of each file and period.
+
+        Returns:
+            PeriodIndex: A new index without the older versions.
+        """
+        version = pl.col("version").fill_null(-1)
+        files = self._files.filter(
+            version == version.max().over("base_path", "filetype")
+        )
+        index = PeriodIndex.__new__(PeriodIndex)
+        index._set_files(files)
+        return index
+
+    def versions(self, file_path: str, filetype: str) -> list[str]:
+        """Find all versions of a file, like listing the folder would.
+
+        Args:
+            file_path: Path to the file without version and filetype, ending with '_'.
+            filetype: Filetype of the file, e.g. 'parquet'.
+
+        Returns:
+            list[str]: Paths to the versions, sorted by version number.
+        """
+        return list(self._versions.get((file_path, filetype), []))
+
+
+def _version_index_path(file_path: str) -> str:
+    """Get the path to the version index for the folder of a file path."""
+    folder_path = file_path.rsplit("/", 1)[0]
+    return f"{folder_path}/{VERSION_INDEX_NAME}"
 
-    # Sorts the filenames according to version numbers.
-    filenames.sort()
 
+def _exists(path: str, fs: AbstractFileSystem | None = None) -> bool:
+    """Check if a file exists, either through the filesystem object or locally."""
+    if fs:
+        return bool(fs.exists(path))
+    return os.path.exists(path)
+
+
+def _open(path: str, mode: str, fs: AbstractFileSystem | None = None) -> Any:
+    """Open a file either through the filesystem object or locally."""
+    if fs:
+        return fs.open(path, mode)
+    return open(path, mode)
+
+
+def _read_version_index(
+    index_path: str, fs: AbstractFileSystem | None = None
+) -> dict[str, list[str]] | None:
+    """Read the version index for a folder, None if it does not exist or is corrupt."""
+    try:
+        with _open(index_path, "r", fs) as f:
+            index: dict[str, list[str]] = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return index
+
+
+def _write_text_atomic(
+    path: str, content: str, fs: AbstractFileSystem | None = None
+) -> None:
+    """Write a small text file in one operation, so readers never see it half written.
+
+    The content is written to a temporary file in the same folder, that is
+    renamed to the path.
+    """
+    temp_path = _temp_path(path)
+    try:
+        if fs:
+            fs.pipe_file(temp_path, content.encode())
+            fs.mv(temp_path, path)
+        else:
+            with open(temp_path, "w") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+    except BaseException:
+        _remove(temp_path, fs)
+        raise
+
+
+def _write_version_index(
+    index_path: str, index: dict[str, list[str]], fs: AbstractFileSystem | None = None
+) -> None:
+    """Write the version index for a folder."""
+    _write_text_atomic(index_path, json.dumps(index, indent=1, sort_keys=True), fs)
+
+
+def _list_version_index(
+    index_path: str, fs: AbstractFileSystem | None = None
+) -> dict[str, list[str]]:
+    """Make the version index for a folder from a new listing of the folder.
+
+    The index maps the base of the file name, i.e. file name and timestamp
+    ending with '_', to the names of all versions of the file in the folder.
+    """
+    folder_path = index_path.rsplit("/", 1)[0]
+    index: dict[str, list[str]] = {}
+    for v in _list_versions(folder_path, fs, refresh=True):
+        base_name = v.base_path.rsplit("/", 1)[-1]
+        index.setdefault(base_name, []).append(v.path.rsplit("/", 1)[-1])
+    for names in index.values():
+        names.sort(key=_version_sort_key)
+    return index
+
+
+def _rebuild_version_index(
+    index_path: str,
+    fs: AbstractFileSystem | None = None,
+    current: dict[str, list[str]] | None = None,
+) -> dict[str, list[str]]:
+    """Rebuild the version index for a folder from a listing of the folder.
+
+    The index is only written if it differs from the current index. Then the
+    folder is listed again while holding the lock of the index, so versions
+    added in the meantime are kept.
+    """
+    index = _list_version_index(index_path, fs)
+    # The folder does not exist yet if nothing has been saved there.
+    if not index or index == current:
+        return index
+    with _file_lock(index_path, fs):
+        index = _list_version_index(index_path, fs)
+        if index != _read_version_index(index_path, fs):
+            _write_version_index(index_path, index, fs)
+    return index
+
+
+def _indexed_files(
+    index: dict[str, list[str]], file_path: str, filetype: str
+) -> list[str]:
+    """Get the paths to the versions of a file in the version index, sorted by version."""
+    folder_path, base_name = file_path.rsplit("/", 1)
+    filenames = [
+        f"{folder_path}/{name}"
+        for name in index.get(base_name, [])
+        if name.endswith(filetype)
+    ]
+    filenames.sort(key=_version_sort_key)
     return filenames
 
 
+def _get_files_from_index(
+    file_path: str, filetype: str, fs: AbstractFileSystem | None = None
+) -> list[str]:
+    """List the versions of a file from the version index of the folder.
+
+    The index is rebuilt from a listing of the folder if it does not exist, is
+    corrupt, or is missing the file or its newest version. A missing newest
+    version is found by checking that the version after the latest indexed
+    version does not exist.
+    """
+    index_path = _version_index_path(file_path)
+    index = _read_version_index(index_path, fs)
+    if index is not None:
+        filenames = _indexed_files(index, file_path, filetype)
+        if filenames:
+            latest = _parse_file_version(filenames[-1])
+            next_path = f"{file_path}v{latest.version + 1 if latest else 0}.{filetype}"
+            if not _exists(next_path, fs):
+                return filenames
+    # The file may have been written without updating the index.
+    index = _rebuild_version_index(index_path, fs, current=index)
+    return _indexed_files(index, file_path, filetype)
+
+
+def _update_version_index(file_path: str, fs: AbstractFileSystem | None = None) -> None:
+    """Add a newly written version of a file to the version index of the folder.
+
+    The index is read, updated and written while holding the lock of the index,
+    so writers in parallel do not drop each other's versions.
+    """
+    index_path = _version_index_path(file_path)
+    version = _parse_file_version(file_path)
+    if version is None:
+        return
+    name = file_path.rsplit("/", 1)[-1]
+    with _file_lock(index_path, fs):
+        index = _read_version_index(index_path, fs)
+        if index is None:
+            index = _list_version_index(index_path, fs)
+        names = index.setdefault(version.base_path.rsplit("/", 1)[-1], [])
+        if name not in names:
+            names.append(name)
+            names.sort(key=_version_sort_key)
+        _write_version_index(index_path, index, fs)
+
+
 def _find_version_number(files: list[str], stable_version: bool) -> str | None:
     """Find the correct version number to use for saving."""
-    existing_versions = []
-    for f in files:
-        match = re.search(r"_v([^_]+)$", f)
-        if match:
-            existing_versions.append(match.group(1))
-
     existing_versions = [
-        match.group(1) for f in files if (match := re.search(r"_v([^_]+)\.", f))
+        str(v.version) for f in files if (v := _parse_file_version(f)) is not None
     ]
 
     if not stable_version and len(files) == 0:
@@ -148,8 +705,7 @@ def _find_version_number(files: list[str], stable_version: bool) -> str | None:
             "Vil du lage en ny versjon (altså øke versjonsnummeret med en)? Bekreft med 'y'."
         )
         if make_new_version.lower() == "y":
-            version = existing_versions[-1]
-            version = int(version.split(".")[0]) + 1
+            version = int(existing_versions[-1]) + 1
             return str(version)
         else:
             return None
@@ -157,6 +713,94 @@ def _find_version_number(files: list[str], stable_version: bool) -> str | None:
         raise ValueError("Noe gikk galt da rett versjonsnummer skulle settes.")
 
 
+def _reserve_file(path: str, fs: AbstractFileSystem | None = None) -> bool:
+    """Atomically create an empty file, False if the file already exists.
+
+    Locally the file is created with O_EXCL, and on GCS with the precondition
+    that no generation of the object exists, so only one writer gets a path.
+    """
+    try:
+        if fs:
+            with fs.open(path, "xb"):
+                pass
+        else:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+@contextmanager
+def _file_lock(path: str, fs: AbstractFileSystem | None = None) -> Iterator[None]:
+    """Hold a lock on a file, so only one writer changes the file at a time.
+
+    The lock is a file next to the file, created atomically like a reserved
+    version. A lock older than LOCK_TIMEOUT seconds is taken over, since the
+    writer holding it has most likely stopped.
+    """
+    lock_path = f"{path}.lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    delay = 0.01
+    while not _reserve_file(lock_path, fs):
+        if time.monotonic() > deadline:
+            _remove(lock_path, fs)
+            deadline = time.monotonic() + LOCK_TIMEOUT
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    try:
+        yield
+    finally:
+        _remove(lock_path, fs)
+
+
+def _reservation_path(file_path: str) -> str:
+    """Get the hidden path reserving a version of a file while it is written."""
+    folder_path, name = file_path.rsplit("/", 1)
+    return f"{folder_path}/.{name}.lock"
+
+
+def _allocate_version(
+    file_path: str,
+    filetype: str,
+    files: list[str],
+    fs: AbstractFileSystem | None = None,
+) -> str:
+    """Reserve the next stable version of a file without asking the user.
+
+    A version is reserved by atomically creating a hidden lock file for it, so
+    readers listing the folder never see the version before it is written. If
+    another writer has reserved or already written the version, the version
+    number is increased until a free one is found.
+    """
+    versions = [v.version for f in files if (v := _parse_file_version(f)) is not None]
+    version = max(versions, default=0) + 1
+    while True:
+        path = f"{file_path}_v{version}.{filetype}"
+        if _reserve_file(_reservation_path(path), fs):
+            # The version may have been written after the folder was listed.
+            if not _exists(path, fs):
+                return str(version)
+            _remove(_reservation_path(path), fs)
+        version += 1
+
+
+def _remove(path: str, fs: AbstractFileSystem | None = None) -> None:
+    """Remove a file if it exists."""
+    try:
+        if fs:
+            fs.rm(path)
+        else:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _temp_path(file_path: str) -> str:
+    """Get a unique hidden temporary path in the same folder as a file."""
+    folder_path, name = file_path.rsplit("/", 1)
+    return f"{folder_path}/.{name}.{uuid.uuid4().hex}.tmp"
+
+
 def _verify_base_filename(name: str) -> str:
     """Verifies the base of the file name."""
     # Ensure lower case
@@ -227,18 +871,198 @@ def _verify_datatilstand(datatilstand: str) -> str:
         return datatilstand
 
 
+def _parquet_options(
+    compression: str | None,
+    compression_level: int | None,
+    row_group_size: int | None,
+    use_dictionary: bool | list[str],
+    write_page_index: bool,
+) -> dict[str, Any]:
+    """Collect the parquet writer options that differ from the defaults."""
+    options: dict[str, Any] = {"compression": compression}
+    if compression_level is not None:
+        options["compression_level"] = compression_level
+    if row_group_size is not None:
+        options["row_group_size"] = row_group_size
+    if use_dictionary is not True:
+        options["use_dictionary"] = use_dictionary
+    if write_page_index:
+        options["write_page_index"] = write_page_index
+    return options
+
+
+def _sort_df(df: Any, sort_by: list[str]) -> Any:
+    """Sort a pandas or polars dataframe or a pyarrow table by columns."""
+    if isinstance(df, pl.DataFrame):
+        return df.sort(sort_by, maintain_order=True)
+    if isinstance(df, pa.Table):
+        return df.sort_by([(col, "ascending") for col in sort_by])
+    return df.sort_values(sort_by, kind="stable")
+
+
+def _hash_type(data_type: pa.DataType) -> pa.DataType:
+    """Get the arrow type a column is hashed as.
+
+    Pandas, polars and pyarrow store strings, binaries, lists and categories with
+    different arrow types, so these are mapped to one type each.
+    """
+    if pa.types.is_dictionary(data_type):
+        return _hash_type(data_type.value_type)
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        return pa.large_string()
+    if pa.types.is_string_view(data_type):
+        return pa.large_string()
+    if pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type):
+        return pa.large_binary()
+    if pa.types.is_binary_view(data_type):
+        return pa.large_binary()
+    if pa.types.is_list(data_type) or pa.types.is_large_list(data_type):
+        return pa.large_list(_hash_type(data_type.value_type))
+    return data_type
+
+
+def _content_hash(df: Any, json_type: str) -> str:
+    """Hash the content of a dataframe, including column names, order and types.
+
+    Pandas, polars and pyarrow data are converted to the same arrow table, so equal
+    data gives the same hash whatever library it comes from. The rows are hashed
+    with pd.util.hash_pandas_object, which does not change between versions like
+    the polars row hash, and combined to one sha256 digest. The hash does not
+    depend on the index.
+    """
+    digest = hashlib.sha256()
+    if json_type == "dict" and isinstance(df, dict):
+        digest.update(json.dumps(df, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+    try:
+        if isinstance(df, pl.DataFrame):
+            table = df.to_arrow()
+        elif isinstance(df, pa.Table):
+            table = df
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Pandas columns arrow can not convert, like mixed types, are hashed as they are.
+        schema = [(str(name), str(dtype)) for name, dtype in df.dtypes.items()]
+    else:
+        table = table.cast(
+            pa.schema(pa.field(f.name, _hash_type(f.type)) for f in table.schema)
+        )
+        schema = [(f.name, str(f.type)) for f in table.schema]
+        df = table.to_pandas()
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        # Cells with lists or dicts can not be hashed, so hash the rows as json.
+        row_hashes = np.frombuffer(
+            df.to_json(orient="values", default_handler=str).encode(), np.uint8
+        )
+    digest.update(json.dumps(schema).encode())
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def _content_hash_path(file_path: str) -> str:
+    """Get the path to the stored content hash of a file."""
+    return f"{file_path}.sha256"
+
+
+def _read_content_hash(
+    file_path: str, fs: AbstractFileSystem | None = None
+) -> str | None:
+    """Read the stored content hash of a file, None if it has no hash."""
+    try:
+        with _open(_content_hash_path(file_path), "r", fs) as f:
+            return str(f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _write_content_hash(
+    file_path: str, content_hash: str, fs: AbstractFileSystem | None = None
+) -> None:
+    """Store the content hash of a file next to the file."""
+    with _open(_content_hash_path(file_path), "w", fs) as f:
+        f.write(content_hash)
+
+
+def _save_polars(
+    df: pl.DataFrame,
+    file_path: str,
+    filetype: str,
+    seperator: str,
+    encoding: str,
+    parquet_options: dict[str, Any] | None = None,
+) -> None:
+    """Save a polars dataframe with the polars writers."""
+    parquet_options = parquet_options or {}
+    if filetype == "parquet" and set(parquet_options) <= _POLARS_PARQUET_OPTIONS:
+        df.write_parquet(file_path, **parquet_options)
+    elif filetype == "parquet":
+        # Options polars does not support are written by pyarrow instead.
+        pq.write_table(df.to_arrow(), file_path, **parquet_options)
+    elif filetype == "csv":
+        # Polars only writes utf8, so encode the csv text with the wanted encoding.
+        with open(file_path, "wb") as f:
+            f.write(df.write_csv(separator=seperator).encode(encoding))
+    elif filetype == "jsonl":
+        df.write_ndjson(file_path)
+    elif filetype == "json":
+        df.write_json(file_path)
+    elif filetype == "feather":
+        df.write_ipc(file_path, compression="uncompressed")
+    else:
+        raise ValueError(
+            f"Filtypen {filetype} er ikke støttet. Ingenting er blitt lagret for denne filstien: {file_path}."
+        )
+
+
+def _save_arrow(
+    df: pa.Table,
+    file_path: str,
+    filetype: str,
+    seperator: str,
+    encoding: str,
+    parquet_options: dict[str, Any] | None = None,
+) -> None:
+    """Save a pyarrow table with the pyarrow writers."""
+    if filetype == "parquet":
+        pq.write_table(df, file_path, **(parquet_options or {}))
+    elif filetype == "csv":
+        # Pyarrow only writes utf8, so encode the csv text with the wanted encoding.
+        buffer = pa.BufferOutputStream()
+        pa_csv.write_csv(df, buffer, pa_csv.WriteOptions(delimiter=seperator))
+        with open(file_path, "wb") as f:
+            f.write(buffer.getvalue().to_pybytes().decode().encode(encoding))
+    elif filetype == "feather":
+        feather.write_feather(df, file_path, compression="uncompressed")
+    else:
+        # Pyarrow has no json writer, polars reuses the arrow memory without copying.
+        _save_polars(
+            pl.DataFrame(pl.from_arrow(df)), file_path, filetype, seperator, encoding
+        )
+
+
 def _save_df(
-    df: pd.DataFrame,
+    df: pd.DataFrame | pl.DataFrame | pa.Table,
     file_path: str,
     filetype: str,
     seperator: str,
     encoding: str,
     json_type: str,
+    parquet_options: dict[str, Any] | None = None,
 ) -> None:
-    """Do the actual saving, either as csv or parquet."""
+    """Do the actual saving, with the library the dataframe comes from."""
+    if isinstance(df, pl.DataFrame):
+        _save_polars(df, file_path, filetype, seperator, encoding, parquet_options)
+        return
+    if isinstance(df, pa.Table):
+        _save_arrow(df, file_path, filetype, seperator, encoding, parquet_options)
+        return
+
     # Save as parquet
     if filetype == "parquet":
-        df.to_parquet(file_path, index=False)
+        df.to_parquet(file_path, index=False, **(parquet_options or {}))
     # Save as csv
     elif filetype == "csv":
         df.to_csv(file_path, sep=seperator, index=False, encoding=encoding)
@@ -255,6 +1079,10 @@ def _save_df(
         else:
             df.to_json(file_path, orient="records", lines=False)
 
+    # Save as Arrow IPC, uncompressed so readers can memory map the file
+    elif filetype == "feather":
+        df.reset_index(drop=True).to_feather(file_path, compression="uncompressed")
+
     # Uknown filetype sent as argument
     else:
         raise ValueError(
@@ -262,8 +1090,72 @@ def _save_df(
         )
 
 
+def _save_chunks(
+    chunks: Iterator[pd.DataFrame | pl.DataFrame],
+    file_path: str,
+    filetype: str,
+    seperator: str,
+    encoding: str,
+    parquet_options: dict[str, Any] | None = None,
+) -> None:
+    """Save an iterator of dataframe chunks, one chunk in memory at a time."""
+    if filetype == "csv":
+        with open(file_path, "w", encoding=encoding, newline="") as f:
+            for i, chunk in enumerate(chunks):
+                if isinstance(chunk, pl.DataFrame):
+                    f.write(chunk.write_csv(separator=seperator, include_header=i == 0))
+                else:
+                    chunk.to_csv(f, sep=seperator, index=False, header=i == 0)
+    elif filetype == "jsonl":
+        with open(file_path, "w") as f:
+            for chunk in chunks:
+                if isinstance(chunk, pl.DataFrame):
+                    f.write(chunk.write_ndjson())
+                else:
+                    lines = chunk.to_json(orient="records", lines=True)
+                    f.write(lines if lines.endswith("\n") else f"{lines}\n")
+    elif filetype == "parquet":
+        writer_options = dict(parquet_options or {})
+        row_group_size = writer_options.pop("row_group_size", None)
+        writer = None
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, pl.DataFrame):
+                    table = chunk.to_arrow()
+                else:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, table.schema, **writer_options)
+                writer.write_table(
+                    table.cast(writer.schema), row_group_size=row_group_size
+                )
+        finally:
+            if writer is not None:
+                writer.close()
+    elif filetype == "feather":
+        ipc_writer = None
+        schema = None
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, pl.DataFrame):
+                    table = chunk.to_arrow()
+                else:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if ipc_writer is None:
+                    schema = table.schema
+                    ipc_writer = pa.ipc.new_file(file_path, schema)
+                ipc_writer.write_table(table.cast(schema))
+        finally:
+            if ipc_writer is not None:
+                ipc_writer.close()
+    else:
+        raise ValueError(
+            f"Filtypen {filetype} er ikke støttet for lagring i biter. Ingenting er blitt lagret for denne filstien: {file_path}."
+        )
+
+
 def write_ssb_file(
-    df: pd.DataFrame,
+    df: pd.DataFrame | pl.DataFrame | pa.Table | Iterator[pd.DataFrame],
     periode: tuple[int, ...],
     frequency: str,
     bucket: str,
@@ -276,11 +1168,36 @@ def write_ssb_file(
     seperator: str = ";",
     encoding: str = "latin1",
     json_type: str = "df",
+    use_version_index: bool = False,
+    compression: str | None = "snappy",
+    compression_level: int | None = None,
+    row_group_size: int | None = None,
+    use_dictionary: bool | list[str] = True,
+    sort_by: list[str] | None = None,
+    write_page_index: bool = False,
+    interactive: bool = True,
+    skip_if_unchanged: bool = False,
 ) -> None:
     """Function to write and save a dataframe at SSB-format.
 
+    The dataframe is written with the library it comes from, so polars
+    dataframes and pyarrow tables are saved without converting to pandas.
+    Files larger than memory can be written from an iterator of dataframe
+    chunks, e.g. from read_ssb_file with chunksize, as csv, jsonl, parquet or
+    feather.
+
+    With interactive=False the function never asks the user, and can be run
+    from parallel jobs writing the same file. A stable version always gets a
+    new version number, which is reserved atomically by creating a hidden lock
+    file that only one writer can create. The data is written to a temporary
+    file that is renamed to the path of the version, so readers only see the
+    version when it is completely written.
+
+    With skip_if_unchanged=True a hash of the content is stored next to the
+    file, and nothing is written if the content is equal to the latest version.
+
     Args:
-        df: The dataframe to save.
+        df: The dataframe to save, as a pandas or polars dataframe, a pyarrow table or an iterator of dataframe chunks.
         periode: Up to six arguments with int, to create timestamp for. E.g. (2022,2,2023,4) is p_2022-02_p2023-04 when frequency = 'M'.
         frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
         bucket: GCP bucket passed with a FileClient object or path in prodsonen.
@@ -289,16 +1206,43 @@ def write_ssb_file(
         datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
         undermappe: Optional folder under 'datatilstand'.
         stable_version: Bool for whether you should have checks in place in case of overwrite.
-        filetype: the filetype to save as. Default: 'parquet'.
+        filetype: the filetype to save as, 'feather' is uncompressed Arrow IPC that can be memory mapped. Default: 'parquet'.
         seperator: the seperator to use it filetype is csv. Default: ';'.
         encoding: Encoding for file, base is latin1.
+        json_type: 'dict' if df is a dict to be saved as json. Default: 'df'.
+        use_version_index: Find the latest version from the version index of the folder, and update the index after saving. Default: False.
+        compression: Compression codec for parquet files, e.g. 'snappy', 'zstd' or None. Default: 'snappy'.
+        compression_level: Compression level for codecs that support it, like 'zstd'. Default: None.
+        row_group_size: Maximum number of rows in each parquet row group. Default: None, the writers default.
+        use_dictionary: Dictionary encode all columns, or only the listed columns, in parquet files. Default: True.
+        sort_by: Columns to sort the data by before saving, e.g. ['nar', 'periode'], so readers can skip row groups. Default: None.
+        write_page_index: Write page level statistics to parquet files, so readers can skip pages. Default: False.
+        interactive: Ask before making a new stable version. If False, a new version is always made and allocated atomically. Default: True.
+        skip_if_unchanged: Do not save the file if the content is equal to the latest version. Not possible with chunks. Default: False.
 
     Raises:
-        ValueError: if df has no rows.
+        ValueError: if df has no rows, or sort_by or skip_if_unchanged is used with chunks.
     """
-    # Check content in df
-    if not len(df) > 0:
+    # Check content in df, for chunks only the first chunk is checked.
+    if isinstance(df, Iterator):
+        first_chunk = next(df, None)
+        if first_chunk is None or not len(first_chunk) > 0:
+            raise ValueError("Dataframen har ingen rader. Fiks dette og prøv igjen.")
+        df = chain([first_chunk], df)
+        if sort_by:
+            raise ValueError("sort_by kan ikke brukes når data lagres i biter.")
+        if skip_if_unchanged:
+            raise ValueError(
+                "skip_if_unchanged kan ikke brukes når data lagres i biter."
+            )
+    elif not len(df) > 0:
         raise ValueError("Dataframen har ingen rader. Fiks dette og prøv igjen.")
+    elif sort_by:
+        df = _sort_df(df, sort_by)
+    parquet_options = _parquet_options(
+        compression, compression_level, row_group_size, use_dictionary, write_page_index
+    )
+    content_hash = _content_hash(df, json_type) if skip_if_unchanged else None
     # Veirfy name of datatilstand and base filename
     file_name = _verify_base_filename(file_name)
     # Verify 'datatilstand' if not the kortnavn is temp or oppdrag
@@ -314,46 +1258,262 @@ def write_ssb_file(
         file_name=file_name,
         undermappe=undermappe,
     )
+    fs = _get_fs(file_path)
     # Get list with the filenames, if several, ordered by the highest version number at last.
-    files = _get_files(file_path, filetype)
-    # Find version number/decide whether to overwrite or make new version.
-    version_number = _find_version_number(files, stable_version)
+    if use_version_index:
+        files = _get_files_from_index(file_path, filetype, fs)
+    else:
+        files = _get_files(file_path, filetype, fs, refresh=True)
+    if file_path.endswith("_"):
+        file_path = file_path[:-1]
+    if content_hash is not None and files:
+        if _read_content_hash(files[-1], fs) == content_hash:
+            print(
+                f"Filen ble ikke lagret fordi innholdet er likt den siste versjonen: {files[-1]}"
+            )
+            return
 
-    if version_number:
-        if file_path.endswith("_"):
-            file_path = file_path[:-1]
+    if interactive:
+        # Find version number/decide whether to overwrite or make new version.
+        version_number = _find_version_number(files, stable_version)
+        if not version_number:
+            return
         file_path = f"{file_path}_v{version_number}.{filetype}"
         # creates the filepath if it dopes not exist
-        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-        _save_df(
+        _makedirs(file_path.rsplit("/", 1)[0], fs)
+        _save(
+            df,
+            file_path,
+            filetype,
+            seperator,
+            encoding,
+            json_type,
+            parquet_options,
+            fs,
+        )
+    else:
+        file_path = _write_non_interactive(
             df,
             file_path,
+            files,
+            stable_version,
             filetype,
             seperator,
             encoding,
             json_type,
+            parquet_options,
+            fs,
         )
 
+    if content_hash is not None:
+        _write_content_hash(file_path, content_hash, fs)
+    elif file_path in files:
+        # An overwritten version 0 no longer has the content of an old hash.
+        _remove(_content_hash_path(file_path), fs)
+    _invalidate_listing_cache(file_path.rsplit("/", 1)[0])
+    if use_version_index:
+        _update_version_index(file_path, fs)
 
-def read_ssb_file(
-    periode: tuple[int, ...],
-    frequency: str,
-    bucket: str,
-    kortnavn: str,
-    file_name: str,
-    datatilstand: str = "",
-    undermappe: str | None = None,
-    filetype: str = "parquet",
-    columns: list[str] | None = None,
-    version_number: int | None = None,
-    seperator: str = ";",
-    encoding: str = "latin1",
-    json_type: str = "df",
-) -> pd.DataFrame | None:
-    """Function to read a saved file, stored at SSB-format.
 
-    Get the last version saved in the datatilstand specified (klargjorte-data, statistikk, utdata).
-    at the correct bucket path and with the speficed name.
+def _save(
+    df: Any,
+    file_path: str,
+    filetype: str,
+    seperator: str,
+    encoding: str,
+    json_type: str,
+    parquet_options: dict[str, Any],
+    fs: AbstractFileSystem | None = None,
+) -> None:
+    """Save a dataframe or an iterator of dataframe chunks.
+
+    With a filesystem object the file is written to a local temporary folder
+    and uploaded with the filesystem object.
+    """
+    if fs:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = f"{temp_dir}/{file_path.rsplit('/', 1)[-1]}"
+            _save(
+                df,
+                local_path,
+                filetype,
+                seperator,
+                encoding,
+                json_type,
+                parquet_options,
+            )
+            fs.put_file(local_path, file_path)
+        return
+    if isinstance(df, Iterator):
+        _save_chunks(df, file_path, filetype, seperator, encoding, parquet_options)
+    else:
+        _save_df(
+            df,
+            file_path,
+            filetype,
+            seperator,
+            encoding,
+            json_type,
+            parquet_options,
+        )
+
+
+def _write_non_interactive(
+    df: Any,
+    file_path: str,
+    files: list[str],
+    stable_version: bool,
+    filetype: str,
+    seperator: str,
+    encoding: str,
+    json_type: str,
+    parquet_options: dict[str, Any],
+    fs: AbstractFileSystem | None = None,
+) -> str:
+    """Save a file with an atomically allocated version, without asking the user.
+
+    Returns:
+        str: The path to the saved file.
+    """
+    _makedirs(file_path.rsplit("/", 1)[0], fs)
+    if stable_version:
+        version_number = _allocate_version(file_path, filetype, files, fs)
+    else:
+        version_number = "0"
+    file_path = f"{file_path}_v{version_number}.{filetype}"
+
+    # Uploads through a filesystem object are only visible when complete,
+    # local files are written to a temporary file that is renamed.
+    temp_path = None if fs else _temp_path(file_path)
+    try:
+        _save(
+            df,
+            temp_path or file_path,
+            filetype,
+            seperator,
+            encoding,
+            json_type,
+            parquet_options,
+            fs,
+        )
+        if temp_path:
+            os.replace(temp_path, file_path)
+    except BaseException:
+        if temp_path:
+            _remove(temp_path)
+        raise
+    finally:
+        if stable_version:
+            _remove(_reservation_path(file_path), fs)
+    return file_path
+
+
+def _use_cache(
+    file_path: str, fs: AbstractFileSystem | None, cache: FileCache | None
+) -> tuple[str, AbstractFileSystem | None]:
+    """Get the path and filesystem to read from, using a local copy if cached."""
+    if cache is None or fs is None:
+        return file_path, fs
+    return cache.get(file_path, fs), None
+
+
+def _check_memory_map(
+    fs: AbstractFileSystem | None, filetype: str, engine: Engine
+) -> None:
+    """Check that a memory mapped read can keep the data out of the process memory.
+
+    Raises:
+        ValueError: If the file is remote, since only local files can be memory mapped.
+    """
+    if fs is not None:
+        raise ValueError(
+            "memory_map kan bare brukes for lokale filer. Bruk cache for å lese fra en lokal kopi."
+        )
+    if filetype != "feather" or engine == "pandas":
+        warnings.warn(
+            f"memory_map med filtypen {filetype} og engine {engine} kopierer likevel dataene inn i minnet. "
+            "Bare feather filer lest med polars eller pyarrow blir liggende i den mappede filen.",
+            stacklevel=3,
+        )
+
+
+def _find_file(
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str,
+    undermappe: str | None,
+    filetype: str,
+    version_number: int | None,
+    use_version_index: bool,
+    fs: AbstractFileSystem | None = None,
+    period_index: PeriodIndex | None = None,
+    refresh: bool = False,
+) -> str:
+    """Find the path to a specific version of a file, or the newest version.
+
+    With refresh=True the folder is listed again instead of using the cached
+    listing, for writers changing the newest version.
+    """
+    # Get the filepath, only without version number and filetype.
+    file_path = _structure_ssb_filepath(
+        periode=periode,
+        frequency=frequency,
+        bucket=bucket,
+        kortnavn=kortnavn,
+        datatilstand=datatilstand,
+        file_name=file_name,
+        undermappe=undermappe,
+        version_number=version_number,
+        filetype=filetype,
+    )
+
+    if version_number is None:
+        # If version number not specified then list out versions.
+        if period_index is not None:
+            files = period_index.versions(file_path, filetype)
+        elif use_version_index:
+            files = _get_files_from_index(file_path, filetype, fs)
+        else:
+            files = _get_files(file_path, filetype, fs, refresh)
+        # If list is empty, no matching files of any version were found.
+        if not files:
+            raise FileNotFoundError(
+                f"Fant ingen {filetype}-filer som matcher filstien '{file_path}'."
+            )
+        # Otherwise, use the newest version of file.
+        file_path = files[-1]
+
+    return file_path
+
+
+def read_ssb_file(
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    filetype: str = "parquet",
+    columns: list[str] | None = None,
+    version_number: int | None = None,
+    seperator: str = ";",
+    encoding: str = "latin1",
+    json_type: str = "df",
+    use_version_index: bool = False,
+    engine: Engine = "pandas",
+    chunksize: int | None = None,
+    cache: FileCache | None = None,
+    memory_map: bool = False,
+    period_index: PeriodIndex | None = None,
+) -> Any:
+    """Function to read a saved file, stored at SSB-format.
+
+    Get the last version saved in the datatilstand specified (klargjorte-data, statistikk, utdata).
+    at the correct bucket path and with the speficed name.
     If it is a year table, the filename is automatically adjusted.
 
     Args:
@@ -369,14 +1529,482 @@ def read_ssb_file(
         columns: Columns to read from the file. If None (default), all columns are read.
         seperator: the seperator to use it filetype is csv. Default: ';'.
         encoding: Encoding for file, base is latin1.
+        json_type: 'dict' if the json file should be read as a dict. Default: 'df'.
+        use_version_index: Find the latest version from the version index of the folder instead of listing the folder. Default: False.
+        engine: Library to read the file with, 'pandas', 'polars' or 'pyarrow'. Default: 'pandas'.
+        chunksize: Read the file as an iterator of pandas dataframes with this many rows, for csv, jsonl and parquet files. Default: None.
+        cache: Optional FileCache, to read remote files from a local copy. Default: None.
+        memory_map: Memory map the file instead of reading it into memory. Only feather files read with engine 'polars' or 'pyarrow' stay out of the process memory; other filetypes are decoded and the pandas engine copies the data, which gives a warning. Only for local files, or remote files read through cache. Default: False.
+        period_index: Optional PeriodIndex of the folder, to find the newest version without listing the folder. Default: None.
 
     Raises:
         FileNotFoundError: If no files matching the file path and filetype are found.
+        ValueError: If chunksize is used with another engine than pandas, or memory_map is used for a remote file without cache.
 
     Returns:
-        pd.DataFrame: file as a data frame.
+        pd.DataFrame | pl.DataFrame | pa.Table | Iterator[pd.DataFrame]: file as a data frame from the chosen engine, or an iterator of chunks.
     """
-    # Get the filepath, only without version number and filetype.
+    fs = _get_fs(bucket)
+    file_path = _find_file(
+        periode,
+        frequency,
+        bucket,
+        kortnavn,
+        file_name,
+        datatilstand,
+        undermappe,
+        filetype,
+        version_number,
+        use_version_index,
+        fs,
+        period_index,
+    )
+    file_path, fs = _use_cache(file_path, fs, cache)
+    if memory_map:
+        _check_memory_map(fs, filetype, engine)
+
+    if chunksize is not None:
+        if engine != "pandas":
+            raise ValueError("Lesing i biter med chunksize støttes bare for pandas.")
+        return _read_chunks(
+            file_path, filetype, columns, seperator, encoding, chunksize, fs
+        )
+
+    return _read_df(
+        file_path,
+        filetype,
+        columns,
+        seperator,
+        encoding,
+        json_type,
+        engine,
+        fs,
+        memory_map,
+    )
+
+
+def scan_ssb_file(
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    filetype: str = "parquet",
+    version_number: int | None = None,
+    seperator: str = ";",
+    encoding: str = "utf8",
+    use_version_index: bool = False,
+    engine: Literal["polars", "pyarrow"] = "polars",
+) -> pl.LazyFrame | ds.Dataset:
+    """Function to lazily scan a saved file, stored at SSB-format.
+
+    Finds the same version of the file as read_ssb_file, but nothing is read
+    before the result is collected. Filters and column selections are then
+    pushed down to the reader, so for parquet files only the needed columns and
+    row groups are read.
+
+    Example:
+        >>> lf = scan_ssb_file((2024, 3), "M", bucket, "vhi", "vhi", "inndata")  # doctest: +SKIP
+        >>> df = lf.filter(pl.col("nar").is_in(["47", "47.1"])).select("nar", "verdi").collect()  # doctest: +SKIP
+
+    Args:
+        periode: Up to six arguments with int, to create timestamp for. E.g. (2022,2,2023,4) is p_2022-02_p2023-04 when frequency = 'M'.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp and oppdrag is also valid.
+        file_name: Name for file.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        filetype: the filetype to scan, 'parquet', 'feather', 'csv' or 'jsonl' (only polars). Default: 'parquet'.
+        version_number: possibility to get another version, than the newest (i.e. highest version number).
+        seperator: the seperator to use it filetype is csv. Default: ';'.
+        encoding: Encoding for csv files. Polars can only scan utf8. Default: 'utf8'.
+        use_version_index: Find the latest version from the version index of the folder instead of listing the folder. Default: False.
+        engine: 'polars' for a polars.LazyFrame or 'pyarrow' for a pyarrow dataset. Default: 'polars'.
+
+    Raises:
+        ValueError: If the filetype can not be scanned with the engine.
+
+    Returns:
+        pl.LazyFrame | ds.Dataset: a lazy frame or dataset over the file.
+    """
+    fs = _get_fs(bucket)
+    file_path = _find_file(
+        periode,
+        frequency,
+        bucket,
+        kortnavn,
+        file_name,
+        datatilstand,
+        undermappe,
+        filetype,
+        version_number,
+        use_version_index,
+        fs,
+    )
+
+    if engine == "polars":
+        if filetype == "parquet":
+            return pl.scan_parquet(file_path)
+        elif filetype == "csv" and encoding in ["utf8", "utf-8"]:
+            return pl.scan_csv(file_path, separator=seperator)
+        elif filetype == "jsonl":
+            return pl.scan_ndjson(file_path)
+        elif filetype == "feather":
+            return pl.scan_ipc(file_path)
+    elif engine == "pyarrow":
+        if filetype == "parquet":
+            return ds.dataset(
+                _strip_protocol(file_path, fs), format="parquet", filesystem=fs
+            )
+        elif filetype == "feather":
+            return ds.dataset(
+                _strip_protocol(file_path, fs), format="ipc", filesystem=fs
+            )
+        elif filetype == "csv":
+            return ds.dataset(
+                _strip_protocol(file_path, fs),
+                filesystem=fs,
+                format=ds.CsvFileFormat(
+                    parse_options=pa_csv.ParseOptions(delimiter=seperator),
+                    read_options=pa_csv.ReadOptions(encoding=encoding),
+                ),
+            )
+    raise ValueError(
+        f"Filtypen {filetype} med encoding {encoding} kan ikke skannes med {engine}, bruk read_ssb_file."
+    )
+
+
+def _period_label(periode: tuple[int, ...], frequency: str) -> str:
+    """Make a period label like '2024-03' from the SSB timestamp of a period."""
+    time_stamp = timestamp.get_ssb_timestamp(*periode, frequency=frequency)
+    if time_stamp is None:
+        raise ValueError(f"Kunne ikke lage timestamp for perioden {periode}.")
+    return time_stamp.removeprefix("p").replace("_p", "_")
+
+
+def read_ssb_files(
+    period_range: Iterable[tuple[int, ...]],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    filetype: str = "parquet",
+    columns: list[str] | None = None,
+    seperator: str = ";",
+    encoding: str = "latin1",
+    period_col: str = "periode",
+    ignore_missing: bool = False,
+    max_workers: int = 8,
+    engine: Engine = "pandas",
+    cache: FileCache | None = None,
+    period_index: PeriodIndex | None = None,
+) -> Any:
+    """Function to read the newest version of a file for several periods at once.
+
+    All periods are expected to be in the same folder, so the folder is only
+    listed once. The files are read concurrently, and returned as one data frame.
+
+    Example:
+        >>> df = read_ssb_files(
+        ...     prompts.iterate_years_months(2015, 2024, 1, 12),
+        ...     "M",
+        ...     bucket,
+        ...     "vhi",
+        ...     "vhi",
+        ...     datatilstand="statistikk",
+        ... )  # doctest: +SKIP
+
+    Args:
+        period_range: Periods to read, each a tuple of ints like the periode argument to read_ssb_file.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp and oppdrag is also valid.
+        file_name: Name for file.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        filetype: the filetype to read. Default: 'parquet'.
+        columns: Columns to read from the files. If None (default), all columns are read.
+        seperator: the seperator to use it filetype is csv. Default: ';'.
+        encoding: Encoding for file, base is latin1.
+        period_col: Name of the column with the period of each file, e.g. '2024-03'. Default: 'periode'.
+        ignore_missing: Skip periods without any files instead of raising an error. Default: False.
+        max_workers: Number of files read at the same time. Default: 8.
+        engine: Library to read the files with, 'pandas', 'polars' or 'pyarrow'. Default: 'pandas'.
+        cache: Optional FileCache, to read remote files from local copies. Default: None.
+        period_index: Optional PeriodIndex of the folder, to find the newest versions without listing the folder. Default: None.
+
+    Raises:
+        FileNotFoundError: If no files are found for a period, and ignore_missing is False.
+
+    Returns:
+        pd.DataFrame | pl.DataFrame | pa.Table: the files as one data frame, with the period in period_col.
+    """
+    fs = _get_fs(bucket)
+    file_paths = []
+    labels = []
+    missing = []
+    for periode in period_range:
+        file_path = _structure_ssb_filepath(
+            periode=periode,
+            frequency=frequency,
+            bucket=bucket,
+            kortnavn=kortnavn,
+            datatilstand=datatilstand,
+            file_name=file_name,
+            undermappe=undermappe,
+        )
+        if period_index is not None:
+            files = period_index.versions(file_path, filetype)
+        else:
+            files = _get_files(file_path, filetype, fs)
+        if not files:
+            missing.append(file_path)
+            continue
+        file_paths.append(files[-1])
+        labels.append(_period_label(periode, frequency))
+
+    if missing and not ignore_missing:
+        raise FileNotFoundError(
+            f"Fant ingen {filetype}-filer som matcher filstiene: {missing}."
+        )
+    if not file_paths:
+        empty = pd.DataFrame(columns=[*(columns or []), period_col])
+        if engine == "polars":
+            return pl.from_pandas(empty)
+        if engine == "pyarrow":
+            return pa.Table.from_pandas(empty, preserve_index=False)
+        return empty
+
+    def _read(file_path: str) -> Any:
+        path, file_fs = _use_cache(file_path, fs, cache)
+        return _read_df(
+            path, filetype, columns, seperator, encoding, "df", engine, file_fs
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        dfs = list(executor.map(_read, file_paths))
+
+    if engine == "polars":
+        return pl.concat(
+            [
+                df.with_columns(pl.lit(label).alias(period_col))
+                for df, label in zip(dfs, labels, strict=True)
+            ],
+            how="diagonal_relaxed",
+        )
+    if engine == "pyarrow":
+        return pa.concat_tables(
+            [
+                df.append_column(period_col, pa.array([label] * df.num_rows))
+                for df, label in zip(dfs, labels, strict=True)
+            ],
+            promote_options="permissive",
+        )
+    return pd.concat(
+        [
+            df.assign(**{period_col: label})
+            for df, label in zip(dfs, labels, strict=True)
+        ],
+        ignore_index=True,
+    )
+
+
+def _to_arrow(df: pd.DataFrame | pl.DataFrame | pa.Table) -> pa.Table:
+    """Convert a pandas or polars dataframe to a pyarrow table."""
+    if isinstance(df, pa.Table):
+        return df
+    if isinstance(df, pl.DataFrame):
+        return df.to_arrow()
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _hive_partitioning(partition_cols: list[str]) -> ds.Partitioning:
+    """Hive partitioning, like 'periode=2024-03/nar=47', with string values."""
+    schema = pa.schema([(col, pa.string()) for col in partition_cols])
+    return ds.partitioning(schema, flavor="hive")
+
+
+def _find_partition_cols(
+    dataset_path: str, fs: AbstractFileSystem | None = None
+) -> list[str]:
+    """Find the partition columns of a dataset from its folder names."""
+    partition_cols: list[str] = []
+    current = dataset_path
+    while True:
+        if fs:
+            entries = fs.ls(current, detail=False)
+        else:
+            entries = [f"{current}/{name}" for name in os.listdir(current)]
+        folders = [e for e in entries if "=" in e.rsplit("/", 1)[-1]]
+        if not folders:
+            return partition_cols
+        partition_cols.append(folders[0].rsplit("/", 1)[-1].split("=", 1)[0])
+        current = folders[0]
+
+
+def _remove_tree(path: str, fs: AbstractFileSystem | None = None) -> None:
+    """Remove a folder and everything in it, if it exists."""
+    if fs:
+        if fs.exists(path):
+            fs.rm(path, recursive=True)
+    elif Path(path).exists():
+        shutil.rmtree(path)
+
+
+def _write_fragments(
+    table: pa.Table,
+    dataset_path: str,
+    partition_cols: list[str],
+    basename_template: str,
+    compression: str | None,
+    fs: AbstractFileSystem | None = None,
+) -> list[str]:
+    """Write a table as fragments of a dataset.
+
+    Returns:
+        list[str]: The paths of the written fragments, relative to the dataset.
+    """
+    base_dir = _strip_protocol(dataset_path, fs)
+    written: list[str] = []
+    ds.write_dataset(
+        table,
+        base_dir,
+        format="parquet",
+        partitioning=_hive_partitioning(partition_cols),
+        filesystem=fs,
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+        basename_template=basename_template,
+        existing_data_behavior="overwrite_or_ignore",
+        file_visitor=lambda written_file: written.append(
+            written_file.path.removeprefix(base_dir).lstrip("/")
+        ),
+    )
+    return sorted(written)
+
+
+def _manifest_path(dataset_path: str) -> str:
+    """Get the path to the manifest of a dataset."""
+    return f"{dataset_path}/{DATASET_MANIFEST_NAME}"
+
+
+def _read_manifest(
+    dataset_path: str, fs: AbstractFileSystem | None = None
+) -> list[str] | None:
+    """Read the fragments listed in the manifest of a dataset, None if missing."""
+    try:
+        with _open(_manifest_path(dataset_path), "r", fs) as f:
+            fragments: list[str] = json.load(f)["fragments"]
+    except FileNotFoundError:
+        return None
+    return fragments
+
+
+def _write_manifest(
+    dataset_path: str, fragments: list[str], fs: AbstractFileSystem | None = None
+) -> None:
+    """Write the manifest of a dataset, replacing the old one in one operation."""
+    content = json.dumps({"fragments": sorted(fragments)}, indent=1)
+    _write_text_atomic(_manifest_path(dataset_path), content, fs)
+
+
+def _open_dataset(
+    dataset_path: str, fs: AbstractFileSystem | None = None
+) -> ds.Dataset:
+    """Open a partitioned dataset, with only the fragments in its manifest.
+
+    Datasets written before manifests were used are read with all their files.
+    """
+    base_dir = _strip_protocol(dataset_path, fs)
+    partitioning = _hive_partitioning(_find_partition_cols(dataset_path, fs))
+    fragments = _read_manifest(dataset_path, fs)
+    if fragments is None:
+        return ds.dataset(
+            base_dir, format="parquet", partitioning=partitioning, filesystem=fs
+        )
+    return ds.dataset(
+        [f"{base_dir}/{fragment}" for fragment in fragments],
+        format="parquet",
+        partitioning=partitioning,
+        partition_base_dir=base_dir,
+        filesystem=fs,
+    )
+
+
+def _dataset_fragments(
+    dataset_path: str, fs: AbstractFileSystem | None = None
+) -> list[str]:
+    """List the fragments of a dataset, from the manifest if it exists."""
+    fragments = _read_manifest(dataset_path, fs)
+    if fragments is not None:
+        return fragments
+    base_dir = _strip_protocol(dataset_path, fs)
+    return sorted(
+        path.removeprefix(base_dir).lstrip("/")
+        for path in _open_dataset(dataset_path, fs).files
+    )
+
+
+def write_ssb_dataset(
+    df: pd.DataFrame | pl.DataFrame | pa.Table,
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    partition_cols: list[str] | None = None,
+    stable_version: bool = True,
+    compression: str | None = "snappy",
+    sort_by: list[str] | None = None,
+) -> None:
+    """Function to write a dataframe for many periods as a partitioned dataset.
+
+    The dataset is a folder named like a file at SSB-format, e.g.
+    'vhi_p2020-01_p2024-12_v1.parquet', with one folder per value of the
+    partition columns inside it, e.g. 'periode=2024-03/nar=47/part-0.parquet'.
+    Versions are handled like in write_ssb_file. The values of the partition
+    columns are saved as strings. Use values like '2024-03' in the period
+    column, then read_ssb_dataset can only read the periods needed.
+
+    Args:
+        df: The dataframe to save, as a pandas or polars dataframe or a pyarrow table.
+        periode: The periods in the dataset. E.g. (2020,1,2024,12) is p2020-01_p2024-12 when frequency = 'M'.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp or oppdrag is also valid.
+        file_name: Name for the dataset.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        partition_cols: Columns to partition the dataset by. Default: ['periode'].
+        stable_version: Bool for whether you should have checks in place in case of overwrite.
+        compression: Compression codec for the parquet files. Default: 'snappy'.
+        sort_by: Columns to sort the data by in each file. Default: None.
+
+    Raises:
+        ValueError: if df has no rows or is missing a partition column.
+    """
+    table = _to_arrow(df)
+    if not table.num_rows > 0:
+        raise ValueError("Dataframen har ingen rader. Fiks dette og prøv igjen.")
+    partition_cols = partition_cols or ["periode"]
+    missing = [col for col in partition_cols if col not in table.column_names]
+    if missing:
+        raise ValueError(f"Partisjonskolonnene {missing} finnes ikke i dataframen.")
+    for col in partition_cols:
+        index = table.column_names.index(col)
+        table = table.set_column(index, col, table[col].cast(pa.string()))
+    if sort_by:
+        table = table.sort_by([(col, "ascending") for col in sort_by])
+
+    file_name = _verify_base_filename(file_name)
+    if kortnavn.lower() not in ["temp", "oppdrag"]:
+        datatilstand = _verify_datatilstand(datatilstand)
     file_path = _structure_ssb_filepath(
         periode=periode,
         frequency=frequency,
@@ -385,43 +2013,645 @@ def read_ssb_file(
         datatilstand=datatilstand,
         file_name=file_name,
         undermappe=undermappe,
-        version_number=version_number,
-        filetype=filetype,
     )
-
+    fs = _get_fs(file_path)
+    files = _get_files(file_path, "parquet", fs, refresh=True)
+    version_number = _find_version_number(files, stable_version)
     if not version_number:
-        # If version number not specified then list out versions.
-        files = _get_files(file_path, filetype)
-        # If list is empty, no matching files of any version were found.
+        return
+
+    dataset_path = f"{file_path.removesuffix('_')}_v{version_number}.parquet"
+    # An overwritten version should not keep partitions that are not in df.
+    _remove_tree(dataset_path, fs)
+    fragments = _write_fragments(
+        table, dataset_path, partition_cols, "part-{i}.parquet", compression, fs
+    )
+    _write_manifest(dataset_path, fragments, fs)
+    _invalidate_listing_cache(dataset_path.rsplit("/", 1)[0])
+
+
+def read_ssb_dataset(
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    period_range: tuple[tuple[int, ...], tuple[int, ...]] | None = None,
+    columns: list[str] | None = None,
+    filters: ds.Expression | None = None,
+    version_number: int | None = None,
+    period_col: str = "periode",
+    engine: Engine = "pandas",
+) -> Any:
+    """Function to read a partitioned dataset written by write_ssb_dataset.
+
+    Only the partitions in the period range, and matching the filters on
+    partition columns, are read.
+
+    Example:
+        >>> df = read_ssb_dataset((2020, 1, 2024, 12), "M", bucket, "vhi", "vhi", "statistikk", period_range=((2023, 1), (2023, 12)), filters=ds.field("nar") == "47")  # doctest: +SKIP
+
+    Args:
+        periode: The periods in the dataset, as when it was written.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp or oppdrag is also valid.
+        file_name: Name of the dataset.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        period_range: Optional first and last period to read, e.g. ((2023, 1), (2023, 12)). Default: all periods.
+        columns: Optional list of columns to read.
+        filters: Optional pyarrow dataset expression to filter the rows by.
+        version_number: Optional specific version number to read. Default: the newest version.
+        period_col: Name of the column with the periods. Default: 'periode'.
+        engine: Library to return the data with, 'pandas', 'polars' or 'pyarrow'. Default: 'pandas'.
+
+    Returns:
+        pd.DataFrame | pl.DataFrame | pa.Table: the data from the chosen engine.
+    """
+    fs = _get_fs(bucket)
+    dataset_path = _find_file(
+        periode,
+        frequency,
+        bucket,
+        kortnavn,
+        file_name,
+        datatilstand,
+        undermappe,
+        "parquet",
+        version_number,
+        False,
+        fs,
+    )
+    dataset = _open_dataset(dataset_path, fs)
+
+    if period_range is not None:
+        start, end = (_period_label(p, frequency) for p in period_range)
+        period_filter = (ds.field(period_col) >= start) & (ds.field(period_col) <= end)
+        filters = period_filter if filters is None else filters & period_filter
+    table = dataset.to_table(columns=columns, filter=filters)
+
+    if engine == "polars":
+        return pl.from_arrow(table)
+    if engine == "pyarrow":
+        return table
+    return table.to_pandas()
+
+
+def append_ssb_dataset(
+    df: pd.DataFrame | pl.DataFrame | pa.Table,
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    version_number: int | None = None,
+    upsert: bool = True,
+    compression: str | None = "snappy",
+) -> None:
+    """Function to add new periods to a dataset written by write_ssb_dataset.
+
+    Only the rows in df are written, as new fragments of the dataset, and the
+    fragments are added to the manifest of the dataset. With upsert, the
+    partitions in df replace the same partitions in the dataset, e.g. when a
+    period is revised. Old fragments are deleted after the manifest is updated,
+    so readers see either the old or the new data. The name of the dataset is
+    not changed. Many appends make many small files, use compact_ssb_dataset
+    to merge them.
+
+    Args:
+        df: The new rows, as a pandas or polars dataframe or a pyarrow table.
+        periode: The periods in the dataset, as when it was written.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp or oppdrag is also valid.
+        file_name: Name of the dataset.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        version_number: Optional version to append to. Default: the newest version.
+        upsert: Replace the partitions in the dataset that are also in df. Default: True.
+        compression: Compression codec for the parquet files. Default: 'snappy'.
+
+    Raises:
+        ValueError: if df has no rows or is missing a partition column.
+    """
+    table = _to_arrow(df)
+    if not table.num_rows > 0:
+        raise ValueError("Dataframen har ingen rader. Fiks dette og prøv igjen.")
+    fs = _get_fs(bucket)
+    dataset_path = _find_file(
+        periode,
+        frequency,
+        bucket,
+        kortnavn,
+        file_name,
+        datatilstand,
+        undermappe,
+        "parquet",
+        version_number,
+        False,
+        fs,
+        refresh=True,
+    )
+    partition_cols = _find_partition_cols(dataset_path, fs)
+    missing = [col for col in partition_cols if col not in table.column_names]
+    if missing:
+        raise ValueError(f"Partisjonskolonnene {missing} finnes ikke i dataframen.")
+    for col in partition_cols:
+        index = table.column_names.index(col)
+        table = table.set_column(index, col, table[col].cast(pa.string()))
+
+    new_fragments = _write_fragments(
+        table,
+        dataset_path,
+        partition_cols,
+        f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        compression,
+        fs,
+    )
+    # The manifest is read and written under a lock, so parallel appends are all kept.
+    with _file_lock(_manifest_path(dataset_path), fs):
+        fragments = [
+            f for f in _dataset_fragments(dataset_path, fs) if f not in new_fragments
+        ]
+        replaced = []
+        if upsert:
+            new_partitions = {f.rsplit("/", 1)[0] for f in new_fragments}
+            replaced = [f for f in fragments if f.rsplit("/", 1)[0] in new_partitions]
+        kept = [f for f in fragments if f not in replaced]
+        _write_manifest(dataset_path, kept + new_fragments, fs)
+    for fragment in replaced:
+        _remove(f"{dataset_path}/{fragment}", fs)
+
+
+def compact_ssb_dataset(
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    version_number: int | None = None,
+    compression: str | None = "snappy",
+) -> None:
+    """Function to merge the fragments of each partition of a dataset to one file.
+
+    Args:
+        periode: The periods in the dataset, as when it was written.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp or oppdrag is also valid.
+        file_name: Name of the dataset.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        version_number: Optional version to compact. Default: the newest version.
+        compression: Compression codec for the parquet files. Default: 'snappy'.
+    """
+    fs = _get_fs(bucket)
+    dataset_path = _find_file(
+        periode,
+        frequency,
+        bucket,
+        kortnavn,
+        file_name,
+        datatilstand,
+        undermappe,
+        "parquet",
+        version_number,
+        False,
+        fs,
+        refresh=True,
+    )
+    partitions: dict[str, list[str]] = {}
+    for fragment in _dataset_fragments(dataset_path, fs):
+        partitions.setdefault(fragment.rsplit("/", 1)[0], []).append(fragment)
+
+    merged: dict[str, str] = {}
+    base_dir = _strip_protocol(dataset_path, fs)
+    for partition, partition_fragments in partitions.items():
+        if len(partition_fragments) == 1:
+            continue
+        # The fragments do not contain the partition columns, only the folders do.
+        table = ds.dataset(
+            [f"{base_dir}/{fragment}" for fragment in partition_fragments],
+            format="parquet",
+            filesystem=fs,
+        ).to_table()
+        fragment = f"{partition}/part-{uuid.uuid4().hex}-0.parquet"
+        pq.write_table(
+            table, f"{base_dir}/{fragment}", compression=compression, filesystem=fs
+        )
+        merged[partition] = fragment
+    if not merged:
+        return
+
+    # Partitions appended to while compacting keep their fragments, and the
+    # merged fragment is removed instead.
+    with _file_lock(_manifest_path(dataset_path), fs):
+        current = [
+            f for f in _dataset_fragments(dataset_path, fs) if f not in merged.values()
+        ]
+        replaced = []
+        for partition in list(merged):
+            in_partition = {f for f in current if f.rsplit("/", 1)[0] == partition}
+            if in_partition == set(partitions[partition]):
+                replaced.extend(partitions[partition])
+            else:
+                replaced.append(merged.pop(partition))
+        kept = [f for f in current if f not in replaced]
+        _write_manifest(dataset_path, kept + list(merged.values()), fs)
+    for fragment in replaced:
+        _remove(f"{dataset_path}/{fragment}", fs)
+
+
+def _is_async(fs: Any) -> bool:
+    """Check if a filesystem object can be awaited on the running event loop.
+
+    Filesystems with an async implementation, like gcsfs, are only async if
+    made with asynchronous=True. Otherwise, like the filesystem from _get_fs,
+    they run their own event loop and are used from a thread.
+    """
+    return bool(getattr(fs, "async_impl", False) and getattr(fs, "asynchronous", False))
+
+
+async def _alist_versions(folder_path: str, fs: Any = None) -> list[_FileVersion]:
+    """List and parse all versioned files in a folder without blocking the event loop.
+
+    Shares the cached listings with _list_versions.
+    """
+    cached = _cached_versions(folder_path)
+    if cached is not None:
+        return cached
+
+    match_string = f"{folder_path}/*"
+    if _is_async(fs):
+        filenames = await fs._glob(match_string)
+    elif fs:
+        filenames = await asyncio.to_thread(fs.glob, match_string)
+    else:
+        filenames = await asyncio.to_thread(glob.glob, match_string)
+    return _cache_versions(folder_path, filenames, fs)
+
+
+async def _aget_files(folder_path: str, filetype: str, fs: Any = None) -> list[str]:
+    """Async version of _get_files."""
+    folder, _ = folder_path.rsplit("/", 1)
+    return [
+        v.path
+        for v in await _alist_versions(folder, fs)
+        if v.base_path == folder_path and v.filetype == filetype
+    ]
+
+
+async def aread_ssb_file(
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    filetype: str = "parquet",
+    columns: list[str] | None = None,
+    version_number: int | None = None,
+    seperator: str = ";",
+    encoding: str = "latin1",
+    json_type: str = "df",
+    use_version_index: bool = False,
+    engine: Engine = "pandas",
+    fs: Any = None,
+) -> Any:
+    """Async version of read_ssb_file, so many files can be read on one event loop.
+
+    With an async filesystem object, e.g. GCSFileSystem(asynchronous=True),
+    both listing and downloading run on the event loop. Otherwise they run in
+    a thread. Parsing the file and reading the version index always run in a
+    thread, the version index with the filesystem of the bucket.
+
+    Args:
+        periode: Up to six arguments with int, to create timestamp for. E.g. (2022,2,2023,4) is p_2022-02_p2023-04 when frequency = 'M'.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp or oppdrag is also valid.
+        file_name: Name for file.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        filetype: the filetype to read. Default: 'parquet'.
+        columns: Optional list of columns to read.
+        version_number: Optional specific version number to read. Default: the newest version.
+        seperator: the seperator used if filetype is csv. Default: ';'.
+        encoding: Encoding for file, base is latin1.
+        json_type: 'dict' to read a json file as a dict. Default: 'df'.
+        use_version_index: Find the latest version from the version index of the folder. Default: False.
+        engine: Library to read with, 'pandas', 'polars' or 'pyarrow'. Default: 'pandas'.
+        fs: Optional filesystem object, e.g. GCSFileSystem(asynchronous=True). Default: None, the filesystem of the bucket.
+
+    Returns:
+        Any: The dataframe, or dict for json files with json_type 'dict'.
+
+    Raises:
+        FileNotFoundError: If no version of the file is found.
+    """
+    if fs is None:
+        fs = _get_fs(bucket)
+    if version_number is None and not use_version_index:
+        file_path = _structure_ssb_filepath(
+            periode=periode,
+            frequency=frequency,
+            bucket=bucket,
+            kortnavn=kortnavn,
+            datatilstand=datatilstand,
+            file_name=file_name,
+            undermappe=undermappe,
+        )
+        files = await _aget_files(file_path, filetype, fs)
         if not files:
             raise FileNotFoundError(
                 f"Fant ingen {filetype}-filer som matcher filstien '{file_path}'."
             )
-        # Otherwise, use the newest version of file.
         file_path = files[-1]
+    else:
+        # The version index is read with blocking calls, so not with an async filesystem.
+        file_path = await asyncio.to_thread(
+            _find_file,
+            periode,
+            frequency,
+            bucket,
+            kortnavn,
+            file_name,
+            datatilstand,
+            undermappe,
+            filetype,
+            version_number,
+            use_version_index,
+            _get_fs(bucket) if _is_async(fs) else fs,
+        )
+
+    if not _is_async(fs):
+        return await asyncio.to_thread(
+            _read_df,
+            file_path,
+            filetype,
+            columns,
+            seperator,
+            encoding,
+            json_type,
+            engine,
+            fs,
+        )
+
+    data = await fs._cat_file(file_path)
+    if filetype == "json" and json_type == "dict" and engine == "pandas":
+        return json.loads(data)
+    return await asyncio.to_thread(
+        _read_df,
+        io.BytesIO(data),
+        filetype,
+        columns,
+        seperator,
+        encoding,
+        json_type,
+        engine,
+    )
+
+
+async def awrite_ssb_file(
+    df: pd.DataFrame | pl.DataFrame | pa.Table | Iterator[pd.DataFrame],
+    periode: tuple[int, ...],
+    frequency: str,
+    bucket: str,
+    kortnavn: str,
+    file_name: str,
+    datatilstand: str = "",
+    undermappe: str | None = None,
+    **kwargs: Any,
+) -> None:
+    """Async version of write_ssb_file.
+
+    The file is written in a thread, so the event loop is not blocked.
+    Use interactive=False, since the user can not be asked from a thread.
+
+    Args:
+        df: The dataframe to save, as a pandas or polars dataframe, a pyarrow table or an iterator of dataframe chunks.
+        periode: Up to six arguments with int, to create timestamp for. E.g. (2022,2,2023,4) is p_2022-02_p2023-04 when frequency = 'M'.
+        frequency: monthly (M), daily(D), quarter (Q), terital (T), weekly (W).
+        bucket: GCP bucket passed with a FileClient object or path in prodsonen.
+        kortnavn: Name of statistic or data product, temp or oppdrag is also valid.
+        file_name: Name for file.
+        datatilstand: Datatilstand following SSB standards, except when temp and oppdrag is the kortnavn.
+        undermappe: Optional folder under 'datatilstand'.
+        **kwargs: Other arguments to write_ssb_file.
+    """
+    await asyncio.to_thread(
+        write_ssb_file,
+        df,
+        periode,
+        frequency,
+        bucket,
+        kortnavn,
+        file_name,
+        datatilstand,
+        undermappe,
+        **kwargs,
+    )
+
+
+def _read_polars(
+    file_path: str | BinaryIO,
+    filetype: str,
+    columns: list[str] | None,
+    seperator: str,
+    encoding: str,
+    memory_map: bool = False,
+) -> pl.DataFrame:
+    """Read a file with the polars readers."""
+    if filetype == "csv":
+        return pl.read_csv(
+            file_path, separator=seperator, encoding=encoding, columns=columns
+        )
+    elif filetype == "parquet":
+        return pl.read_parquet(file_path, columns=columns, memory_map=memory_map)
+    elif filetype == "feather":
+        return pl.read_ipc(file_path, columns=columns, memory_map=memory_map)
+    elif filetype == "jsonl":
+        df = pl.read_ndjson(file_path)
+    elif filetype == "json":
+        # The polars json reader takes bytes, but not any binary file object.
+        df = pl.read_json(file_path if isinstance(file_path, str) else file_path.read())
+    else:
+        raise ValueError(
+            f"Filtypen {filetype} er ikke støttet. Kan ikke lese filen: {file_path}."
+        )
+    return df.select(columns) if columns is not None else df
+
+
+def _read_arrow(
+    file_path: str | BinaryIO,
+    filetype: str,
+    columns: list[str] | None,
+    seperator: str,
+    encoding: str,
+    memory_map: bool = False,
+) -> pa.Table:
+    """Read a file with the pyarrow readers.
+
+    With memory_map the table of a feather file points to the pages of the
+    memory mapped file, which are shared by all processes reading the file.
+    """
+    if filetype == "csv":
+        return pa_csv.read_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(encoding=encoding),
+            parse_options=pa_csv.ParseOptions(delimiter=seperator),
+            convert_options=pa_csv.ConvertOptions(include_columns=columns),
+        )
+    elif filetype == "parquet":
+        return pq.read_table(file_path, columns=columns, memory_map=memory_map)
+    elif filetype == "feather":
+        return feather.read_table(file_path, columns=columns, memory_map=memory_map)
+    elif filetype == "jsonl":
+        table = pa_json.read_json(file_path)
+        return table.select(columns) if columns is not None else table
+    elif filetype == "json":
+        # Pyarrow only reads json lines, so a json array is read by polars like it is written.
+        return _read_polars(
+            file_path, filetype, columns, seperator, encoding
+        ).to_arrow()
+    else:
+        raise ValueError(
+            f"Filtypen {filetype} er ikke støttet for pyarrow. Kan ikke lese filen: {file_path}."
+        )
+
+
+def _rebatch(batches: Iterator[pa.RecordBatch], chunksize: int) -> Iterator[pa.Table]:
+    """Collect record batches to tables of chunksize rows, the last table may be smaller."""
+    pending: list[pa.RecordBatch] = []
+    rows = 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunksize:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunksize)
+            rest = table.slice(chunksize)
+            pending = rest.to_batches()
+            rows = rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _read_chunks(
+    file_path: str | BinaryIO,
+    filetype: str,
+    columns: list[str] | None,
+    seperator: str,
+    encoding: str,
+    chunksize: int,
+    fs: AbstractFileSystem | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a file as an iterator of dataframes, one chunk in memory at a time."""
+    if fs:
+        with fs.open(file_path, "rb") as f:
+            yield from _read_chunks(
+                f, filetype, columns, seperator, encoding, chunksize
+            )
+        return
+    if filetype == "csv":
+        with pd.read_csv(
+            file_path,
+            sep=seperator,
+            encoding=encoding,
+            usecols=columns,
+            chunksize=chunksize,
+        ) as reader:
+            yield from reader
+    elif filetype == "jsonl":
+        with pd.read_json(file_path, lines=True, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk[columns] if columns is not None else chunk
+    elif filetype == "parquet":
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif filetype == "feather":
+        # Local files are memory mapped, and remote files are read one record batch at a time.
+        source = pa.memory_map(file_path) if isinstance(file_path, str) else file_path
+        with pa.ipc.open_file(source) as reader:
+            batches = (
+                reader.get_batch(i).select(columns or reader.schema.names)
+                for i in range(reader.num_record_batches)
+            )
+            for table in _rebatch(batches, chunksize):
+                yield table.to_pandas()
+    else:
+        raise ValueError(
+            f"Filtypen {filetype} er ikke støttet for lesing i biter. Kan ikke lese filen: {file_path}."
+        )
+
+
+def _read_df(
+    file_path: str | BinaryIO,
+    filetype: str,
+    columns: list[str] | None,
+    seperator: str,
+    encoding: str,
+    json_type: str,
+    engine: Engine = "pandas",
+    fs: AbstractFileSystem | None = None,
+    memory_map: bool = False,
+) -> Any:
+    """Do the actual reading, depending on the filetype and engine."""
+    if fs:
+        with fs.open(file_path, "rb") as f:
+            return _read_df(
+                f, filetype, columns, seperator, encoding, json_type, engine
+            )
+    if engine == "polars":
+        return _read_polars(
+            file_path, filetype, columns, seperator, encoding, memory_map
+        )
+    if engine == "pyarrow":
+        return _read_arrow(
+            file_path, filetype, columns, seperator, encoding, memory_map
+        )
 
     # Different functions used for reading depending on the filetype.
     if filetype == "csv":
         df = pd.read_csv(file_path, sep=seperator, encoding=encoding, usecols=columns)
     elif filetype == "parquet":
-        df = pd.read_parquet(file_path, columns=columns)
+        df = pd.read_parquet(file_path, columns=columns, memory_map=memory_map)
+    elif filetype == "feather":
+        df = feather.read_table(
+            file_path, columns=columns, memory_map=memory_map
+        ).to_pandas()
     elif filetype == "jsonl":
         if columns is not None:
             warnings.warn(
                 f"Columns argumentet blir ignorert for {filetype} filer, hele filen vil bli lastet inn.",
-                stacklevel=2,
+                stacklevel=3,
             )
         df = pd.read_json(file_path, lines=True)
     elif filetype == "json":
         if columns is not None:
             warnings.warn(
                 f"Columns argumentet blir ignorert for {filetype} filer, hele filen vil bli lastet inn.",
-                stacklevel=2,
+                stacklevel=3,
             )
-        if json_type == "dict":
+        if json_type != "dict":
+            df = pd.read_json(file_path, lines=False)
+        elif isinstance(file_path, str):
             with open(file_path) as f:
                 df = json.load(f)
         else:
-            df = pd.read_json(file_path, lines=False)
+            df = json.load(file_path)
+    else:
+        raise ValueError(
+            f"Filtypen {filetype} er ikke støttet. Kan ikke lese filen: {file_path}."
+        )
     # Returns pandas df.
     return df
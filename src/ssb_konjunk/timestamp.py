@@ -1,5 +1,20 @@
 """Functions to create timestamp according to SSB standard."""
 
+import calendar
+import functools
+import re
+from collections.abc import Iterable
+from collections.abc import Sequence
+from datetime import date
+from datetime import timedelta
+from typing import Any
+from typing import NamedTuple
+
+import numpy as np
+import polars as pl
+
+from ssb_konjunk.period import SUB_PERIODS
+
 
 def _check_even(elements: list[int]) -> bool:
     """Function to check if number is even."""
@@ -218,9 +233,13 @@ def _get_timestamp_special(*args: int, frequency: str) -> str | None:
             return None
 
 
+@functools.lru_cache(maxsize=4096)
 def get_ssb_timestamp(*args: int, frequency: str = "M") -> str | None:
     r"""Function to create a string in ssb timestamp format.
 
+    The results are cached, since the same periods are formatted many times
+    when paths are built.
+
     Args:
         args: Up to six arguments with int, to create timestamp for.
         frequency: Letter for which frequency the data is, Y for year etc.
@@ -270,6 +289,408 @@ def get_ssb_timestamp(*args: int, frequency: str = "M") -> str | None:
                 return _get_timestamp_special(*valid_args, frequency=frequency)
 
 
+def _check_valid_range(values: pl.Series, name: str, low: int, high: int) -> None:
+    """Function to check that all values of an arg are within the valid range."""
+    for invalid, limit, word in [
+        (values > high, high, "bigger than possible max"),
+        (values < low, low, "smaller than possible min"),
+    ]:
+        if invalid.any():
+            position = int(invalid.arg_true()[0])
+            raise ValueError(
+                f"The arg for {name} is {word} is {limit} you have: {values[position]} at position {position}."
+            )
+
+
+def _check_valid_years(start: pl.Series, end: pl.Series | None = None) -> None:
+    """Function to check that all years are valid."""
+    for years in [start] if end is None else [start, end]:
+        invalid = (years < 1000) | (years > 9999)
+        if invalid.any():
+            position = int(invalid.arg_true()[0])
+            raise ValueError(
+                f"Any valid year should be length 4, maybe you should check if year: {years[position]} at position {position} is correct."
+            )
+    if end is not None and (start > end).any():
+        position = int((start > end).arg_true()[0])
+        raise ValueError(
+            f"The order of args is start date and then end date. Therefore first year arg can not be bigger than the last. Your args are start year:{start[position]}  end year:{end[position]} at position {position}."
+        )
+
+
+def _format_period(year: pl.Series, subs: list[pl.Series], frequency: str) -> pl.Expr:
+    """Expression formatting one period of each row, like 'p2024-03'."""
+    if frequency == "Y":
+        return pl.format("p{}", pl.lit(year))
+    if frequency == "D":
+        month, day = (pl.lit(s).cast(pl.String).str.zfill(2) for s in subs)
+        return pl.format("p{}-{}-{}", pl.lit(year), month, day)
+    _, _, prefix, width = SUB_PERIODS[frequency]
+    sub = pl.lit(subs[0]).cast(pl.String).str.zfill(width)
+    return pl.format("p{}{}{}", pl.lit(year), pl.lit(prefix), sub)
+
+
+def get_ssb_timestamps(
+    *args: Sequence[int] | np.ndarray | pl.Series, frequency: str = "M"
+) -> Any:
+    """Function to create ssb timestamps for many periods at once.
+
+    Takes the same args as get_ssb_timestamp, but each arg is an array with
+    one value per period. The args are validated and formatted in one
+    vectorised pass, without a Python loop over the periods. Rows with a
+    missing value get a missing timestamp.
+
+    Args:
+        args: Arrays of ints, e.g. years and months, or start year, start month, end year and end month.
+        frequency: Letter for which frequency the data is, Y for year etc.
+
+    Returns:
+        pl.Series | np.ndarray: The timestamps, as a polars series if any arg is a polars series, else as a numpy array.
+
+    Raises:
+        ValueError: Raises error for wrong values or number of args.
+
+    Example:
+        >>> get_ssb_timestamps([2024, 2024], [11, 12], frequency="M").tolist()
+        ['p2024-11', 'p2024-12']
+    """
+    _check_frequency_suport(frequency)
+    valid_counts = {"Y": (1, 2), "D": (3, 6)}.get(frequency, (2, 4))
+    if len(args) not in valid_counts:
+        raise ValueError(
+            f"You have the wrong number of args, you have {len(args)}. You can have {valid_counts[0]} or {valid_counts[1]} for frequency: {frequency}"
+        )
+    columns = [pl.Series(arg).cast(pl.Int64) for arg in args]
+    if len({len(column) for column in columns}) > 1:
+        raise ValueError("All args must have the same length.")
+
+    # Split the args in start and end periods, a year and its sub-periods each.
+    if frequency == "Y":
+        periods: list[tuple[pl.Series, list[pl.Series]]] = [
+            (column, []) for column in columns
+        ]
+    else:
+        size = len(columns) // (2 if len(columns) in [4, 6] else 1)
+        periods = [
+            (columns[i], columns[i + 1 : i + size])
+            for i in range(0, len(columns), size)
+        ]
+
+    _check_valid_years(periods[0][0], periods[1][0] if len(periods) == 2 else None)
+    for _, subs in periods:
+        if frequency == "D":
+            _check_valid_range(subs[0], "month", 1, 12)
+            _check_valid_range(subs[1], "day", 1, 31)
+        elif frequency != "Y":
+            high, name, _, _ = SUB_PERIODS[frequency]
+            _check_valid_range(subs[0], name, 1, high)
+
+    parts = [_format_period(year, subs, frequency) for year, subs in periods]
+    expr = parts[0] if len(parts) == 1 else pl.format("{}_{}", *parts)
+    timestamps = pl.select(expr.alias("timestamp")).to_series()
+    if any(isinstance(arg, pl.Series) for arg in args):
+        return timestamps
+    return timestamps.to_numpy()
+
+
+def _period_regex(prefix: str) -> str:
+    """Regex for one period of a timestamp, like 'p2024', 'p2024-03' or 'p2024-Q1'."""
+    return (
+        rf"p(?P<{prefix}_year>\d{{4}})"
+        rf"(?:-(?:(?P<{prefix}_month>\d{{2}})(?:-(?P<{prefix}_day>\d{{2}}))?"
+        rf"|(?P<{prefix}_letter>[WQBTH])(?P<{prefix}_sub>\d{{1,2}})))?"
+    )
+
+
+# File name at SSB-format: name, timestamp with one or two periods, version and filetype.
+_SSB_FILENAME_REGEX = (
+    r"^(?:.*/)?(?P<file_name>[^/]+?)_"
+    + _period_regex("start")
+    + r"(?:_"
+    + _period_regex("end")
+    + r")?(?:_v(?P<version>\d+))?(?:\.(?P<filetype>\w+))?$"
+)
+_SSB_FILENAME_PATTERN = re.compile(_SSB_FILENAME_REGEX)
+_SSB_TIMESTAMP_PATTERN = re.compile(
+    "^" + _period_regex("start") + "(?:_" + _period_regex("end") + ")?$"
+)
+
+# Number of months in each sub-period of the frequencies with months.
+_MONTHS_IN_PERIOD = {"Q": 3, "B": 2, "T": 4, "H": 6}
+
+
+class SsbFileName(NamedTuple):
+    """A file name at SSB-format, parsed to its parts.
+
+    The start and end periods are the args to get_ssb_timestamp for the period,
+    e.g. (2024, 3) for 'p2024-03'. The end is None if the timestamp has only one
+    period. The dates are the first day of the start period and the last day of
+    the end period.
+    """
+
+    path: str
+    file_name: str
+    frequency: str
+    start: tuple[int, ...]
+    end: tuple[int, ...] | None
+    start_date: date
+    end_date: date
+    version: int | None
+    filetype: str | None
+
+
+def _parse_period(
+    groups: dict[str, str | None], prefix: str
+) -> tuple[str, tuple[int, ...], date, date] | None:
+    """Parse the frequency, args, first and last day of one period.
+
+    Returns None if the month, day, week or other sub-period is out of range.
+    """
+    year = int(groups[f"{prefix}_year"] or 0)
+    month = groups[f"{prefix}_month"]
+    day = groups[f"{prefix}_day"]
+    letter = groups[f"{prefix}_letter"]
+    sub = groups[f"{prefix}_sub"]
+    if year < 1:
+        return None
+    if day is not None and month is not None:
+        try:
+            period_date = date(year, int(month), int(day))
+        except ValueError:
+            return None
+        return "D", (year, int(month), int(day)), period_date, period_date
+    if month is not None:
+        if not 1 <= int(month) <= 12:
+            return None
+        last_day = calendar.monthrange(year, int(month))[1]
+        return (
+            "M",
+            (year, int(month)),
+            date(year, int(month), 1),
+            date(year, int(month), last_day),
+        )
+    if letter == "W" and sub is not None:
+        try:
+            first_day = date.fromisocalendar(year, int(sub), 1)
+        except ValueError:
+            return None
+        return "W", (year, int(sub)), first_day, first_day + timedelta(days=6)
+    if letter is not None and sub is not None:
+        months = _MONTHS_IN_PERIOD[letter]
+        if not 1 <= int(sub) <= 12 // months:
+            return None
+        last_month = int(sub) * months
+        last_day = calendar.monthrange(year, last_month)[1]
+        return (
+            letter,
+            (year, int(sub)),
+            date(year, last_month - months + 1, 1),
+            date(year, last_month, last_day),
+        )
+    return "Y", (year,), date(year, 1, 1), date(year, 12, 31)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_ssb_filename(path: str) -> SsbFileName | None:
+    """Function to parse a file name at SSB-format, the inverse of get_ssb_timestamp.
+
+    Args:
+        path: File name or path, e.g. 'bucket/vhi/inndata/vhi_p2024-03_v2.parquet'.
+
+    Returns:
+        SsbFileName | None: The parts of the file name, or None if it is not at SSB-format
+        or has a period out of range, like 'p2024-13'.
+
+    Example:
+        >>> parse_ssb_filename("vhi_p2024-Q1_p2024-Q2_v2.parquet").end
+        (2024, 2)
+    """
+    match = _SSB_FILENAME_PATTERN.match(path)
+    if not match:
+        return None
+    groups = match.groupdict()
+    start_period = _parse_period(groups, "start")
+    if start_period is None:
+        return None
+    frequency, start, start_date, end_date = start_period
+    end = None
+    if groups["end_year"] is not None:
+        end_period = _parse_period(groups, "end")
+        if end_period is None:
+            return None
+        _, end, _, end_date = end_period
+    return SsbFileName(
+        path=path,
+        file_name=str(groups["file_name"]),
+        frequency=frequency,
+        start=start,
+        end=end,
+        start_date=start_date,
+        end_date=end_date,
+        version=int(groups["version"]) if groups["version"] is not None else None,
+        filetype=groups["filetype"],
+    )
+
+
+def get_period_dates(*args: int, frequency: str = "M") -> tuple[date, date]:
+    """Function to get the first and last day of a period.
+
+    Args:
+        args: Up to six arguments with int, like the args to get_ssb_timestamp.
+        frequency: Frequency of the period, like the frequency to get_ssb_timestamp.
+
+    Returns:
+        tuple[date, date]: The first day of the first period, and the last day of the last period.
+
+    Raises:
+        ValueError: If no timestamp can be made for the period.
+
+    Example:
+        >>> get_period_dates(2024, 1, 2024, 2, frequency="Q")
+        (datetime.date(2024, 1, 1), datetime.date(2024, 6, 30))
+    """
+    time_stamp = get_ssb_timestamp(*args, frequency=frequency)
+    match = _SSB_TIMESTAMP_PATTERN.match(time_stamp) if time_stamp else None
+    if match is None:
+        raise ValueError(f"Could not make a timestamp for the period {args}.")
+    groups = match.groupdict()
+    start_period = _parse_period(groups, "start")
+    end_period = start_period
+    if groups["end_year"] is not None:
+        end_period = _parse_period(groups, "end")
+    if start_period is None or end_period is None:
+        raise ValueError(f"The period {args} is out of range.")
+    return start_period[2], end_period[3]
+
+
+def _period_dates(
+    prefix: str,
+) -> tuple[pl.Expr, pl.Expr, pl.Expr, pl.Expr, pl.Expr]:
+    """Expressions for the frequency, sub-period, first and last day of a period.
+
+    The last expression is True if the period is in range, like the check in
+    _parse_period. The dates are only made from parts in range, since polars
+    raises for the whole column on one invalid date.
+    """
+    year = pl.col(f"{prefix}_year").cast(pl.Int32)
+    month = pl.col(f"{prefix}_month").cast(pl.Int32)
+    letter = pl.col(f"{prefix}_letter")
+    sub = pl.col(f"{prefix}_sub").cast(pl.Int32)
+    months = letter.replace_strict(
+        _MONTHS_IN_PERIOD, default=None, return_dtype=pl.Int32
+    )
+    day_date = pl.format(
+        "{}-{}-{}", year, pl.col(f"{prefix}_month"), pl.col(f"{prefix}_day")
+    ).str.strptime(pl.Date, "%Y-%m-%d", strict=False)
+    week_start = pl.format("{}-W{}-1", year, sub).str.strptime(
+        pl.Date, "%G-W%V-%u", strict=False
+    )
+    month_start = pl.date(year, pl.when(month.is_between(1, 12)).then(month), 1)
+    sub_in_range = sub.is_between(1, 12 // months)
+    sub_start = pl.date(year, pl.when(sub_in_range).then((sub - 1) * months + 1), 1)
+    sub_end = pl.date(year, pl.when(sub_in_range).then(sub * months), 1)
+    has_day = pl.col(f"{prefix}_day").is_not_null()
+
+    valid = (year >= 1) & (
+        pl.when(has_day)
+        .then(day_date.is_not_null())
+        .when(month.is_not_null())
+        .then(month_start.is_not_null())
+        .when(letter == "W")
+        # Weeks past the last week of the year are parsed as weeks of the next year.
+        .then(week_start.dt.iso_year() == year)
+        .when(months.is_not_null())
+        .then(sub_start.is_not_null())
+        .otherwise(True)
+    )
+    frequency = (
+        pl.when(has_day)
+        .then(pl.lit("D"))
+        .when(month.is_not_null())
+        .then(pl.lit("M"))
+        .when(letter.is_not_null())
+        .then(letter)
+        .when(year.is_not_null())
+        .then(pl.lit("Y"))
+    )
+    period = pl.coalesce(month, sub).cast(pl.Int8)
+    first_day = (
+        pl.when(has_day)
+        .then(day_date)
+        .when(month.is_not_null())
+        .then(month_start)
+        .when(letter == "W")
+        .then(week_start)
+        .when(months.is_not_null())
+        .then(sub_start)
+        .otherwise(pl.date(year, 1, 1))
+    )
+    last_day = (
+        pl.when(has_day)
+        .then(day_date)
+        .when(month.is_not_null())
+        .then(month_start.dt.month_end())
+        .when(letter == "W")
+        .then(week_start + pl.duration(days=6))
+        .when(months.is_not_null())
+        .then(sub_end.dt.month_end())
+        .otherwise(pl.date(year, 12, 31))
+    )
+    return frequency, period, first_day, last_day, valid
+
+
+def parse_ssb_filenames(paths: Iterable[str]) -> pl.DataFrame:
+    """Function to parse many file names at SSB-format at once.
+
+    The file names are parsed with one vectorised regex over all paths, so a
+    listing of thousands of files can be filtered by period with polars
+    expressions. Paths that are not at SSB-format, or have a period out of range
+    like 'p2024-13', get missing values.
+
+    Args:
+        paths: File names or paths, e.g. from a listing of a folder.
+
+    Returns:
+        pl.DataFrame: One row per path, with the columns path, file_name,
+        frequency, start_year, start_period, start_day, end_year, end_period,
+        end_day, start_date, end_date, version and filetype.
+
+    Example:
+        >>> files = parse_ssb_filenames(["vhi_p2024-01_v1.parquet", "vhi_p2024-02_v1.parquet"])
+        >>> files.filter(pl.col("start_date") >= date(2024, 2, 1))["path"].to_list()
+        ['vhi_p2024-02_v1.parquet']
+    """
+    df = pl.DataFrame({"path": list(paths)}, schema={"path": pl.String})
+    df = df.with_columns(
+        pl.col("path").str.extract_groups(_SSB_FILENAME_REGEX).alias("parts")
+    ).unnest("parts")
+
+    frequency, start_period, start_date, start_last_day, start_valid = _period_dates(
+        "start"
+    )
+    _, end_period, _, end_last_day, end_valid = _period_dates("end")
+    has_end = pl.col("end_year").is_not_null()
+    valid = start_valid & (~has_end | end_valid)
+    columns = {
+        "file_name": pl.col("file_name"),
+        "frequency": frequency,
+        "start_year": pl.col("start_year").cast(pl.Int32),
+        "start_period": start_period,
+        "start_day": pl.col("start_day").cast(pl.Int8),
+        "end_year": pl.col("end_year").cast(pl.Int32),
+        "end_period": end_period,
+        "end_day": pl.col("end_day").cast(pl.Int8),
+        "start_date": start_date,
+        "end_date": pl.when(has_end).then(end_last_day).otherwise(start_last_day),
+        "version": pl.col("version").cast(pl.Int64),
+        "filetype": pl.col("filetype"),
+    }
+    return df.select(
+        "path",
+        *(pl.when(valid).then(column).alias(name) for name, column in columns.items()),
+    )
+
+
 def check_periodic_year(year: int, cycle_year: int, period: int) -> bool:
     """Check if a year is a part of a periodic cycle.
 
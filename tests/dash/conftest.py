@@ -46,3 +46,52 @@ def test_df_datasource(test_df):
         periode=pl.col("periode").str.strptime(pl.Date, "%Y-%m", strict=False),
     )
     return DataSource(polars_data, "periode", "jus", "nar")
+
+
+def _polars_rolling_last_window(source, n, skip, full_window):
+    """The earlier implementation of the rolling windows with polars, as reference."""
+    return (
+        source.data.rolling(
+            pl.col(source._date),
+            period=f"{n}mo",
+            closed="right",
+            group_by=source._group,
+            offset=f"-{skip + n}mo",
+        )
+        .agg(
+            **{
+                source._avg: pl.when(pl.len() == n)
+                .then(full_window)
+                .otherwise(pl.col(source._col).last()),
+                "_rows": pl.len(),
+            }
+        )
+        .filter(pl.col("_rows") > 0)
+        .group_by(source._group)
+        .agg(pl.col(source._avg).last())
+    )
+
+
+@pytest.fixture
+def use_polars_rolling(monkeypatch):
+    """Function letting n_mean_rolling and n_percent_rolling use the polars reference."""
+    n_mean_rolling = DataSource.n_mean_rolling
+    n_percent_rolling = DataSource.n_percent_rolling
+
+    def mean(self, n, skip=0):
+        header, _ = n_mean_rolling(self, n, skip)
+        full_window = pl.col(self._col).mean()
+        return header, _polars_rolling_last_window(self, n, skip, full_window)
+
+    def percent(self, n, skip=0):
+        header, _ = n_percent_rolling(self, n, skip)
+        full_window = self._percent_change(
+            pl.col(self._col).last(), pl.col(self._col).first()
+        )
+        return header, _polars_rolling_last_window(self, n, skip, full_window)
+
+    def use() -> None:
+        monkeypatch.setattr(DataSource, "n_mean_rolling", mean)
+        monkeypatch.setattr(DataSource, "n_percent_rolling", percent)
+
+    return use
@@ -3,6 +3,7 @@ import pandas as pd
 import polars as pl
 import pytest
 
+from ssb_konjunk.dash import utils
 from ssb_konjunk.dash.calculations.calc_data import DataManager
 from ssb_konjunk.dash.calculations.period_utils import Period
 
@@ -623,3 +624,136 @@ def test_get_table_6(data):
 
 def test_data_manager(data):
     assert isinstance(data, DataManager)
+
+
+def test_data_manager_result_cache(test_df, mocker):
+    mocker.patch("ssb_konjunk.dash.calculations.calc_data.KlassClassification")
+    manager = DataManager(test_df.copy(), max_cached_results=2)
+    naces = test_df["nar"].unique()
+    manager.class_codes = pd.DataFrame({"name": naces, "code": naces})
+    spy = mocker.spy(manager.season_source, "n_month_percent")
+
+    first = manager.get_sesonal_adjusted_mth_change("2024-06", nace_filter=["H", "K"])
+    calls = spy.call_count
+    second = manager.get_sesonal_adjusted_mth_change(
+        period="2024-06", nace_filter=["K", "H"]
+    )
+    assert spy.call_count == calls
+    assert (manager.cache_hits, manager.cache_misses) == (1, 1)
+    assert second is first
+
+    manager.get_table_1()
+    manager.get_table_1("None")
+    manager.get_table_2()
+    assert (manager.cache_hits, manager.cache_misses) == (2, 3)
+    manager.get_sesonal_adjusted_mth_change("2024-06", nace_filter=["H", "K"])
+    assert (manager.cache_hits, manager.cache_misses) == (2, 4)
+
+    manager.clear_cache()
+    assert (manager.cache_hits, manager.cache_misses) == (0, 0)
+    manager.get_table_2()
+    assert manager.cache_misses == 1
+
+
+def test_data_manager_warm_up(test_df, mocker):
+    mocker.patch("ssb_konjunk.dash.calculations.calc_data.KlassClassification")
+    manager = DataManager(test_df.copy(), max_cached_results=10)
+    naces = test_df["nar"].unique()
+    manager.class_codes = pd.DataFrame({"name": naces, "code": naces})
+
+    futures = manager.warm_up(1, max_workers=4)
+    assert len(futures) == 9
+    for future in futures:
+        future.result()
+    assert (manager.cache_hits, manager.cache_misses) == (0, 9)
+
+    manager.get_table_6("2024-12")
+    manager.get_sesonal_adjusted_12_mth_change("2024-12")
+    assert (manager.cache_hits, manager.cache_misses) == (2, 9)
+
+    with pytest.warns(UserWarning, match="plass til 10"):
+        futures = manager.warm_up(2)
+    assert len(futures) == 9
+
+
+def test_data_manager_warm_up_wait_and_log(test_df, mocker, caplog):
+    mocker.patch("ssb_konjunk.dash.calculations.calc_data.KlassClassification")
+    manager = DataManager(test_df.copy(), max_cached_results=10)
+    naces = test_df["nar"].unique()
+    manager.class_codes = pd.DataFrame({"name": naces, "code": naces})
+
+    def get_table_3(period):
+        raise ValueError("feil i tabell 3")
+
+    manager.get_table_3 = get_table_3
+    with caplog.at_level("ERROR", logger="ssb_konjunk.dash.calculations.calc_data"):
+        futures = manager.warm_up(1, max_workers=4, wait=True)
+    assert all(future.done() for future in futures)
+    failed = [future for future in futures if future.exception() is not None]
+    assert len(failed) == 1
+    assert "get_table_3 for 2024-12 feilet" in caplog.text
+    assert "feil i tabell 3" in caplog.text
+
+
+def test_data_manager_tables_same_as_polars_rolling(
+    test_df, mocker, use_polars_rolling
+):
+    mocker.patch("ssb_konjunk.dash.calculations.calc_data.KlassClassification")
+
+    def tables():
+        manager = DataManager(test_df.copy())
+        naces = test_df["nar"].unique()
+        manager.class_codes = pd.DataFrame({"name": naces, "code": naces})
+        return [
+            getter(period)
+            for period in ["2024-12", "2024-11"]
+            for getter in [
+                manager.get_table_2,
+                manager.get_table_3,
+                manager.get_table_4,
+                manager.get_table_5,
+                manager.get_sesonal_adjusted_3_mth_change,
+                manager.get_sesonal_adjusted_mth_change,
+                manager.get_sesonal_adjusted_12_mth_change,
+            ]
+        ]
+
+    results = tables()
+    use_polars_rolling()
+    # The polars reference gives the groups in random order, so the order may differ.
+    for result, expected in zip(results, tables(), strict=True):
+        assert result.header_1 == expected.header_1
+        assert result.header_2 == expected.header_2
+        pd.testing.assert_frame_equal(
+            result.res_data.reset_index(drop=True),
+            expected.res_data.reset_index(drop=True),
+        )
+        if expected.sparkline_data is not None:
+            pd.testing.assert_frame_equal(
+                result.sparkline_data.sort_values("nar", ignore_index=True),
+                expected.sparkline_data.sort_values("nar", ignore_index=True),
+            )
+
+
+def test_get_data_warms_up_once(mocker, monkeypatch):
+    data_manager_class = mocker.Mock()
+
+    class Config:
+        @staticmethod
+        def data_path() -> str:
+            return "data.parquet"
+
+        @staticmethod
+        def select_file(n: int) -> str:
+            return "data.parquet"
+
+    for name in ["_config", "_get_data_manager", "_warm_up_periods"]:
+        monkeypatch.setattr(utils, name, getattr(utils, name))
+    utils.setup(Config, data_manager_class=data_manager_class, warm_up_periods=2)
+    try:
+        assert utils.get_data() is utils.get_data("old")
+        data_manager_class.assert_called_once_with("data.parquet")
+        data_manager_class.return_value.warm_up.assert_called_once_with(2)
+    finally:
+        utils.get_data.cache_clear()
+        utils._load_data_manager.cache_clear()
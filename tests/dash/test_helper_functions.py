@@ -1,6 +1,11 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from datetime import datetime
 
 import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
 
 from ssb_konjunk.dash.calculations import helper_functions
 
@@ -103,3 +108,129 @@ def test_gen_header(test_df_datasource):
     assert header_1 == "Nov 2024 - Dec 2024"
     assert header_3 == "Sep 2024 - Dec 2024"
     assert header_12 == "Dec 2023 - Dec 2024"
+
+
+def _group_by_dynamic_windows(source, n):
+    return (
+        source.data.group_by_dynamic(
+            source._date, every=f"{n}mo", group_by=source._group, closed="right"
+        )
+        .agg(avg=pl.col(source._col).mean().round(1))
+        .group_by(source._group)
+        .agg(pl.col("avg"))
+    )
+
+
+@pytest.mark.parametrize("n", [1, 3, 12])
+def test_n_month_windows(test_df_datasource, n):
+    windows = _group_by_dynamic_windows(test_df_datasource, n)
+    for skip in range(2):
+        header, result = test_df_datasource.n_month(n, skip)
+        assert header == test_df_datasource._gen_header(n, skip)
+        expected = windows.select("nar", avg=pl.col("avg").list.get(-1 - skip))
+        assert result.sort("nar").equals(expected.sort("nar"))
+
+        _, percent = test_df_datasource.n_month_percent(n, skip)
+        latest = pl.col("avg").list.get(-1 - skip)
+        previous = pl.col("avg").list.get(-2 - skip)
+        expected = windows.select("nar", avg=(latest - previous) / previous * 100)
+        assert percent.sort("nar").equals(expected.sort("nar"))
+
+    # The windows are computed once per n, and reused for every skip.
+    assert list(test_df_datasource._windows_by_n) == [n]
+
+
+def test_windows_computed_once_across_threads(test_df_datasource, monkeypatch):
+    calls = []
+    group_by_dynamic = pl.DataFrame.group_by_dynamic
+
+    def counting_group_by_dynamic(self, *args, **kwargs):
+        calls.append(args)
+        time.sleep(0.05)
+        return group_by_dynamic(self, *args, **kwargs)
+
+    monkeypatch.setattr(pl.DataFrame, "group_by_dynamic", counting_group_by_dynamic)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: test_df_datasource._windows(3), range(8)))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def _map_groups_rolling(source, n, skip, full_window):
+    """The earlier implementation with a Python function per window, as reference."""
+
+    def map_window(x: pl.DataFrame):
+        if x.shape[0] != n:
+            return x.with_columns(avg=pl.col("jus").fill_null(strategy="backward"))
+        return x.with_columns(avg=full_window)
+
+    return (
+        source.data.rolling(
+            pl.col("periode"),
+            period=f"{n}mo",
+            closed="right",
+            group_by="nar",
+            offset=f"-{skip + n}mo",
+        )
+        .map_groups(map_window, None)
+        .group_by("nar")
+        .agg(pl.col("avg").last())
+    )
+
+
+@pytest.mark.parametrize("n, skip", [(1, 0), (1, 12), (3, 0), (3, 3), (13, 2)])
+def test_rolling_same_as_map_groups(test_df_datasource, n, skip):
+    # Remove some months and values, to get incomplete windows and missing values.
+    # A long gap at the end of 49.1 gives an empty last window for larger skip.
+    periode = pl.col("periode")
+    test_df_datasource.data = test_df_datasource.data.filter(
+        ~((pl.col("nar") == "K") & (periode.dt.month().is_in([6, 7, 11]))),
+        ~(
+            (pl.col("nar") == "49.1")
+            & periode.is_between(date(2024, 5, 1), date(2024, 11, 1))
+        ),
+    ).with_columns(
+        jus=pl.when((pl.col("nar") == "64") & (pl.col("periode").dt.month() == 10))
+        .then(None)
+        .otherwise(pl.col("jus"))
+    )
+    mean = pl.col("jus").mean()
+    percent = test_df_datasource._percent_change(
+        pl.col("jus"), pl.col("jus").shift(n - 1)
+    ).get(-1)
+
+    for method, full_window in [
+        (test_df_datasource.n_mean_rolling, mean),
+        (test_df_datasource.n_percent_rolling, percent),
+    ]:
+        _, result = method(n, skip)
+        expected = _map_groups_rolling(test_df_datasource, n, skip, full_window)
+        assert_frame_equal(result, expected, check_row_order=False, rel_tol=1e-9)
+
+    # The calendar matrix is built once, and reused for every n and skip.
+    calendar = test_df_datasource._calendar_matrix()
+    test_df_datasource.n_mean_rolling(n + 1, skip + 1)
+    assert test_df_datasource._calendar_matrix() is calendar
+
+
+@pytest.mark.parametrize("n, skip", [(1, 0), (1, 3), (2, 12), (3, 4), (13, 2)])
+def test_rolling_same_as_polars(test_df_datasource, n, skip, use_polars_rolling):
+    # 64 ends half a year before the other groups.
+    test_df_datasource.data = test_df_datasource.data.filter(
+        (pl.col("nar") != "64") | (pl.col("periode") < date(2024, 6, 1))
+    )
+
+    def rolling():
+        return [
+            test_df_datasource.n_mean_rolling(n, skip),
+            test_df_datasource.n_percent_rolling(n, skip),
+            test_df_datasource.n_month_rolling_percent_compare(n, skip, skip + n),
+        ]
+
+    results = rolling()
+    use_polars_rolling()
+    for (header, result), (expected_header, expected) in zip(
+        results, rolling(), strict=True
+    ):
+        assert header == expected_header
+        assert_frame_equal(result, expected, check_row_order=False, rel_tol=1e-9)
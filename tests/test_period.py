@@ -0,0 +1,150 @@
+"""Test of the integer periods."""
+
+import polars as pl
+import pytest
+
+from ssb_konjunk.dash.calculations.period_utils import AllPeriods
+from ssb_konjunk.dash.calculations.period_utils import Period
+from ssb_konjunk.dash.calculations.period_utils import create_period_range_list
+from ssb_konjunk.period import IntPeriod
+from ssb_konjunk.period import from_ordinals
+from ssb_konjunk.period import to_ordinals
+
+
+@pytest.mark.parametrize(
+    "args, frequency, period, code",
+    [
+        ((2024,), "Y", "2024", "2024"),
+        ((2024, 2), "H", "2024-H2", "2024H2"),
+        ((2024, 3), "T", "2024-T3", "2024T3"),
+        ((2024, 4), "Q", "2024-Q4", "2024Q4"),
+        ((2024, 6), "B", "2024-B6", "2024B6"),
+        ((2024, 3), "M", "2024-03", "2024M03"),
+        ((2020, 53), "W", "2020-W53", "2020W53"),
+        ((2024, 2, 29), "D", "2024-02-29", None),
+    ],
+)
+def test_int_period_conversions(args, frequency, period, code) -> None:
+    """Test conversions between parts, strings and ordinals."""
+    int_period = IntPeriod.from_parts(*args, frequency=frequency)
+    assert int_period.parts == args
+    assert int_period.as_period() == period
+    assert int_period.as_ssb_timestamp() == f"p{period}"
+    assert IntPeriod.parse(period, frequency) == int_period
+    assert IntPeriod.parse(f"p{period}", frequency) == int_period
+
+    assert (
+        to_ordinals([period, f"p{period}"], frequency).to_list()
+        == [int_period.ordinal] * 2
+    )
+    assert from_ordinals([int_period.ordinal], frequency).to_list() == [period]
+    assert from_ordinals([int_period.ordinal], frequency, "timestamp").to_list() == [
+        f"p{period}"
+    ]
+    if code is None:
+        with pytest.raises(ValueError, match="code"):
+            int_period.as_code()
+    else:
+        assert int_period.as_code() == code
+        assert IntPeriod.parse(code, frequency) == int_period
+        assert from_ordinals([int_period.ordinal], frequency, "code").to_list() == [
+            code
+        ]
+
+
+@pytest.mark.parametrize(
+    "args, frequency, next_period",
+    [
+        ((2023, 12), "M", (2024, 1)),
+        ((2023, 4), "Q", (2024, 1)),
+        ((2020, 53), "W", (2021, 1)),
+        ((2024, 2, 28), "D", (2024, 2, 29)),
+        ((2024, 2), "H", (2025, 1)),
+    ],
+)
+def test_int_period_arithmetic(args, frequency, next_period) -> None:
+    """Test that adding and subtracting moves to the next and previous period."""
+    int_period = IntPeriod.from_parts(*args, frequency=frequency)
+    bumped = int_period + 1
+    assert bumped.parts == next_period
+    assert bumped - 1 == int_period
+    assert bumped - int_period == 1
+    assert int_period < bumped
+    assert len({int_period, bumped - 1}) == 1
+
+
+def test_int_period_invalid() -> None:
+    """Test errors for invalid periods."""
+    with pytest.raises(ValueError, match="not supported"):
+        IntPeriod(0, "X")
+    with pytest.raises(ValueError, match="needs 2 args"):
+        IntPeriod.from_parts(2024)
+    with pytest.raises(ValueError, match="Could not parse"):
+        IntPeriod.parse("mars 2024")
+    with pytest.raises(ValueError, match="out of range"):
+        IntPeriod.from_parts(2024, 13)
+    with pytest.raises(ValueError, match="out of range"):
+        IntPeriod.from_parts(2024, 0, frequency="Q")
+    with pytest.raises(ValueError):
+        IntPeriod.from_parts(2021, 53, frequency="W")
+    with pytest.raises(ValueError):
+        IntPeriod.from_parts(2023, 2, 29, frequency="D")
+    with pytest.raises(ValueError, match="out of range"):
+        IntPeriod.parse("2024Q5", "Q")
+    with pytest.raises(ValueError, match="does not have the frequency"):
+        IntPeriod.parse("2024M02", "Q")
+    with pytest.raises(ValueError, match="does not have the frequency"):
+        IntPeriod.parse("2024-Q1", "M")
+    with pytest.raises(ValueError, match="Can not compare"):
+        _ = IntPeriod.from_parts(2024, 1) < IntPeriod.from_parts(2024, 1, frequency="Q")
+    with pytest.raises(ValueError, match="Unknown style"):
+        from_ordinals([1], style="iso")  # type: ignore[arg-type]
+
+
+def test_ordinals_series() -> None:
+    """Test that the vectorised conversions keep the name and handle missing values."""
+    series = pl.Series("periode", ["2024-01", "2024M02", None, "ukjent"])
+    ordinals = to_ordinals(series)
+    assert ordinals.name == "periode"
+    assert ordinals.to_list() == [24288, 24289, None, None]
+    assert to_ordinals(["2024-13", "2024Q1", "2024-01-02"]).to_list() == [None] * 3
+    assert to_ordinals(["2024Q5", "2024M02"], "Q").to_list() == [None, None]
+    assert to_ordinals(["2021-W53"], "W").to_list() == [None]
+    assert to_ordinals(["2023-02-29"], "D").to_list() == [None]
+    assert from_ordinals(ordinals + 11, style="code").to_list() == [
+        "2024M12",
+        "2025M01",
+        None,
+        None,
+    ]
+
+
+def test_dash_period() -> None:
+    """Test that the dash Period uses integer months."""
+    period = Period("2024M01")
+    assert period.as_period() == "2024-01"
+    assert period.as_string() == "Jan 2024"
+    assert period.subtract(months=1).as_period() == "2023-12"
+    assert period.subtract(years=1, months=2).as_period() == "2022-11"
+    assert period.subtract(days=1).as_period() == "2023-12"
+    assert Period("2023-12") < period
+    assert repr(period) == "Period<2024-01>"
+
+    periods = AllPeriods(["2024-03", "2024-01", "2024-02"])
+    assert [p.as_period() for p in periods.create_period_range(2)] == [
+        "2024-02",
+        "2024-03",
+    ]
+    assert create_period_range_list(2024, 1, 2) == ["2023M11", "2023M12", "2024M01"]
+
+
+def test_dash_period_set_period() -> None:
+    """Test that set_period updates the period and ignores day and time."""
+    period = Period("2024-01")
+    period.set_period(month=5)
+    assert period.as_period() == "2024-05"
+    period.set_period(year=2023, day=31, hour=12)
+    assert period.as_period() == "2023-05"
+    with pytest.raises(ValueError):
+        period.set_period(month=13)
+    assert period.as_period() == "2023-05"
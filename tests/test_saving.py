@@ -1,12 +1,52 @@
 """Test read and write functionality."""
 
+import asyncio
+import functools
+import io
+import json
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import pytest
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.implementations.local import LocalFileSystem
 
+from ssb_konjunk import saving
+from ssb_konjunk.prompts import iterate_years_months
+from ssb_konjunk.saving import DATASET_MANIFEST_NAME
+from ssb_konjunk.saving import VERSION_INDEX_NAME
+from ssb_konjunk.saving import FileCache
+from ssb_konjunk.saving import PeriodIndex
+from ssb_konjunk.saving import _content_hash
 from ssb_konjunk.saving import _find_version_number
+from ssb_konjunk.saving import _get_files
+from ssb_konjunk.saving import _get_files_from_index
+from ssb_konjunk.saving import _get_fs
+from ssb_konjunk.saving import _list_versions
+from ssb_konjunk.saving import _parse_file_version
+from ssb_konjunk.saving import _read_polars
 from ssb_konjunk.saving import _remove_edge_slashes
 from ssb_konjunk.saving import _structure_ssb_filepath
+from ssb_konjunk.saving import _update_version_index
 from ssb_konjunk.saving import _verify_base_filename
 from ssb_konjunk.saving import _verify_datatilstand
+from ssb_konjunk.saving import append_ssb_dataset
+from ssb_konjunk.saving import aread_ssb_file
+from ssb_konjunk.saving import awrite_ssb_file
+from ssb_konjunk.saving import compact_ssb_dataset
+from ssb_konjunk.saving import read_ssb_dataset
+from ssb_konjunk.saving import read_ssb_file
+from ssb_konjunk.saving import read_ssb_files
+from ssb_konjunk.saving import scan_ssb_file
+from ssb_konjunk.saving import write_ssb_dataset
+from ssb_konjunk.saving import write_ssb_file
 
 
 def test_remove_edge_slashes() -> None:
@@ -101,7 +141,7 @@ def test_structure_ssb_filepath() -> None:
     ), filename_5
 
 
-def test_find_version_number() -> None:
+def test_find_version_number(monkeypatch) -> None:
     """Test function _find_version_number."""
     assert (
         _find_version_number(["minfil_p2023_p2024_v0.parquet"], stable_version=False)
@@ -120,6 +160,70 @@ def test_find_version_number() -> None:
 
     assert _find_version_number(files, stable_version=False) == "0"
 
+    files = [
+        "minfil_p2023_p2024_v1.parquet",
+        "minfil_p2023_p2024_v2.parquet",
+        "minfil_p2023_p2024_v10.parquet",
+    ]
+    monkeypatch.setattr("builtins.input", lambda _: "y")
+    assert _find_version_number(files, stable_version=True) == "11"
+
+
+def test_parse_file_version() -> None:
+    """Test function _parse_file_version."""
+    version = _parse_file_version(
+        "bucket/vhi/inndata/ra-0187_p2024-01-01_p2024-01-31_v12.parquet"
+    )
+    assert version is not None
+    assert version.base_path == "bucket/vhi/inndata/ra-0187_p2024-01-01_p2024-01-31_"
+    assert version.timestamp == "p2024-01-01_p2024-01-31"
+    assert version.version == 12
+    assert version.filetype == "parquet"
+
+    assert _parse_file_version("bucket/vhi/inndata/minfil_p2023_p2024.csv") is None
+
+
+def test_get_files_numeric_order_and_cache(tmp_path) -> None:
+    """Test that versions are sorted numerically and the listing is cached."""
+    for version in [1, 2, 10]:
+        (tmp_path / f"minfil_p2024-01_v{version}.parquet").touch()
+    (tmp_path / "minfil_p2024-02_v3.parquet").touch()
+    (tmp_path / "minfil_p2024-01_v4.csv").touch()
+
+    files = _get_files(f"{tmp_path}/minfil_p2024-01_", "parquet")
+    assert [f.rsplit("_", 1)[-1] for f in files] == [
+        "v1.parquet",
+        "v2.parquet",
+        "v10.parquet",
+    ]
+
+    # The folder is listed once, new files are not seen until invalidated.
+    (tmp_path / "minfil_p2024-01_v11.parquet").touch()
+    assert _list_versions(str(tmp_path)) is _list_versions(str(tmp_path))
+    assert _get_files(f"{tmp_path}/minfil_p2024-01_", "parquet") == files
+
+
+def test_write_lists_folder_again(tmp_path, monkeypatch) -> None:
+    """Test that writing does not use a cached listing missing other writers' files."""
+    monkeypatch.setattr("builtins.input", lambda _: "y")
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    folder = tmp_path / "vhi" / "inndata"
+    write_ssb_file(pd.DataFrame({"a": [1]}), *args)
+    read_ssb_file(*args[:-1], datatilstand="inndata")
+
+    # Another process writes a version, not seen by the cached listing.
+    pd.DataFrame({"a": [999]}).to_parquet(folder / "minfil_p2024-01_v2.parquet")
+    write_ssb_file(pd.DataFrame({"a": [2]}), *args)
+    assert pd.read_parquet(folder / "minfil_p2024-01_v2.parquet")["a"].tolist() == [999]
+    assert pd.read_parquet(folder / "minfil_p2024-01_v3.parquet")["a"].tolist() == [2]
+
+    # Datasets are versioned the same way.
+    read_ssb_file(*args[:-1], datatilstand="inndata")
+    (folder / "minfil_p2024-01_v4.parquet").mkdir()
+    write_ssb_dataset(pd.DataFrame({"periode": ["2024-01"], "a": [5]}), *args)
+    assert (folder / "minfil_p2024-01_v5.parquet").is_dir()
+    assert not any((folder / "minfil_p2024-01_v4.parquet").iterdir())
+
 
 def test_verify_base_filename() -> None:
     """Test function _verify_base_filename."""
@@ -169,3 +273,850 @@ def test_verify_list_filtypes() -> None:
     filenames.sort()
 
     assert all(item.endswith(filetype) for item in filenames)
+
+
+def test_version_index(tmp_path) -> None:
+    """Test that write_ssb_file and read_ssb_file keep the version index updated."""
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1.0, 2.0]})
+    folder = tmp_path / "vhi" / "statistikk"
+    folder.mkdir(parents=True)
+    # A file written before the index existed.
+    df.to_parquet(folder / "minfil_p2024-01_v1.parquet")
+
+    write_ssb_file(
+        df,
+        (2024, 1),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="statistikk",
+        stable_version=False,
+        use_version_index=True,
+    )
+
+    index = json.loads((folder / VERSION_INDEX_NAME).read_text())
+    assert index == {
+        "minfil_p2024-01_": ["minfil_p2024-01_v0.parquet", "minfil_p2024-01_v1.parquet"]
+    }
+
+    files = _get_files_from_index(f"{folder}/minfil_p2024-01_", "parquet")
+    assert files[-1] == f"{folder}/minfil_p2024-01_v1.parquet"
+    # Writing invalidates the cached listing of the folder.
+    assert len(_get_files(f"{folder}/minfil_p2024-01_", "parquet")) == 2
+
+    result = read_ssb_file(
+        (2024, 1),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="statistikk",
+        use_version_index=True,
+    )
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_version_index_repair(tmp_path) -> None:
+    """Test that a corrupt or outdated version index is rebuilt from the folder."""
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1.0, 2.0]})
+    for version in [1, 2]:
+        df.to_parquet(tmp_path / f"minfil_p2024-01_v{version}.parquet")
+    index_path = tmp_path / VERSION_INDEX_NAME
+    file_path = f"{tmp_path}/minfil_p2024-01_"
+
+    # A half written index is rebuilt.
+    index_path.write_text('{"minfil_p2024-01_": ["minfil_p2024')
+    assert _get_files_from_index(file_path, "parquet")[-1].endswith("_v2.parquet")
+    assert json.loads(index_path.read_text()) == {
+        "minfil_p2024-01_": ["minfil_p2024-01_v1.parquet", "minfil_p2024-01_v2.parquet"]
+    }
+
+    # An index where another writer dropped the newest version is rebuilt.
+    df.to_parquet(tmp_path / "minfil_p2024-01_v3.parquet")
+    assert _get_files_from_index(file_path, "parquet")[-1].endswith("_v3.parquet")
+    assert (
+        "minfil_p2024-01_v3.parquet"
+        in json.loads(index_path.read_text())["minfil_p2024-01_"]
+    )
+
+    # Parallel updates do not drop each other's versions, or leave temporary files.
+    for version in range(4, 12):
+        df.to_parquet(tmp_path / f"minfil_p2024-01_v{version}.parquet")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(
+                _update_version_index,
+                [f"{file_path}v{version}.parquet" for version in range(4, 12)],
+            )
+        )
+    index = json.loads(index_path.read_text())
+    assert len(index["minfil_p2024-01_"]) == 11
+    assert [p.name for p in tmp_path.glob(".*")] == [VERSION_INDEX_NAME]
+
+
+def test_read_ssb_files(tmp_path) -> None:
+    """Test of function read_ssb_files."""
+    for month in [1, 2, 3]:
+        df = pd.DataFrame({"nar": ["H", "K"], "verdi": [month, month * 10]})
+        write_ssb_file(
+            df,
+            (2024, month),
+            "M",
+            str(tmp_path),
+            "vhi",
+            "minfil",
+            datatilstand="statistikk",
+            stable_version=False,
+        )
+
+    result = read_ssb_files(
+        iterate_years_months(2024, 2024, 1, 3),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="statistikk",
+        columns=["verdi"],
+    )
+    assert result.columns.tolist() == ["verdi", "periode"]
+    assert result["periode"].tolist() == [
+        "2024-01",
+        "2024-01",
+        "2024-02",
+        "2024-02",
+        "2024-03",
+        "2024-03",
+    ]
+    assert result["verdi"].tolist() == [1, 10, 2, 20, 3, 30]
+
+    with pytest.raises(FileNotFoundError):
+        read_ssb_files(
+            iterate_years_months(2024, 2024, 1, 4),
+            "M",
+            str(tmp_path),
+            "vhi",
+            "minfil",
+            datatilstand="statistikk",
+        )
+
+    result = read_ssb_files(
+        iterate_years_months(2024, 2024, 3, 4),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="statistikk",
+        ignore_missing=True,
+    )
+    assert result["periode"].unique().tolist() == ["2024-03"]
+
+
+@pytest.mark.parametrize("filetype", ["parquet", "csv", "jsonl", "json", "feather"])
+def test_write_and_read_engines(tmp_path, filetype) -> None:
+    """Test writing and reading with polars and pyarrow without pandas."""
+    df = pl.DataFrame({"nar": ["H", "K", "Næring"], "verdi": [1.5, 2.0, 3.5]})
+    for name, data in [("polarsfil", df), ("arrowfil", df.to_arrow())]:
+        write_ssb_file(
+            data,
+            (2024, 1),
+            "M",
+            str(tmp_path),
+            "vhi",
+            name,
+            datatilstand="inndata",
+            stable_version=False,
+            filetype=filetype,
+        )
+
+        result = read_ssb_file(
+            (2024, 1),
+            "M",
+            str(tmp_path),
+            "vhi",
+            name,
+            datatilstand="inndata",
+            filetype=filetype,
+            engine="polars",
+        )
+        assert isinstance(result, pl.DataFrame)
+        assert result.equals(df)
+
+        result = read_ssb_file(
+            (2024, 1),
+            "M",
+            str(tmp_path),
+            "vhi",
+            name,
+            datatilstand="inndata",
+            filetype=filetype,
+            columns=["verdi"],
+            engine="pyarrow",
+        )
+        assert isinstance(result, pa.Table)
+        assert result.column("verdi").to_pylist() == [1.5, 2.0, 3.5]
+
+
+def test_read_polars_json_from_file_object(tmp_path) -> None:
+    """Test reading json with polars from a path and from a binary file object."""
+    df = pl.DataFrame({"nar": ["H", "K"], "verdi": [1.5, 2.0]})
+    df.write_json(tmp_path / "minfil.json")
+    for source in [str(tmp_path / "minfil.json"), io.BytesIO(df.write_json().encode())]:
+        result = _read_polars(source, "json", ["verdi"], ";", "utf8")
+        assert result.equals(df.select("verdi"))
+
+
+def test_scan_ssb_file(tmp_path) -> None:
+    """Test of function scan_ssb_file."""
+    df = pl.DataFrame(
+        {
+            "nar": ["47", "47.1", "49", "49.1"] * 3,
+            "periode": ["2024-01"] * 4 + ["2024-02"] * 4 + ["2024-03"] * 4,
+            "verdi": list(range(12)),
+        }
+    )
+    write_ssb_file(
+        df,
+        (2024, 1, 2024, 3),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="inndata",
+        stable_version=False,
+    )
+
+    lf = scan_ssb_file(
+        (2024, 1, 2024, 3), "M", str(tmp_path), "vhi", "minfil", "inndata"
+    )
+    assert isinstance(lf, pl.LazyFrame)
+    result = (
+        lf.filter(pl.col("nar").is_in(["47"]) & (pl.col("periode") > "2024-01"))
+        .select("verdi")
+        .collect()
+    )
+    assert result["verdi"].to_list() == [4, 8]
+
+    dataset = scan_ssb_file(
+        (2024, 1, 2024, 3),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        "inndata",
+        version_number=0,
+        engine="pyarrow",
+    )
+    table = dataset.to_table(columns=["verdi"], filter=ds.field("nar") == "49")
+    assert table.column("verdi").to_pylist() == [2, 6, 10]
+
+
+@pytest.mark.parametrize("filetype", ["csv", "jsonl", "parquet", "feather"])
+def test_write_and_read_chunks(tmp_path, filetype) -> None:
+    """Test writing from and reading to an iterator of chunks."""
+    df = pd.DataFrame({"nar": ["H", "K", "Næring"] * 4, "verdi": range(12)})
+    chunks = (df.iloc[i : i + 5] for i in range(0, len(df), 5))
+    write_ssb_file(
+        chunks,
+        (2024, 1),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="inndata",
+        stable_version=False,
+        filetype=filetype,
+    )
+
+    result = read_ssb_file(
+        (2024, 1),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="inndata",
+        filetype=filetype,
+        chunksize=4,
+    )
+    chunks = list(result)
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+
+    with pytest.raises(ValueError, match="Dataframen har ingen rader"):
+        write_ssb_file(
+            iter([]), (2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata"
+        )
+
+
+def test_read_feather_chunks_by_record_batch(mocker) -> None:
+    """Test that chunks of a remote feather file are read one record batch at a time."""
+    bucket = "memory://ssb-feather-chunks-test"
+    df = pd.DataFrame({"nar": ["H", "K", "Næring"] * 4, "verdi": range(12)})
+    args = ((2024, 1), "M", bucket, "vhi", "minfil", "inndata")
+    chunks = (df.iloc[i : i + 5] for i in range(0, len(df), 5))
+    write_ssb_file(chunks, *args, stable_version=False, filetype="feather")
+
+    mocker.patch.object(
+        pa.ipc.RecordBatchFileReader, "read_all", side_effect=MemoryError
+    )
+    result = list(
+        read_ssb_file(
+            *args[:-1],
+            datatilstand="inndata",
+            filetype="feather",
+            columns=["verdi"],
+            chunksize=4,
+        )
+    )
+    assert [len(chunk) for chunk in result] == [4, 4, 4]
+    assert pd.concat(result, ignore_index=True)["verdi"].tolist() == list(range(12))
+    _get_fs(bucket).rm(bucket, recursive=True)
+
+
+@pytest.mark.parametrize("df_type", ["pandas", "polars", "pyarrow"])
+def test_write_parquet_options(tmp_path, df_type) -> None:
+    """Test compression, row groups and sorting of parquet files."""
+    df = pd.DataFrame({"nar": ["K", "H", "K", "H", "B"], "verdi": range(5)})
+    if df_type == "polars":
+        df = pl.from_pandas(df)
+    elif df_type == "pyarrow":
+        df = pa.Table.from_pandas(df)
+    write_ssb_file(
+        df,
+        (2024, 1),
+        "M",
+        str(tmp_path),
+        "vhi",
+        "minfil",
+        datatilstand="inndata",
+        stable_version=False,
+        compression="zstd",
+        row_group_size=2,
+        sort_by=["nar"],
+        write_page_index=True,
+    )
+
+    file = tmp_path / "vhi/inndata/minfil_p2024-01_v0.parquet"
+    metadata = pq.ParquetFile(file).metadata
+    assert metadata.num_row_groups == 3
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+    result = read_ssb_file(
+        (2024, 1), "M", str(tmp_path), "vhi", "minfil", datatilstand="inndata"
+    )
+    assert result["nar"].tolist() == ["B", "H", "H", "K", "K"]
+    assert result["verdi"].tolist() == [4, 1, 3, 0, 2]
+
+    with pytest.raises(ValueError, match="sort_by"):
+        write_ssb_file(
+            iter([result]),
+            (2024, 1),
+            "M",
+            str(tmp_path),
+            "vhi",
+            "minfil",
+            datatilstand="inndata",
+            stable_version=False,
+            sort_by=["nar"],
+        )
+
+
+def test_write_non_interactive(tmp_path, monkeypatch) -> None:
+    """Test that parallel non-interactive writers get separate versions."""
+    monkeypatch.setattr("builtins.input", lambda _: pytest.fail("input() called"))
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1, 2]})
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    folder = tmp_path / "vhi" / "inndata"
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(write_ssb_file, df, *args, interactive=False)
+            for _ in range(4)
+        ]
+        for future in futures:
+            future.result()
+    assert sorted(p.name for p in folder.iterdir()) == [
+        f"minfil_p2024-01_v{v}.parquet" for v in range(1, 5)
+    ]
+
+    # Versions written or reserved by other writers are skipped.
+    (folder / "minfil_p2024-01_v5.parquet").touch()
+    (folder / ".minfil_p2024-01_v6.parquet.lock").touch()
+    write_ssb_file(df, *args, interactive=False, use_version_index=True)
+    result = read_ssb_file(*args[:-1], datatilstand="inndata", version_number=7)
+    pd.testing.assert_frame_equal(result, df)
+
+    # Unstable versions are overwritten without leaving temporary files.
+    write_ssb_file(df, *args, stable_version=False, interactive=False)
+    write_ssb_file(df, *args, stable_version=False, interactive=False)
+    assert not [p for p in folder.iterdir() if p.name.endswith(".tmp")]
+    assert (folder / "minfil_p2024-01_v0.parquet").exists()
+
+
+def test_read_while_writing_non_interactive(tmp_path, mocker) -> None:
+    """Test that readers see the previous version while a new version is written."""
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    folder = tmp_path / "vhi" / "inndata"
+    write_ssb_file(pd.DataFrame({"a": [1]}), *args, interactive=False)
+
+    save = saving._save
+    read_during_write = []
+
+    def read_then_save(*save_args, **save_kwargs) -> None:
+        _list_versions(str(folder), refresh=True)
+        read_during_write.append(read_ssb_file(*args[:-1], datatilstand="inndata"))
+        save(*save_args, **save_kwargs)
+
+    mocker.patch("ssb_konjunk.saving._save", side_effect=read_then_save)
+    write_ssb_file(pd.DataFrame({"a": [2]}), *args, interactive=False)
+    assert read_during_write[0]["a"].tolist() == [1]
+    assert read_ssb_file(*args[:-1], datatilstand="inndata")["a"].tolist() == [2]
+    assert not list(folder.glob(".*"))
+
+
+def test_write_skip_if_unchanged(tmp_path) -> None:
+    """Test that unchanged content is not saved as a new version."""
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1, 2]})
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    folder = tmp_path / "vhi" / "inndata"
+
+    for data in [df, df, df[["verdi", "nar"]], df.set_index("nar", drop=False)]:
+        write_ssb_file(data, *args, interactive=False, skip_if_unchanged=True)
+    assert sorted(p.name for p in folder.glob("*.parquet")) == [
+        "minfil_p2024-01_v1.parquet",
+        "minfil_p2024-01_v2.parquet",
+        "minfil_p2024-01_v3.parquet",
+    ]
+
+    # The same data from polars or pyarrow is not saved again.
+    for data in [pl.from_pandas(df), pl.from_pandas(df).to_arrow()]:
+        write_ssb_file(data, *args, interactive=False, skip_if_unchanged=True)
+    assert len(list(folder.glob("*.parquet"))) == 3
+
+    # Cells with lists or dicts are hashed as json.
+    nested = pd.DataFrame({"nar": ["H", "K"], "verdi": [[1, 2], {"a": 3}]})
+    for data in [nested, nested, nested.assign(verdi=[[1], {"a": 3}])]:
+        write_ssb_file(
+            data, *args, filetype="jsonl", interactive=False, skip_if_unchanged=True
+        )
+    assert len(list(folder.glob("*.jsonl"))) == 2
+
+
+def test_content_hash_same_for_pandas_and_polars() -> None:
+    """Test that equal data gives the same hash from pandas, polars and pyarrow."""
+    df = pd.DataFrame(
+        {
+            "nar": ["H", "K", None],
+            "verdi": [1.5, None, 3.0],
+            "antall": [1, 2, 3],
+            "aktiv": [True, False, True],
+            "gruppe": pd.Categorical(["a", "b", "a"]),
+            "liste": [[1, 2], [3], []],
+        }
+    )
+    expected = _content_hash(df, "records")
+    polars_df = pl.DataFrame(
+        {
+            "nar": ["H", "K", None],
+            "verdi": [1.5, None, 3.0],
+            "antall": [1, 2, 3],
+            "aktiv": [True, False, True],
+            "gruppe": pl.Series(["a", "b", "a"], dtype=pl.Categorical),
+            "liste": [[1, 2], [3], []],
+        }
+    )
+    assert _content_hash(polars_df, "records") == expected
+    assert _content_hash(polars_df.to_arrow(), "records") == expected
+    assert _content_hash(df.assign(antall=[1, 2, 4]), "records") != expected
+    assert _content_hash(df.astype({"antall": "float64"}), "records") != expected
+
+
+def test_write_only_removes_hash_of_overwritten_file(tmp_path, mocker) -> None:
+    """Test that the stored hash is only removed when a file is overwritten."""
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1, 2]})
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    remove = mocker.spy(saving, "_remove")
+
+    def removed_hashes() -> list[str]:
+        return [
+            call.args[0].rsplit("/", 1)[-1]
+            for call in remove.call_args_list
+            if call.args[0].endswith(".sha256")
+        ]
+
+    write_ssb_file(df, *args, stable_version=False)
+    write_ssb_file(df, *args, interactive=False)
+    assert removed_hashes() == []
+    write_ssb_file(df, *args, stable_version=False)
+    assert removed_hashes() == ["minfil_p2024-01_v0.parquet.sha256"]
+
+
+@pytest.mark.parametrize("asynchronous", [None, False, True])
+def test_async_read_and_write(tmp_path, mocker, asynchronous) -> None:
+    """Test reading and writing many files concurrently on one event loop."""
+    fs = None
+    if asynchronous is not None:
+        fs = AsyncFileSystemWrapper(LocalFileSystem(), asynchronous=asynchronous)
+        cat_file = mocker.spy(fs, "_cat_file")
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1, 2]})
+    months = range(1, 7)
+
+    async def run() -> list[pd.DataFrame]:
+        await asyncio.gather(
+            *(
+                awrite_ssb_file(
+                    df.assign(verdi=df["verdi"] * month),
+                    (2024, month),
+                    "M",
+                    str(tmp_path),
+                    "vhi",
+                    "minfil",
+                    "inndata",
+                    interactive=False,
+                    use_version_index=month == 1,
+                )
+                for month in months
+            )
+        )
+        return await asyncio.gather(
+            *(
+                aread_ssb_file(
+                    (2024, month),
+                    "M",
+                    str(tmp_path),
+                    "vhi",
+                    "minfil",
+                    "inndata",
+                    use_version_index=month == 1,
+                    fs=fs,
+                )
+                for month in months
+            )
+        )
+
+    results = asyncio.run(run())
+    for month, result in zip(months, results, strict=True):
+        assert result["verdi"].tolist() == [month, 2 * month]
+
+    if asynchronous is not None:
+        # Only filesystems made with asynchronous=True are awaited on the event loop,
+        # others are used from threads and still work with blocking calls.
+        assert cat_file.called == asynchronous
+        if not asynchronous:
+            assert fs.cat_file(f"{tmp_path}/vhi/inndata/minfil_p2024-01_v1.parquet")
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(
+            aread_ssb_file((2023, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+        )
+
+
+def test_write_and_read_filesystem() -> None:
+    """Test the whole saving path through one fsspec filesystem object."""
+    bucket = "memory://ssb-vhi-data-produkt-test"
+    fs = _get_fs(bucket)
+    assert fs is _get_fs(f"{bucket}/vhi")
+    assert _get_fs("/buckets/produkt") is None
+
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1, 2]})
+    args = ((2024, 1), "M", bucket, "vhi", "minfil", "inndata")
+    write_ssb_file(df, *args, interactive=False, use_version_index=True)
+    write_ssb_file(df.assign(verdi=[3, 4]), *args, interactive=False)
+    write_ssb_file(iter([df, df]), *args, interactive=False, filetype="csv")
+    assert sorted(fs.ls(f"{bucket}/vhi/inndata", detail=False)) == [
+        f"/ssb-vhi-data-produkt-test/vhi/inndata/{name}"
+        for name in [
+            VERSION_INDEX_NAME,
+            "minfil_p2024-01_v1.csv",
+            "minfil_p2024-01_v1.parquet",
+            "minfil_p2024-01_v2.parquet",
+        ]
+    ]
+
+    result = read_ssb_file(*args[:-1], datatilstand="inndata")
+    assert result["verdi"].tolist() == [3, 4]
+    chunks = read_ssb_file(
+        *args[:-1], datatilstand="inndata", filetype="csv", chunksize=2
+    )
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    dataset = scan_ssb_file(*args[:-1], datatilstand="inndata", engine="pyarrow")
+    assert dataset.to_table().num_rows == 2
+    result = read_ssb_files([(2024, 1)], "M", bucket, "vhi", "minfil", "inndata")
+    assert result["periode"].tolist() == ["2024-01", "2024-01"]
+    fs.rm(bucket, recursive=True)
+
+
+def test_file_cache(tmp_path, mocker) -> None:
+    """Test reading remote files through the local disk cache."""
+    bucket = "memory://ssb-cache-test"
+    fs = _get_fs(bucket)
+    get_file = mocker.spy(fs, "get_file")
+    cache = FileCache(tmp_path / "cache", max_bytes=1)
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1, 2]})
+    for month in [1, 2]:
+        write_ssb_file(df, (2024, month), "M", bucket, "vhi", "minfil", "inndata")
+
+    args = ("M", bucket, "vhi", "minfil", "inndata")
+    for _ in range(2):
+        result = read_ssb_file((2024, 1), *args, cache=cache)
+        pd.testing.assert_frame_equal(result, df)
+    assert get_file.call_count == 1
+
+    # The least recently used file is evicted when the cache is too large.
+    read_ssb_files([(2024, 1), (2024, 2)], *args, cache=cache, max_workers=1)
+    assert get_file.call_count == 2
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    cache.clear()
+    assert not list((tmp_path / "cache").iterdir())
+    fs.rm(bucket, recursive=True)
+
+
+@pytest.mark.parametrize("filetype", ["parquet", "feather"])
+def test_read_memory_map(tmp_path, filetype) -> None:
+    """Test memory mapped reads of local files."""
+    df = pd.DataFrame({"nar": ["H", "K", "Næring"], "verdi": [1.5, 2.0, 3.5]})
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    write_ssb_file(df, *args, stable_version=False, filetype=filetype)
+
+    for engine in ["pandas", "polars", "pyarrow"]:
+        read = functools.partial(
+            read_ssb_file, *args, filetype=filetype, engine=engine, memory_map=True
+        )
+        if filetype != "feather" or engine == "pandas":
+            with pytest.warns(UserWarning, match="kopierer likevel dataene"):
+                result = read()
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                result = read()
+        if engine != "pandas":
+            result = result.to_pandas()
+        pd.testing.assert_frame_equal(result, df)
+
+
+def test_read_memory_map_allocates_nothing(tmp_path) -> None:
+    """Test that a memory mapped feather file is not copied into the arrow memory pool."""
+    df = pd.DataFrame({"verdi": np.arange(100_000, dtype=np.float64)})
+    args = ((2024, 1), "M", str(tmp_path), "vhi", "minfil", "inndata")
+    write_ssb_file(df, *args, stable_version=False, filetype="feather")
+    pool = pa.default_memory_pool()
+
+    allocated = pool.bytes_allocated()
+    mapped = read_ssb_file(*args, filetype="feather", engine="pyarrow", memory_map=True)
+    assert pool.bytes_allocated() == allocated
+    copied = read_ssb_file(*args, filetype="feather", engine="pyarrow")
+    assert pool.bytes_allocated() - allocated >= df["verdi"].nbytes
+    assert mapped.equals(copied)
+    assert scan_ssb_file(*args, filetype="feather").collect().height == len(df)
+
+
+def test_read_memory_map_remote(tmp_path) -> None:
+    """Test that remote files can only be memory mapped through the cache."""
+    bucket = "memory://ssb-memory-map-test"
+    df = pd.DataFrame({"nar": ["H", "K"], "verdi": [1.5, 2.0]})
+    args = ((2024, 1), "M", bucket, "vhi", "minfil", "inndata")
+    write_ssb_file(df, *args, stable_version=False, filetype="feather")
+
+    with pytest.raises(ValueError, match="lokale filer"):
+        read_ssb_file(*args, filetype="feather", engine="pyarrow", memory_map=True)
+    cache = FileCache(tmp_path / "cache")
+    result = read_ssb_file(
+        *args, filetype="feather", engine="pyarrow", memory_map=True, cache=cache
+    )
+    pd.testing.assert_frame_equal(result.to_pandas(), df)
+    _get_fs(bucket).rm(bucket, recursive=True)
+
+
+def test_write_and_read_dataset(tmp_path) -> None:
+    """Test a dataset partitioned by period and nar."""
+    periods = [
+        f"{year}-{month:02d}" for year, month in iterate_years_months(2023, 2024, 11, 2)
+    ]
+    df = pd.DataFrame(
+        {
+            "periode": [p for p in periods for _ in range(2)],
+            "nar": ["47", "47.1"] * len(periods),
+            "verdi": range(2 * len(periods)),
+        }
+    )
+    args = ((2023, 11, 2024, 2), "M", str(tmp_path), "vhi", "minfil", "statistikk")
+    write_ssb_dataset(
+        df, *args, partition_cols=["periode", "nar"], stable_version=False
+    )
+
+    dataset_path = tmp_path / "vhi/statistikk/minfil_p2023-11_p2024-02_v0.parquet"
+    assert sorted(p.name for p in dataset_path.iterdir()) == [
+        DATASET_MANIFEST_NAME,
+        *(f"periode={p}" for p in periods),
+    ]
+    assert (dataset_path / "periode=2024-01/nar=47.1/part-0.parquet").exists()
+
+    result = read_ssb_dataset(*args, period_range=((2023, 12), (2024, 1)))
+    result = result.sort_values("verdi")
+    assert result["periode"].tolist() == ["2023-12", "2023-12", "2024-01", "2024-01"]
+    assert result["verdi"].tolist() == [2, 3, 4, 5]
+
+    result = read_ssb_dataset(
+        *args,
+        columns=["periode", "verdi"],
+        filters=ds.field("nar") == "47.1",
+        engine="polars",
+    )
+    assert result.columns == ["periode", "verdi"]
+    assert sorted(result["verdi"].to_list()) == [1, 3, 5, 7]
+
+    # Overwriting version 0 removes the old partitions.
+    write_ssb_dataset(df.iloc[:2], *args, stable_version=False)
+    assert sorted(p.name for p in dataset_path.iterdir() if p.is_dir()) == [
+        "periode=2023-11"
+    ]
+
+
+def test_append_and_compact_dataset(tmp_path) -> None:
+    """Test adding and revising periods of a dataset without rewriting it."""
+    df = pd.DataFrame(
+        {"periode": ["2024-01", "2024-01", "2024-02"], "nar": ["H", "K", "H"]}
+    ).assign(verdi=[1.0, 2.0, 3.0])
+    args = ((2024, 1, 2024, 12), "M", str(tmp_path), "vhi", "minfil", "statistikk")
+    write_ssb_dataset(df, *args, stable_version=False)
+    dataset_path = tmp_path / "vhi/statistikk/minfil_p2024-01_p2024-12_v0.parquet"
+
+    # Add a new period, and revise the last period.
+    new = pd.DataFrame(
+        {"periode": ["2024-02", "2024-03"], "nar": ["H", "H"], "verdi": [4.0, 5.0]}
+    )
+    append_ssb_dataset(new, *args)
+    result = read_ssb_dataset(*args).sort_values(["periode", "nar"])
+    assert result["verdi"].tolist() == [1.0, 2.0, 4.0, 5.0]
+    assert len(list(dataset_path.glob("periode=2024-02/*.parquet"))) == 1
+
+    # Without upsert the rows are added to the partition.
+    append_ssb_dataset(new.iloc[:1], *args, upsert=False)
+    manifest = json.loads((dataset_path / DATASET_MANIFEST_NAME).read_text())
+    assert len(manifest["fragments"]) == 4
+    # Files not in the manifest, e.g. from a failed append, are not read.
+    pq.write_table(
+        pa.table({"verdi": [9.0]}), dataset_path / "periode=2024-03/x.parquet"
+    )
+    assert read_ssb_dataset(*args)["verdi"].sum() == 16.0
+
+    compact_ssb_dataset(*args)
+    manifest = json.loads((dataset_path / DATASET_MANIFEST_NAME).read_text())
+    assert len(manifest["fragments"]) == 3
+    assert len(list(dataset_path.glob("periode=2024-02/*.parquet"))) == 1
+    result = read_ssb_dataset(*args).sort_values(["periode", "verdi"])
+    assert result["verdi"].tolist() == [1.0, 2.0, 4.0, 4.0, 5.0]
+
+
+def test_parallel_appends_to_dataset(tmp_path, mocker) -> None:
+    """Test that appends in parallel do not drop each other from the manifest."""
+    args = ((2024, 1, 2024, 12), "M", str(tmp_path), "vhi", "minfil", "statistikk")
+    df = pd.DataFrame({"periode": ["2024-01"], "verdi": [1.0]})
+    write_ssb_dataset(df, *args, stable_version=False)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(
+                append_ssb_dataset,
+                df.assign(periode=f"2024-{month:02d}", verdi=float(month)),
+                *args,
+            )
+            for month in range(2, 13)
+        ]
+        for future in futures:
+            future.result()
+    result = read_ssb_dataset(*args).sort_values("periode")
+    assert result["verdi"].tolist() == [float(month) for month in range(1, 13)]
+    dataset_path = tmp_path / "vhi/statistikk/minfil_p2024-01_p2024-12_v0.parquet"
+    assert not list(dataset_path.glob(".*"))
+
+    # A partition appended to while compacting keeps its fragments.
+    append_ssb_dataset(df, *args, upsert=False)
+    write_table = pq.write_table
+
+    def append_while_compacting(*write_args, **write_kwargs) -> None:
+        write_table(*write_args, **write_kwargs)
+        append_ssb_dataset(df.assign(verdi=5.0), *args, upsert=False)
+
+    mocker.patch.object(pq, "write_table", side_effect=append_while_compacting)
+    compact_ssb_dataset(*args)
+    assert len(list(dataset_path.glob("periode=2024-01/*.parquet"))) == 3
+    assert read_ssb_dataset(*args)["verdi"].sum() == sum(range(1, 13)) + 1.0 + 5.0
+
+
+def test_period_index(tmp_path) -> None:
+    """Test searching files by the periods in their SSB timestamps."""
+    folder = tmp_path / "vhi" / "inndata"
+    folder.mkdir(parents=True)
+    names = [
+        *(f"vhi_p2023-{month:02d}_v1.parquet" for month in range(1, 13)),
+        "vhi_p2023-03_v2.parquet",
+        "vhi_p2023-01_p2023-12_v1.parquet",
+        "vhi_p2023-Q2_v1.parquet",
+        "vhi_p2022_v1.parquet",
+        "README.md",
+        "vhi_p2023-13_v1.parquet",
+        "vhi_p2023-Q5_v1.parquet",
+        "vhi_p2023-02-30_v1.parquet",
+        "vhi_p2021-W53_v1.parquet",
+    ]
+    for name in names:
+        (folder / name).touch()
+    index = PeriodIndex.from_folder(str(folder))
+    # Files that are not at SSB-format, or have a period out of range, are left out.
+    assert len(index) == len(names) - 5
+
+    def names_of(paths: list[str]) -> list[str]:
+        return [path.rsplit("/", 1)[-1] for path in paths]
+
+    assert names_of(index.overlapping((2023, 4, 2023, 5), "M")) == [
+        "vhi_p2023-01_p2023-12_v1.parquet",
+        "vhi_p2023-04_v1.parquet",
+        "vhi_p2023-Q2_v1.parquet",
+        "vhi_p2023-05_v1.parquet",
+    ]
+    assert names_of(index.containing((2023, 5), "M")) == [
+        "vhi_p2023-01_p2023-12_v1.parquet",
+        "vhi_p2023-Q2_v1.parquet",
+        "vhi_p2023-05_v1.parquet",
+    ]
+    assert names_of(index.within((2023, 1), "Q")) == [
+        "vhi_p2023-01_v1.parquet",
+        "vhi_p2023-02_v1.parquet",
+        "vhi_p2023-03_v1.parquet",
+        "vhi_p2023-03_v2.parquet",
+    ]
+    assert names_of(index.latest().within((2023, 1), "Q")) == [
+        "vhi_p2023-01_v1.parquet",
+        "vhi_p2023-02_v1.parquet",
+        "vhi_p2023-03_v2.parquet",
+    ]
+    assert index.overlapping((2021,), "Y") == []
+    assert PeriodIndex([]).overlapping((2023,), "Y") == []
+
+
+def test_read_with_period_index(tmp_path) -> None:
+    """Test that reading with a period index finds the same file as without it."""
+    df = pd.DataFrame({"a": [1, 2]})
+    for version in range(3):
+        write_ssb_file(
+            df.assign(a=version),
+            (2024, 3),
+            "M",
+            str(tmp_path),
+            "vhi",
+            "vhi",
+            "inndata",
+            interactive=False,
+        )
+    index = PeriodIndex.from_folder(f"{tmp_path}/vhi/inndata")
+    result = read_ssb_file(
+        (2024, 3), "M", str(tmp_path), "vhi", "vhi", "inndata", period_index=index
+    )
+    assert result["a"].tolist() == [2, 2]
+    assert index.versions(f"{tmp_path}/vhi/inndata/vhi_p2024-03_", "parquet")[
+        -1
+    ].endswith("_v3.parquet")
+    with pytest.raises(FileNotFoundError):
+        read_ssb_file(
+            (2024, 4), "M", str(tmp_path), "vhi", "vhi", "inndata", period_index=index
+        )
@@ -1,5 +1,9 @@
 """Test of function timestamp."""
 
+from datetime import date
+
+import numpy as np
+import polars as pl
 import pytest
 
 from ssb_konjunk.timestamp import _check_even
@@ -16,6 +20,9 @@ from ssb_konjunk.timestamp import _get_timestamp_special
 from ssb_konjunk.timestamp import _get_timestamp_yearly
 from ssb_konjunk.timestamp import check_periodic_year
 from ssb_konjunk.timestamp import get_ssb_timestamp
+from ssb_konjunk.timestamp import get_ssb_timestamps
+from ssb_konjunk.timestamp import parse_ssb_filename
+from ssb_konjunk.timestamp import parse_ssb_filenames
 
 
 def test_check_even() -> None:
@@ -187,3 +194,155 @@ def test_check_periodic_year() -> None:
     assert check_periodic_year(2021, 2024, 3)
     assert check_periodic_year(2021, 2021, 3)
     assert check_periodic_year(2021, 2022, 1)
+
+
+@pytest.mark.parametrize(
+    "args, frequency",
+    [
+        (([2023, 2024], [1, 12]), "M"),
+        (([2023, 2024], [3, 12], [2024, 2025], [4, 1]), "M"),
+        (([2024, 2025], [5, 52]), "W"),
+        (([2024, 2025], [1, 4], [2024, 2026], [2, 4]), "Q"),
+        (([2024, 2025], [1, 6]), "B"),
+        (([2024, 2025], [1, 3]), "T"),
+        (([2024, 2025], [1, 2]), "H"),
+        (([2024, 2025],), "Y"),
+        (([2020, 2021], [2024, 2025]), "Y"),
+        (([2024, 2024], [2, 12], [1, 31]), "D"),
+        (([2024, 2024], [2, 12], [1, 31], [2024, 2025], [3, 1], [31, 1]), "D"),
+    ],
+)
+def test_get_ssb_timestamps(args, frequency) -> None:
+    """Test that get_ssb_timestamps gives the same as get_ssb_timestamp."""
+    expected = [
+        get_ssb_timestamp(*period, frequency=frequency)
+        for period in zip(*args, strict=True)
+    ]
+    assert get_ssb_timestamps(*args, frequency=frequency).tolist() == expected
+    polars_args = [pl.Series(arg) for arg in args]
+    result = get_ssb_timestamps(*polars_args, frequency=frequency)
+    assert isinstance(result, pl.Series)
+    assert result.to_list() == expected
+
+
+def test_get_ssb_timestamps_invalid() -> None:
+    """Test the vectorised validation of get_ssb_timestamps."""
+    with pytest.raises(ValueError, match=r"month is bigger .* 13 at position 1"):
+        get_ssb_timestamps(np.array([2024, 2024]), np.array([12, 13]))
+    with pytest.raises(ValueError, match="week is smaller"):
+        get_ssb_timestamps([2024], [0], frequency="W")
+    with pytest.raises(ValueError, match="year: 202 at position 0"):
+        get_ssb_timestamps([202], [1])
+    with pytest.raises(ValueError, match="first year arg can not be bigger"):
+        get_ssb_timestamps([2025], [1], [2024], [1])
+    with pytest.raises(ValueError, match="wrong number of args"):
+        get_ssb_timestamps([2024], [1], [2024])
+    with pytest.raises(ValueError, match="same length"):
+        get_ssb_timestamps([2024, 2025], [1])
+    assert get_ssb_timestamps([2024, None], [1, 2]).tolist() == ["p2024-01", None]
+
+
+def test_get_ssb_timestamp_cache() -> None:
+    """Test that get_ssb_timestamp caches its results."""
+    get_ssb_timestamp.cache_clear()
+    for _ in range(3):
+        assert get_ssb_timestamp(2024, 3, frequency="M") == "p2024-03"
+    info = get_ssb_timestamp.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+@pytest.mark.parametrize(
+    "args, frequency, start_date, end_date",
+    [
+        ((2024,), "Y", date(2024, 1, 1), date(2024, 12, 31)),
+        ((2020, 2024), "Y", date(2020, 1, 1), date(2024, 12, 31)),
+        ((2024, 2), "H", date(2024, 7, 1), date(2024, 12, 31)),
+        ((2024, 2), "T", date(2024, 5, 1), date(2024, 8, 31)),
+        ((2024, 1, 2024, 3), "Q", date(2024, 1, 1), date(2024, 9, 30)),
+        ((2024, 3), "B", date(2024, 5, 1), date(2024, 6, 30)),
+        ((2024, 2), "M", date(2024, 2, 1), date(2024, 2, 29)),
+        ((2023, 11, 2024, 2), "M", date(2023, 11, 1), date(2024, 2, 29)),
+        ((2024, 5), "W", date(2024, 1, 29), date(2024, 2, 4)),
+        ((2024, 1, 2, 2024, 2, 3), "D", date(2024, 1, 2), date(2024, 2, 3)),
+    ],
+)
+def test_parse_ssb_filename(args, frequency, start_date, end_date) -> None:
+    """Test that parse_ssb_filename is the inverse of get_ssb_timestamp."""
+    timestamp = get_ssb_timestamp(*args, frequency=frequency)
+    path = f"bucket/vhi/inndata/ra-0187_{timestamp}_v3.parquet"
+    parsed = parse_ssb_filename(path)
+    assert parsed is not None
+    assert parsed.file_name == "ra-0187"
+    assert parsed.frequency == frequency
+    assert parsed.version == 3
+    assert parsed.filetype == "parquet"
+    assert (parsed.start_date, parsed.end_date) == (start_date, end_date)
+    single = len(args) in (1, 2, 3) and not (frequency == "Y" and len(args) == 2)
+    if single:
+        assert parsed.start == args and parsed.end is None
+    else:
+        half = len(args) // 2
+        assert (parsed.start, parsed.end) == (args[:half], args[half:])
+
+    files = parse_ssb_filenames([path])
+    assert files.row(0, named=True)["start_date"] == start_date
+    assert files.row(0, named=True)["end_date"] == end_date
+    assert files.row(0, named=True)["frequency"] == frequency
+
+
+def test_parse_ssb_filename_without_version() -> None:
+    """Test file names without version or filetype, and other files."""
+    parsed = parse_ssb_filename("vhi_p2024-03")
+    assert parsed is not None
+    assert (parsed.start, parsed.version, parsed.filetype) == ((2024, 3), None, None)
+    assert parse_ssb_filename("vhi.parquet") is None
+    assert parse_ssb_filename("bucket/vhi/inndata") is None
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "x_p2024-13_v1.parquet",
+        "x_p2024-00_v1.parquet",
+        "x_p2024-02-30_v1.parquet",
+        "x_p2024-Q5_v1.parquet",
+        "x_p2024-T4_v1.parquet",
+        "x_p2024-H3_v1.parquet",
+        "x_p2024-B7_v1.parquet",
+        "x_p2021-W53_v1.parquet",
+        "x_p2024-W54_v1.parquet",
+        "x_p2024-W00_v1.parquet",
+        "x_p0000_v1.parquet",
+        "x_p2024-01_p2024-13_v1.parquet",
+    ],
+)
+def test_parse_ssb_filename_out_of_range(name) -> None:
+    """Test that file names with a period out of range are not parsed."""
+    assert parse_ssb_filename(name) is None
+    files = parse_ssb_filenames([name, "x_p2024-12_v1.parquet"])
+    assert files.row(0) == (name, *[None] * (files.width - 1))
+    assert files.row(1, named=True)["end_date"] == date(2024, 12, 31)
+
+
+def test_parse_ssb_filenames() -> None:
+    """Test selecting files by period with the batch parser."""
+    paths = [f"vhi_p2024-{month:02d}_v1.parquet" for month in range(1, 13)]
+    paths += ["vhi_p2024-Q2_v2.parquet", "README.md"]
+    files = parse_ssb_filenames(paths)
+    assert files.height == len(paths)
+    assert files.filter(pl.col("file_name").is_null())["path"].to_list() == [
+        "README.md"
+    ]
+    selected = files.filter(
+        pl.col("start_date") >= date(2024, 4, 1),
+        pl.col("end_date") <= date(2024, 6, 30),
+    )
+    assert selected["path"].to_list() == [
+        "vhi_p2024-04_v1.parquet",
+        "vhi_p2024-05_v1.parquet",
+        "vhi_p2024-06_v1.parquet",
+        "vhi_p2024-Q2_v2.parquet",
+    ]
+    assert selected["version"].to_list() == [1, 1, 1, 2]
+    assert selected["start_period"].to_list() == [4, 5, 6, 2]
+    assert parse_ssb_filenames([]).height == 0